@@ -54,7 +54,12 @@ def check_all_achievements():
     if not achievements_to_check:
         return 
 
-    params = _get_all_required_data()
+    try:
+        params = _get_all_required_data()
+    except Exception as e:
+        # Yarıda kalan geçmişle başarım açılmaz; bir sonraki kontrolde tekrar denenir
+        logging.error(f"Başarım verileri okunamadı, kontrol atlandı: {e}")
+        return
 
     for ach_id, details in achievements_to_check.items():
         name, description, icon, condition, _ = details
@@ -70,11 +75,6 @@ def check_all_achievements():
 
 def _get_all_required_data():
     """Başarım kontrolleri için gerekli tüm metrikleri hesaplayan merkezi fonksiyon."""
-    # Tüm logları çekip Python'da filtrelemek, büyük veri kümelerinde yavaş olabilir.
-    # Ancak mevcut şifreleme yapısında bu gerekli.
-
-    all_logs = database.get_all_usage_logs() # ID'leri ile birlikte gelir
-
     total_usage = 0
     active_days_set = set()
     productive_time = 0
@@ -82,23 +82,17 @@ def _get_all_required_data():
     night_usage = 0
     weekend_usage = 0
 
-    # Kategorileri önbelleğe al
-    categories_map = {}
-    with database.get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT process_name, category FROM app_categories")
-        categories_map = dict(cursor.fetchall())
-
-    for log in all_logs:
-        process_name = log.get('process_name')
-        duration_seconds = log.get('duration_seconds', 0)
-        start_time = log.get('start_time', 0)
+    # Loglar tek geçişte, parça parça akıtılarak işlenir; kategori bellekteki kategori haritasından (get_category_map) eklenir
+    for log in database.iter_usage_logs():
+        process_name = log.process_name
+        duration_seconds = log.duration_seconds or 0
+        start_time = log.start_time or 0
+        category = log.category
 
         if process_name == 'idle' or duration_seconds == 0 or start_time == 0:
             continue
 
         log_datetime = datetime.datetime.fromtimestamp(start_time)
-        category = categories_map.get(process_name, 'Other')
 
         # Toplam kullanım süresi
         total_usage += duration_seconds
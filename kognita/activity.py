@@ -0,0 +1,160 @@
+# kognita/activity.py
+
+import logging
+import os
+import sys
+import threading
+import time
+
+# Giriş dinleyicisi kütüphanesini güvenli şekilde import et
+try:
+    from pynput import mouse, keyboard
+    PYNPUT_AVAILABLE = True
+except ImportError:
+    logging.warning("pynput modülü bulunamadı. Tuş ve tıklama sayaçları tutulmayacak.")
+    PYNPUT_AVAILABLE = False
+
+def _windows_idle_probe():
+    """GetLastInputInfo ile son girişten bu yana geçen saniyeyi döndüren fonksiyon oluşturur."""
+    import ctypes
+    from ctypes import wintypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', wintypes.UINT), ('dwTime', wintypes.DWORD)]
+
+    user32 = ctypes.WinDLL('user32')
+    kernel32 = ctypes.WinDLL('kernel32')
+    kernel32.GetTickCount.restype = wintypes.DWORD
+    info = LASTINPUTINFO(cbSize=ctypes.sizeof(LASTINPUTINFO))
+
+    def idle_seconds():
+        if not user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        # İki sayaç da 32 bittir; 49,7 günde bir başa sarar
+        return ((kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+    return idle_seconds
+
+def _x11_idle_probe():
+    """MIT-SCREEN-SAVER eklentisiyle son girişten bu yana geçen saniyeyi döndüren fonksiyon oluşturur."""
+    from Xlib import display as xdisplay
+    x_display = xdisplay.Display()
+    if not x_display.has_extension('MIT-SCREEN-SAVER'):
+        x_display.close()
+        return None
+    root = x_display.screen().root
+    lock = threading.Lock()
+
+    def idle_seconds():
+        # Sorgu takip ve zamanlayıcı iş parçacıklarından gelebilir; bağlantı paylaşılmaz
+        with lock:
+            return root.screensaver_query_info().idle / 1000.0
+    return idle_seconds
+
+def create_idle_probe():
+    """
+    İşletim sisteminin son giriş zamanını okuyan fonksiyonu döndürür; platform
+    desteklemiyorsa None. Fonksiyon yalnızca çağrıldığında sistem çağrısı yapar.
+    """
+    try:
+        if sys.platform == 'win32':
+            return _windows_idle_probe()
+        if sys.platform.startswith('linux') and os.environ.get('DISPLAY'):
+            return _x11_idle_probe()
+    except Exception as e:
+        logging.warning(f"Sistem son giriş zamanı okunamıyor, giriş olayları kullanılacak: {e}")
+    return None
+
+class InputActivityDetector:
+    """
+    Kullanıcının son giriş zamanını ve tuş/tıklama sayaçlarını tutar.
+    Son giriş zamanı işletim sisteminden yalnızca sorulduğunda okunur; fare
+    hareketleri Python'a hiç gelmez. Sistem desteği yoksa pynput olayları
+    kullanılır ve son giriş zamanı en fazla saniyede bir güncellenir. Tuş ve
+    tıklamalar yalnızca sayılır; on_input geri çağrısı da saniyede bir ile sınırlıdır.
+    """
+
+    # Olay tabanlı güncellemeler arasındaki en kısa süre
+    UPDATE_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, on_input=None, idle_probe=None):
+        self.on_input = on_input
+        self._idle_probe = idle_probe if idle_probe is not None else create_idle_probe()
+        self._last_input_time = time.time()
+        self._last_callback_time = 0.0
+        self.key_count = 0
+        self.click_count = 0
+        # Sayaçlar dinleyici iş parçacıklarında artırılır, takip döngüsünde sıfırlanır
+        self._count_lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def uses_os_idle_time(self):
+        """Son giriş zamanı işletim sisteminden okunuyorsa True."""
+        return self._idle_probe is not None
+
+    def start(self):
+        """Tuş/tıklama (ve gerekirse hareket) dinleyicilerini başlatır."""
+        if not PYNPUT_AVAILABLE:
+            return
+        if self.uses_os_idle_time:
+            mouse_listener = mouse.Listener(on_click=self._on_click)
+        else:
+            mouse_listener = mouse.Listener(on_move=self._on_move, on_click=self._on_click, on_scroll=self._on_scroll)
+        keyboard_listener = keyboard.Listener(on_press=self._on_press)
+        for listener in (mouse_listener, keyboard_listener):
+            listener.daemon = True
+            listener.start()
+            self._listeners.append(listener)
+        logging.info(f"Aktivite dinleyicileri başlatıldı (son giriş zamanı: "
+                     f"{'sistem' if self.uses_os_idle_time else 'giriş olayları'}).")
+
+    def stop(self):
+        """Dinleyicileri durdurur."""
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+
+    def last_input_time(self):
+        """Son kullanıcı girişinin Unix zaman damgasını döndürür."""
+        if self._idle_probe is not None:
+            try:
+                idle_seconds = self._idle_probe()
+                if idle_seconds is not None:
+                    return time.time() - idle_seconds
+            except Exception as e:
+                logging.debug(f"Sistem son giriş zamanı okunamadı: {e}")
+        return self._last_input_time
+
+    def take_counts(self):
+        """Son çağrıdan bu yana sayılan (tuş, tıklama) adetlerini döndürür ve sıfırlar."""
+        with self._count_lock:
+            key_count, click_count = self.key_count, self.click_count
+            self.key_count = self.click_count = 0
+        return key_count, click_count
+
+    def _mark_input(self):
+        """Son giriş zamanını ve on_input geri çağrısını saniyede en fazla bir kez günceller."""
+        now = time.time()
+        if now - self._last_callback_time < self.UPDATE_INTERVAL_SECONDS:
+            return
+        self._last_callback_time = now
+        self._last_input_time = now
+        if self.on_input:
+            self.on_input()
+
+    def _on_move(self, x, y):
+        self._mark_input()
+
+    def _on_scroll(self, x, y, dx, dy):
+        self._mark_input()
+
+    def _on_click(self, x, y, button, pressed):
+        if pressed:
+            with self._count_lock:
+                self.click_count += 1
+            self._mark_input()
+
+    def _on_press(self, key):
+        with self._count_lock:
+            self.key_count += 1
+        self._mark_input()
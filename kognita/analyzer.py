@@ -10,25 +10,11 @@ def get_analysis_data(start_date, end_date):
     Kategori toplamlarını ve toplam süreyi içeren bir sözlük döndürür.
     """
     try:
-        all_logs = database.get_all_usage_logs() # ID'yi de içeren loglar gelir
-        if not all_logs:
-            return defaultdict(int), 0
-            
         start_timestamp = int(start_date.timestamp())
         end_timestamp = int(end_date.timestamp()) # UI'dan gelen end_date zaten kapsayıcı (son saniyeye kadar)
 
-        with database.get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT process_name, category FROM app_categories")
-            categories_map = dict(cursor.fetchall())
-
-        category_totals = defaultdict(int)
-        
-        for log in all_logs:
-            # Sadece ilgili tarih aralığındaki ve 'idle' olmayan logları işle
-            if start_timestamp <= log.get('start_time', 0) <= end_timestamp and log.get('process_name') != 'idle':
-                category = categories_map.get(log.get('process_name'), 'Other')
-                category_totals[category] += log.get('duration_seconds', 0)
+        # Toplama SQL tarafında, zaman indeksi üzerinden yapılır
+        category_totals = defaultdict(int, database.get_category_totals(start_timestamp, end_timestamp))
     
     except Exception as e:
         logging.error(f"Analiz verisi alınırken hata: {e}", exc_info=True)
@@ -41,7 +27,7 @@ def get_analysis_data(start_date, end_date):
 def get_weekly_comparison():
     """Mevcut haftanın verilerini en iyi kategoriler için önceki haftayla karşılaştırır."""
     today = datetime.datetime.now()
-    start_of_this_week = today - datetime.timedelta(days=today.weekday())
+    start_of_this_week = (today - datetime.timedelta(days=today.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
     
     end_of_today = today.replace(hour=23, minute=59, second=59, microsecond=999999) 
     
@@ -64,34 +50,45 @@ def get_weekly_comparison():
         }
     return comparison
 
-def get_hourly_activity():
-    """Son 7 günün saatlik aktivite ortalamasını hesaplar."""
+def get_hourly_activity(num_days=7):
+    """Son N günün (bugün dahil) saatlik aktivite ortalamasını hesaplar."""
     now = datetime.datetime.now()
-    seven_days_ago = now - datetime.timedelta(days=7)
+    start_date = (now - datetime.timedelta(days=num_days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
     
     hourly_activity = defaultdict(int)
     
     try:
-        all_logs = database.get_all_usage_logs()
-        start_timestamp = int(seven_days_ago.timestamp())
-        end_timestamp = int(now.timestamp()) # Bugünün mevcut anına kadar
-
-        for log in all_logs:
-            # Log'un başlangıç zamanı aralık içinde mi ve idle değil mi?
-            if start_timestamp <= log.get('start_time', 0) <= end_timestamp and log.get('process_name') != 'idle':
-                log_datetime = datetime.datetime.fromtimestamp(log['start_time'])
-                hour = log_datetime.hour
-                hourly_activity[hour] += log.get('duration_seconds', 0)
+        # Oturumlar yazılırken saat sınırlarından bölündüğü için özet tablodan okunur
+        hourly_activity.update(database.get_hourly_totals(int(start_date.timestamp()), int(now.timestamp())))
         
-        # Her saat için ortalamayı 7 güne bölerek al
+        # Her saat için ortalamayı gün sayısına bölerek al
         for hour in hourly_activity:
-            hourly_activity[hour] /= 7 
+            hourly_activity[hour] /= num_days 
 
     except Exception as e:
         logging.error(f"Saatlik veri alınırken hata: {e}", exc_info=True)
 
     return hourly_activity
 
+def get_weekly_heatmap(num_weeks=4):
+    """
+    Son N haftanın haftanın günü x saat (7x24) ortalama aktivite matrisini döndürür.
+    Dönüş: heatmap[weekday][hour] = ortalama saniye (weekday 0=Pazartesi).
+    """
+    now = datetime.datetime.now()
+    start_date = (now - datetime.timedelta(days=num_weeks * 7 - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    heatmap = [[0] * 24 for _ in range(7)]
+    
+    try:
+        totals = database.get_weekday_hourly_totals(int(start_date.timestamp()), int(now.timestamp()))
+        for (weekday, hour), seconds in totals.items():
+            heatmap[weekday][hour] = seconds / num_weeks
+    except Exception as e:
+        logging.error(f"Haftalık ısı haritası verisi alınırken hata: {e}", exc_info=True)
+
+    return heatmap
+
 def define_user_persona(category_totals, total_duration):
     """Kategori kullanım yüzdelerine göre bir 'dijital persona' tanımlar."""
     if not category_totals or total_duration == 0:
@@ -125,21 +122,11 @@ def get_daily_average_usage_by_category(num_days=7):
     start_date_overall = (now - datetime.timedelta(days=num_days)).replace(hour=0, minute=0, second=0, microsecond=0)
     end_date_overall = now.replace(hour=23, minute=59, second=59, microsecond=999999) # Bugünün sonu
 
-    all_logs = database.get_all_usage_logs()
-    
     daily_category_totals = defaultdict(lambda: defaultdict(int)) 
 
-    with database.get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT process_name, category FROM app_categories")
-        categories_map = dict(cursor.fetchall())
-
-    for log in all_logs:
-        log_datetime = datetime.datetime.fromtimestamp(log.get('start_time', 0))
-        if start_date_overall <= log_datetime <= end_date_overall and log.get('process_name') != 'idle':
-            log_date_str = log_datetime.strftime('%Y-%m-%d')
-            category = categories_map.get(log.get('process_name'), 'Other')
-            daily_category_totals[log_date_str][category] += log.get('duration_seconds', 0)
+    rows = database.get_daily_category_totals(int(start_date_overall.timestamp()), int(end_date_overall.timestamp()))
+    for log_date_str, category, duration in rows:
+        daily_category_totals[log_date_str][category] += duration
 
     avg_category_usage = defaultdict(int)
     
@@ -160,24 +147,15 @@ def get_most_productive_day(productive_categories=['Office', 'Development', 'Com
     start_date = (now - datetime.timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
     end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-    all_logs = database.get_all_usage_logs()
-    
     daily_productive_time = defaultdict(int) 
 
-    with database.get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT process_name, category FROM app_categories")
-        categories_map = dict(cursor.fetchall())
-
     weekday_names = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
     
-    for log in all_logs:
-        log_datetime = datetime.datetime.fromtimestamp(log.get('start_time', 0))
-        if start_date <= log_datetime <= end_date and log.get('process_name') != 'idle':
-            category = categories_map.get(log.get('process_name'), 'Other')
-            if category in productive_categories:
-                weekday_index = log_datetime.weekday() 
-                daily_productive_time[weekday_names[weekday_index]] += log.get('duration_seconds', 0)
+    rows = database.get_daily_category_totals(int(start_date.timestamp()), int(end_date.timestamp()))
+    for log_date_str, category, duration in rows:
+        if category in productive_categories:
+            weekday_index = datetime.datetime.strptime(log_date_str, '%Y-%m-%d').weekday() 
+            daily_productive_time[weekday_names[weekday_index]] += duration
 
     if not daily_productive_time:
         return "Yeterli Veri Yok", 0
@@ -196,15 +174,8 @@ def get_app_usage_over_time(process_name, num_days=30):
     start_date_overall = (now - datetime.timedelta(days=num_days)).replace(hour=0, minute=0, second=0, microsecond=0)
     end_date_overall = now.replace(hour=23, minute=59, second=59, microsecond=999999) # Bugünün sonu
 
-    all_logs = database.get_all_usage_logs()
-    
-    daily_usage = defaultdict(int)
-
-    for log in all_logs:
-        log_datetime = datetime.datetime.fromtimestamp(log.get('start_time', 0))
-        if start_date_overall <= log_datetime <= end_date_overall and log.get('process_name', '').lower() == process_name.lower():
-            log_date_str = log_datetime.strftime('%Y-%m-%d')
-            daily_usage[log_date_str] += log.get('duration_seconds', 0)
+    daily_usage = defaultdict(int, database.get_process_daily_totals(
+        process_name, int(start_date_overall.timestamp()), int(end_date_overall.timestamp())))
     
     return daily_usage
 
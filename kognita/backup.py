@@ -0,0 +1,288 @@
+# kognita/backup.py
+
+import datetime
+import gzip
+import json
+import logging
+import lzma
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from . import database
+
+# Sıkıştırma yöntemi -> (dosya uzantısı, açma fonksiyonu)
+COMPRESSIONS = {
+    'lzma': ('.xz', lzma.open),  # daha küçük dosya
+    'zlib': ('.gz', gzip.open),  # daha hızlı
+}
+_OPENERS_BY_SUFFIX = {extension: opener for extension, opener in COMPRESSIONS.values()}
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+def default_backup_dir():
+    """Varsayılan yedek klasörünü döndürür (ana veritabanının yanında)."""
+    return database.DB_FILE.parent / f"{database.DB_FILE.stem}_backups"
+
+def list_backups(backup_dir=None):
+    """Tamamlanmış yedekleri yeniden eskiye [(meta_dosyası, meta)] olarak döndürür."""
+    backup_dir = Path(backup_dir or default_backup_dir())
+    backups = []
+    for meta_path in backup_dir.glob(f"{database.DB_FILE.stem}_*.json"):
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Yedek bilgisi okunamadı ({meta_path.name}): {e}")
+            continue
+        backups.append((meta_path, meta))
+    backups.sort(key=lambda item: item[1].get('created_at', 0), reverse=True)
+    return backups
+
+def latest_backup_time(backup_dir=None):
+    """En yeni yedeğin zaman damgasını, yedek yoksa None döndürür."""
+    backups = list_backups(backup_dir)
+    return backups[0][1].get('created_at') if backups else None
+
+def _compress_file(source_path, target_path, compression):
+    """Dosyayı parça parça sıkıştırarak yazar ve sıkıştırılmış boyutu döndürür."""
+    _, opener = COMPRESSIONS[compression]
+    partial_path = target_path.with_name(target_path.name + '.partial')
+    try:
+        with open(source_path, 'rb') as source, opener(partial_path, 'wb') as target:
+            shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+        os.replace(partial_path, target_path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+    return target_path.stat().st_size
+
+def _decompress_file(source_path, target_path):
+    """Sıkıştırılmış (veya düz .db) yedeği target_path'e açar."""
+    opener = _OPENERS_BY_SUFFIX.get(source_path.suffix, open)
+    with opener(source_path, 'rb') as source, open(target_path, 'wb') as target:
+        shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+
+def _meta_path_for(snapshot_path):
+    """Anlık görüntü dosyasının ('<ad>.db.xz') meta dosyasının ('<ad>.json') yolunu döndürür."""
+    name = snapshot_path.name
+    return snapshot_path.with_name(name[:name.rindex('.db')] + '.json' if '.db' in name else name + '.json')
+
+def _archive_manifest_files(conn):
+    """Veritabanı kopyasının manifest'indeki arşiv dosyalarını [(dosya_adı, arşivlenme_zamanı)] olarak döndürür."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='archive_manifest'").fetchone() is None:
+        return []
+    return conn.execute("SELECT file_name, archived_at FROM archive_manifest").fetchall()
+
+def copy_database(target_path, pages_per_step=1024, pause_seconds=0.02, stop_event=None):
+    """
+    Çalışan veritabanının tutarlı bir anlık görüntüsünü sqlite3 backup API'si
+    ile target_path'e kopyalar ve quick_check ile doğrular. Kopyalama
+    pages_per_step sayfalık adımlarla yapılır, adımlar arasında pause_seconds
+    beklenir. Dönüş: (sayfa sayısı, adım sayısı, şema sürümü, manifest'teki arşivler)
+    """
+    source = target = None
+    try:
+        source = sqlite3.connect(str(database.DB_FILE))
+        source.execute("PRAGMA query_only = ON")
+        # Açık okuma transaction'ı anlık görüntüyü sabitler: adımlar arasında yapılan
+        # yazmalar WAL'da kalır ve kopyalamayı baştan başlatmaz
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        target = sqlite3.connect(str(target_path))
+
+        steps = 0
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+            if stop_event is not None and stop_event.is_set():
+                raise InterruptedError("Yedekleme durduruldu")
+            time.sleep(pause_seconds)
+
+        source.backup(target, pages=pages_per_step, progress=progress)
+        source.rollback()
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        schema_version = target.execute("PRAGMA user_version").fetchone()[0]
+        check = target.execute("PRAGMA quick_check").fetchone()[0]
+        archives = _archive_manifest_files(target)
+        if check != 'ok':
+            raise sqlite3.DatabaseError(f"Yedek kopyası doğrulanamadı: {check}")
+        return page_count, steps, schema_version, archives
+    finally:
+        for conn in (source, target):
+            if conn is not None:
+                conn.close()
+
+def create_backup(backup_dir=None, keep=7, compression='lzma', pages_per_step=1024, pause_seconds=0.02, stop_event=None):
+    """
+    Çalışan veritabanının tutarlı bir anlık görüntüsünü sqlite3 backup API'si
+    ile alır, sıkıştırır ve en yeni `keep` yedeği tutar (0 = hepsini tut).
+    Kopyalama pages_per_step sayfalık adımlarla yapılır ve adımlar arasında
+    pause_seconds beklenir; tracker yazmaları beklemez. Arşiv ayları bir kez
+    yazıldıktan sonra değişmediğinden her biri yalnızca bir kez yedeklenir.
+    Oluşan yedeğin yolunu, hata durumunda None döndürür.
+    """
+    if compression not in COMPRESSIONS:
+        logging.error(f"Bilinmeyen yedek sıkıştırma yöntemi: {compression}")
+        return None
+
+    backup_dir = Path(backup_dir or default_backup_dir())
+    started = time.perf_counter()
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    extension, _ = COMPRESSIONS[compression]
+    base_name = f"{database.DB_FILE.stem}_{stamp}"
+    snapshot_name = f"{base_name}.db{extension}"
+    copy_path = backup_dir / f"{base_name}.db.partial"
+    try:
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        page_count, steps, schema_version, archives = copy_database(copy_path, pages_per_step, pause_seconds, stop_event)
+        copy_seconds = time.perf_counter() - started
+
+        raw_bytes = copy_path.stat().st_size
+        compressed_bytes = _compress_file(copy_path, backup_dir / snapshot_name, compression)
+        copy_path.unlink()
+
+        archive_files, archive_bytes = {}, 0
+        archive_backup_dir = backup_dir / "archive"
+        for file_name, archived_at in archives:
+            archive_backup_name = f"{Path(file_name).stem}_{archived_at}.db{extension}"
+            archive_backup_path = archive_backup_dir / archive_backup_name
+            if not archive_backup_path.exists():
+                try:
+                    archive_backup_dir.mkdir(exist_ok=True)
+                    archive_bytes += _compress_file(database.get_archive_dir() / file_name, archive_backup_path, compression)
+                except OSError as e:
+                    logging.warning(f"Arşiv dosyası yedeklenemedi ({file_name}): {e}")
+                    continue
+            archive_files[file_name] = archive_backup_name
+
+        elapsed = time.perf_counter() - started
+        meta = {
+            'created_at': int(time.time()),
+            'snapshot': snapshot_name,
+            'compression': compression,
+            'schema_version': schema_version,
+            'pages': page_count,
+            'raw_bytes': raw_bytes,
+            'compressed_bytes': compressed_bytes,
+            'archives': archive_files,
+            'seconds': round(elapsed, 2),
+        }
+        # Meta dosyası en son yazılır; yarıda kalan yedekler listede görünmez
+        (backup_dir / f"{base_name}.json").write_text(json.dumps(meta, indent=2), encoding='utf-8')
+        removed = rotate_backups(backup_dir, keep)
+
+        logging.info(f"Yedek alındı: {snapshot_name}, {page_count} sayfa / {steps} adım, "
+                     f"{raw_bytes / (1024 * 1024):.1f} MB -> {compressed_bytes / (1024 * 1024):.1f} MB "
+                     f"(yeni arşiv yedekleri {archive_bytes / (1024 * 1024):.1f} MB), "
+                     f"kopyalama {copy_seconds:.2f} sn, toplam {elapsed:.2f} sn, {removed} eski yedek silindi.")
+        return backup_dir / snapshot_name
+    except Exception as e:
+        logging.error(f"Yedekleme hatası: {e}")
+        return None
+    finally:
+        if copy_path.exists():
+            copy_path.unlink()
+
+def rotate_backups(backup_dir=None, keep=7):
+    """
+    En yeni `keep` yedek dışındakileri ve hiçbir yedeğin başvurmadığı arşiv
+    yedeklerini siler (0 = hepsini tut). Silinen yedek sayısını döndürür.
+    """
+    if keep <= 0:
+        return 0
+    backup_dir = Path(backup_dir or default_backup_dir())
+    backups = list_backups(backup_dir)
+    removed = 0
+    for meta_path, meta in backups[keep:]:
+        for path in (backup_dir / meta.get('snapshot', ''), meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        removed += 1
+
+    referenced = {name for _, meta in backups[:keep] for name in meta.get('archives', {}).values()}
+    archive_backup_dir = backup_dir / "archive"
+    if archive_backup_dir.exists():
+        for path in archive_backup_dir.iterdir():
+            if path.name not in referenced:
+                path.unlink()
+    return removed
+
+def _verify_database(path):
+    """
+    Veritabanı dosyasını PRAGMA integrity_check ile doğrular.
+    Dönüş: (sorun listesi (boş = sağlam), manifest'teki arşiv dosyaları)
+    """
+    # Salt okunur açılan WAL veritabanları -wal/-shm dosyalarını geride bırakır; kopya zaten geçicidir
+    conn = sqlite3.connect(str(path))
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        archives = [file_name for file_name, _ in _archive_manifest_files(conn)]
+    except sqlite3.DatabaseError as e:
+        return [str(e)], []
+    finally:
+        conn.close()
+    return ([] if result == ['ok'] else result), archives
+
+def restore_backup(snapshot_path):
+    """
+    Yedeği geçici dosyalara açar, PRAGMA integrity_check ile doğrular ve
+    yalnızca doğrulama başarılıysa veritabanının (ve arşiv aylarının) yerine
+    koyar. Mevcut veritabanı '.pre-restore' uzantısıyla saklanır. Uygulama
+    kapalıyken çalıştırılmalıdır. Başarılıysa True döndürür.
+    """
+    snapshot_path = Path(snapshot_path)
+    started = time.perf_counter()
+    db_file = database.DB_FILE
+    staged = []  # (geçici dosya, hedef dosya)
+    try:
+        meta_path = _meta_path_for(snapshot_path)
+        meta = json.loads(meta_path.read_text(encoding='utf-8')) if meta_path.exists() else {}
+
+        restored_path = db_file.with_name(db_file.name + '.restore')
+        _decompress_file(snapshot_path, restored_path)
+        staged.append((restored_path, db_file))
+        problems, archives = _verify_database(restored_path)
+        if problems:
+            logging.error(f"Yedek bütünlük denetimini geçemedi ({snapshot_path.name}): {'; '.join(problems[:5])}")
+            return False
+
+        archive_dir = database.get_archive_dir()
+        for file_name in archives:
+            archive_backup_name = meta.get('archives', {}).get(file_name)
+            if archive_backup_name is None:
+                if (archive_dir / file_name).exists():
+                    logging.warning(f"{file_name} için arşiv yedeği yok, mevcut arşiv dosyası kullanılacak.")
+                    continue
+                logging.error(f"Geri yükleme iptal edildi: {file_name} arşivinin yedeği bulunamadı.")
+                return False
+            archive_dir.mkdir(exist_ok=True)
+            restored_archive = archive_dir / f"{file_name}.restore"
+            _decompress_file(snapshot_path.parent / "archive" / archive_backup_name, restored_archive)
+            staged.append((restored_archive, archive_dir / file_name))
+            problems, _ = _verify_database(restored_archive)
+            if problems:
+                logging.error(f"Arşiv yedeği bütünlük denetimini geçemedi ({archive_backup_name}): {'; '.join(problems[:5])}")
+                return False
+
+        # Son bağlantı kapanırken WAL ana dosyaya aktarılır; kalan WAL/SHM dosyaları eski
+        # veritabanıyla birlikte taşınır, aksi halde geri yüklenen dosyaya uygulanırlar
+        database.close_all_connections()
+        for suffix in ('', '-wal', '-shm'):
+            current = Path(f"{db_file}{suffix}")
+            if current.exists():
+                os.replace(current, Path(f"{db_file}.pre-restore{suffix}"))
+        for staged_path, target_path in staged:
+            os.replace(staged_path, target_path)
+
+        logging.info(f"Yedek geri yüklendi: {snapshot_path.name} ({len(staged) - 1} arşiv ayı), "
+                     f"{time.perf_counter() - started:.2f} sn sürdü. Önceki veritabanı: {db_file.name}.pre-restore")
+        return True
+    except Exception as e:
+        logging.error(f"Geri yükleme hatası: {e}")
+        return False
+    finally:
+        for staged_path, _ in staged:
+            if staged_path.exists():
+                staged_path.unlink()
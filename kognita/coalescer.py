@@ -0,0 +1,150 @@
+# kognita/coalescer.py
+
+import logging
+import re
+
+# Başlıktaki sayaç, saat, ilerleme ve "kaydedilmedi" işaretleri; ayarlardan değiştirilebilir
+DEFAULT_TITLE_NORMALIZATION_RULES = [
+    r"\(\d+\+?\)",
+    r"\[\d+\+?\]",
+    r"\b\d{1,2}:\d{2}(:\d{2})?\b",
+    r"\b\d{1,3}([.,]\d+)?\s?%",
+    r"^[●•*]\s*",
+]
+
+# Normalleştirme sonrası başta ve sonda kalan ayraçlar
+_SEPARATOR_CHARS = " -–—|·:"
+_WHITESPACE = re.compile(r"\s+")
+
+class SessionCoalescer:
+    """
+    Takip döngüsünün oturumlarını yazıcıya gitmeden önce birleştirir. Aynı
+    işlemde yalnızca başlığı değişen ardışık oturumlar, başlıkların biri
+    coalesce_window_seconds'tan kısa sürdüyse veya normalleştirilmiş başlıklar
+    aynıysa tek kayda indirilir. Farklı başlıklar birleştiyse kayda en uzun
+    süren başlığın normalleştirilmiş hali, aksi halde başlığın kendisi yazılır.
+    title_detail_processes listesindeki işlemlerin başlıkları normalleştirilmez
+    ve farklı başlıklar hiç birleştirilmez. Bekleyen kayıt, süren oturumla artık
+    birleşemeyeceği anlaşıldığında (poll) hemen yazıcıya gönderilir.
+    """
+
+    # Birleştirilecek oturumlar arasındaki en uzun boşluk
+    MAX_GAP_SECONDS = 5
+    # Birleştirilmeyen işlem adları
+    _UNMERGED_PROCESSES = ('idle', 'unknown')
+
+    def __init__(self, submit, config):
+        self._submit = submit
+        self._pending = None
+        self.sessions_in = 0
+        self.rows_out = 0
+        self.update_settings(config)
+
+    def update_settings(self, config):
+        """Birleştirme ayarlarını ve başlık normalleştirme kurallarını yapılandırmadan okur."""
+        self.enabled = config.get('coalesce_sessions', True)
+        self.window_seconds = config.get('coalesce_window_seconds', 30)
+        self.max_session_seconds = config.get('coalesce_max_session_seconds', 1800)
+        self.detail_processes = {name.lower() for name in config.get('title_detail_processes', [])}
+        rules = []
+        for pattern in config.get('title_normalization_rules', DEFAULT_TITLE_NORMALIZATION_RULES):
+            try:
+                rules.append(re.compile(pattern))
+            except re.error as e:
+                logging.error(f"Geçersiz başlık normalleştirme kuralı atlandı ({pattern}): {e}")
+        self._rules = rules
+
+    def normalize_title(self, title):
+        """Başlığa normalleştirme kurallarını uygular; geriye bir şey kalmazsa başlığın kendisini döndürür."""
+        if not title:
+            return title
+        normalized = title
+        for rule in self._rules:
+            normalized = rule.sub('', normalized)
+        normalized = _WHITESPACE.sub(' ', normalized).strip(_SEPARATOR_CHARS)
+        return normalized or title
+
+    def add(self, process_name, title, start_time, end_time, key_count=0, click_count=0):
+        """Biten bir oturumu alır; birleştirilemiyorsa bekleyen kaydı yazıcıya gönderir."""
+        self.sessions_in += 1
+        seconds = end_time - start_time
+        if not self.enabled:
+            self.flush()
+            self._emit(process_name, title, start_time, end_time, seconds, key_count, click_count)
+            return
+
+        normalized = self._title_key(process_name, title)
+        pending = self._pending
+        if pending is not None and self._can_merge(pending, process_name, normalized, start_time, seconds):
+            pending['mixed_titles'] = pending['mixed_titles'] or title != pending['title']
+            pending['end_time'] = max(pending['end_time'], end_time)
+            pending['seconds'] += seconds
+            pending['key_count'] += key_count
+            pending['click_count'] += click_count
+            pending['titles'][normalized] = pending['titles'].get(normalized, 0) + seconds
+            return
+
+        self.flush()
+        self._pending = {
+            'process_name': process_name,
+            'start_time': start_time,
+            'end_time': end_time,
+            'seconds': seconds,
+            'key_count': key_count,
+            'click_count': click_count,
+            'title': title,
+            'mixed_titles': False,
+            'titles': {normalized: seconds}
+        }
+
+    def poll(self, process_name, title, session_start, now):
+        """
+        Süren oturumla (process_name, title, session_start'tan beri) artık
+        birleşemeyecek bekleyen kaydı yazıcıya gönderir. Takip döngüsü her
+        okumada çağırır; kayıtlar birleştirme penceresi dolunca yazılır.
+        """
+        pending = self._pending
+        if pending is not None and not self._can_merge(pending, process_name, self._title_key(process_name, title),
+                                                       session_start, now - session_start):
+            self.flush()
+
+    def _title_key(self, process_name, title):
+        """Birleştirmede karşılaştırılan başlığı döndürür; ayrıntısı korunan işlemlerde başlığın kendisi."""
+        if process_name in self._UNMERGED_PROCESSES or process_name in self.detail_processes:
+            return title
+        return self.normalize_title(title)
+
+    def _can_merge(self, pending, process_name, normalized, start_time, seconds):
+        """Yeni oturum bekleyen kayda eklenebiliyorsa True döndürür."""
+        if pending['process_name'] != process_name or start_time - pending['end_time'] > self.MAX_GAP_SECONDS:
+            return False
+        if pending['seconds'] + seconds > self.max_session_seconds:
+            return False
+        if normalized in pending['titles']:
+            return True
+        if process_name in self._UNMERGED_PROCESSES or process_name in self.detail_processes:
+            return False
+        # Kısa süren başlık (sayaç, bildirim rozeti) komşu oturuma katılır
+        return seconds < self.window_seconds or pending['seconds'] < self.window_seconds
+
+    def flush(self):
+        """Bekleyen birleştirilmiş kaydı yazıcıya gönderir."""
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        title = pending['title']
+        if pending['mixed_titles']:
+            titles = pending['titles']
+            title = max(titles, key=titles.get)
+        self._emit(pending['process_name'], title, pending['start_time'], pending['end_time'],
+                   pending['seconds'], pending['key_count'], pending['click_count'])
+
+    def _emit(self, process_name, title, start_time, end_time, seconds, key_count, click_count):
+        """Kaydı yazıcıya gönderir; 1 saniyeden kısa kayıtlar atlanır."""
+        duration = int(seconds)
+        if duration < 1:
+            return
+        self._submit(process_name, title, start_time, end_time, duration, key_count, click_count)
+        self.rows_out += 1
+        if process_name not in self._UNMERGED_PROCESSES:
+            logging.info(f"Loglandı: {process_name} - {duration}s - {(title or '')[:40]}")
@@ -4,6 +4,7 @@ import json
 import os
 import logging
 from pathlib import Path
+from .coalescer import DEFAULT_TITLE_NORMALIZATION_RULES
 
 # Proje kök dizinini belirle
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -29,7 +30,31 @@ class ConfigManager:
                 },
                 "run_on_startup": False,
                 "enable_sentry_reporting": False,
-                "data_retention_days": 365
+                "data_retention_days": 365,
+                "log_flush_interval_seconds": 30,
+                "log_flush_batch_size": 50,
+                "storage_mode": "plain",
+                "downsample_hourly_after_days": 30,
+                "downsample_daily_after_days": 180,
+                "archive_after_months": 3,
+                "backup_interval_hours": 24,
+                "backup_keep_count": 7,
+                "backup_compression": "lzma",
+                "backup_dir": "",
+                "sync_dir": "",
+                "sync_interval_hours": 6,
+                "tracker_min_poll_seconds": 0.5,
+                "tracker_max_poll_seconds": 15,
+                "tracker_idle_poll_seconds": 10,
+                "tracker_event_poll_seconds": 60,
+                "tracker_poll_backoff": 2.0,
+                "battery_saver": "auto",
+                "battery_poll_multiplier": 3,
+                "coalesce_sessions": True,
+                "coalesce_window_seconds": 30,
+                "coalesce_max_session_seconds": 1800,
+                "title_detail_processes": [],
+                "title_normalization_rules": list(DEFAULT_TITLE_NORMALIZATION_RULES)
             },
             "app_state": {
                 "first_run": True
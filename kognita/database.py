@@ -6,7 +6,16 @@ from pathlib import Path
 import csv
 import datetime
 import hashlib
+import heapq
+import itertools
 import json
+import socket
+import threading
+import time
+import uuid
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager, ExitStack
 
 # Şifreleme kütüphanelerini güvenli şekilde import et
 try:
@@ -104,203 +113,783 @@ def decrypt_data(encrypted_data):
                 return str(encrypted_data)
         return str(encrypted_data)
 
-# --- Veritabanı Fonksiyonları ---
+def encrypt_bytes(raw_bytes):
+    """Ham byte verisini AES ile şifreler; şifreleme yoksa veriyi olduğu gibi döndürür."""
+    if not CRYPTO_AVAILABLE:
+        return raw_bytes
+    cipher = AES.new(ENCRYPTION_KEY, AES.MODE_CBC)
+    return cipher.iv + cipher.encrypt(pad(raw_bytes, AES.block_size))
+
+def decrypt_bytes(encrypted_bytes):
+    """encrypt_bytes ile şifrelenmiş veriyi çözer."""
+    if not CRYPTO_AVAILABLE:
+        return encrypted_bytes
+    iv = encrypted_bytes[:AES.block_size]
+    cipher = AES.new(ENCRYPTION_KEY, AES.MODE_CBC, iv=iv)
+    return unpad(cipher.decrypt(encrypted_bytes[AES.block_size:]), AES.block_size)
+
+# --- Bağlantı Yönetimi ---
+# Tüm yazma işlemleri tek bir uzun ömürlü yazıcı bağlantısı üzerinden (kilitle
+# sıralanarak) yapılır; okumalar iş parçacığı başına açılan uzun ömürlü okuyucu
+# bağlantılarını kullanır. WAL modunda okuyucular yazıcıyı beklemez.
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA synchronous = NORMAL",   # WAL ile güvenli, her commit'te fsync yapmaz
+    "PRAGMA cache_size = -8000",     # ~8 MB sayfa önbelleği
+    "PRAGMA mmap_size = 67108864",   # 64 MB bellek eşlemeli okuma
+    "PRAGMA temp_store = MEMORY",
+)
+
+_write_lock = threading.RLock()
+_writer_conn = None
+_write_depth = 0
+_reader_local = threading.local()
+_reader_conns = {}
+_registry_lock = threading.Lock()
+
+def _open_connection(read_only=False):
+    """Ayarlanmış pragmalarla yeni bir SQLite bağlantısı açar."""
+    conn = sqlite3.connect(str(DB_FILE), check_same_thread=False)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+def _get_writer_connection():
+    """Yazıcı bağlantısını (gerekirse açarak) döndürür. _write_lock altında çağrılmalıdır."""
+    global _writer_conn
+    if _writer_conn is None:
+        conn = _open_connection()
+        # Yeni veritabanlarında silinen sayfalar incremental_vacuum ile dosyaya iade edilebilir
+        # (mevcut dosyalarda ayar bir sonraki VACUUM ile etkinleşir)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if str(journal_mode).lower() != 'wal':
+            logging.warning(f"WAL modu etkinleştirilemedi, journal_mode={journal_mode}")
+        _writer_conn = conn
+    return _writer_conn
 
 def get_db_connection():
-    """Standart SQLite veritabanı bağlantısı kurar."""
-    try:
-        conn = sqlite3.connect(str(DB_FILE))
-        conn.execute("PRAGMA foreign_keys = ON")  # Foreign key constraints etkinleştir
+    """Çağıran iş parçacığına ait uzun ömürlü, salt okunur veritabanı bağlantısını döndürür."""
+    conn = getattr(_reader_local, 'conn', None)
+    if conn is not None:
         return conn
+    try:
+        # WAL modunun okuyuculardan önce ayarlandığından emin ol
+        with _write_lock:
+            _get_writer_connection()
+        conn = _open_connection(read_only=True)
     except sqlite3.Error as e:
         logging.error(f"Database connection error: {e}")
         return None
 
+    with _registry_lock:
+        alive_threads = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in _reader_conns if i not in alive_threads]:
+            try:
+                _reader_conns.pop(ident).close()
+            except sqlite3.Error:
+                pass
+        _reader_conns[threading.get_ident()] = conn
+    _reader_local.conn = conn
+    return conn
+
+@contextmanager
+def write_transaction():
+    """
+    Yazıcı bağlantısını kilitleyerek bir yazma işlemi (transaction) açar.
+    Blok başarıyla biterse commit, hata olursa rollback yapılır. İç içe
+    kullanımda yalnızca en dıştaki blok commit eder.
+    """
+    global _write_depth
+    with _write_lock:
+        try:
+            conn = _get_writer_connection()
+        except sqlite3.Error as e:
+            logging.error(f"Database connection error: {e}")
+            conn = None
+        if conn is None:
+            yield None
+            return
+
+        _write_depth += 1
+        try:
+            yield conn
+            if _write_depth == 1:
+                conn.commit()
+        except BaseException:
+            if _write_depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            _write_depth -= 1
+
+def close_thread_connection():
+    """Çağıran iş parçacığının okuyucu bağlantısını kapatır (arka plan iş parçacıkları biterken çağrılır)."""
+    conn = getattr(_reader_local, 'conn', None)
+    if conn is None:
+        return
+    _reader_local.conn = None
+    with _registry_lock:
+        _reader_conns.pop(threading.get_ident(), None)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def close_all_connections():
+    """
+    Açık okuyucu ve yazıcı bağlantılarını kapatır (uygulama çıkışında, arka
+    plan iş parçacıkları durdurulduktan sonra çağrılır). Hâlâ çalışan bir iş
+    parçacığının okuyucusu kapatılmaz; o bağlantıyı iş parçacığı kendisi kapatır.
+    """
+    global _writer_conn
+    close_thread_connection()
+    with _registry_lock:
+        alive_threads = {t.ident for t in threading.enumerate()}
+        readers = [_reader_conns.pop(ident) for ident in list(_reader_conns) if ident not in alive_threads]
+        still_open = len(_reader_conns)
+    for conn in readers:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    if still_open:
+        logging.warning(f"{still_open} okuyucu bağlantısı, iş parçacıkları hâlâ çalıştığı için açık bırakıldı.")
+
+    with _write_lock:
+        if _writer_conn is not None:
+            try:
+                _writer_conn.execute("PRAGMA optimize")
+                _writer_conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"Veritabanı bağlantısı kapatılırken hata: {e}")
+            _writer_conn = None
+        _clear_intern_cache()
+    logging.info("Veritabanı bağlantıları kapatıldı.")
+
+# --- Şema Sürümleme (Migration) Fonksiyonları ---
+# Her migration (sürüm, açıklama, fonksiyon) olarak SCHEMA_MIGRATIONS listesine
+# eklenir; uygulanan son sürüm PRAGMA user_version'da tutulur. Şema güncelse
+# başlangıçta hiçbir DDL çalıştırılmaz. Sürümü 0 olan (migration öncesi)
+# veritabanlarında adımlar mevcut tablolarla uyumlu çalışır.
+
+def _table_exists(conn, table_name):
+    """Tablonun veritabanında olup olmadığını döndürür."""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone() is not None
+
+def _create_legacy_usage_view(conn):
+    """
+    Sürüm 6 öncesi (metin sütunlu) usage_logs için usage_log_entries görünümünü
+    oluşturur; özet yeniden oluşturma fonksiyonları her şema sürümünde çalışır.
+    """
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS usage_log_entries AS
+        SELECT id, process_name, window_title, start_time, end_time, duration_seconds, timestamp,
+               1 AS session_count, 1 AS device_id
+        FROM usage_logs""")
+
+def _migrate_legacy_usage_log(conn):
+    """Eski şifreli usage_log tablosundaki kayıtları toplu olarak usage_logs'a taşır."""
+    skipped = 0
+
+    def decoded_rows():
+        nonlocal skipped
+        for (encrypted_data,) in conn.execute("SELECT encrypted_data FROM usage_log"):
+            try:
+                log_data = json.loads(decrypt_data(encrypted_data))
+            except Exception:
+                skipped += 1
+                continue
+            start_time = log_data.get('start_time', 0)
+            yield (log_data.get('process_name', 'unknown'), log_data.get('window_title', ''),
+                   start_time, log_data.get('end_time', 0), log_data.get('duration_seconds', 0),
+                   start_time)  # timestamp olarak start_time kullan
+
+    conn.executemany("""
+        INSERT INTO usage_logs (process_name, window_title, start_time, end_time, duration_seconds, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)""", decoded_rows())
+    if skipped:
+        logging.error(f"Migration sırasında {skipped} kayıt çözülemedi ve atlandı.")
+    conn.execute("DROP TABLE usage_log")
+
+def _migration_001_base_schema(conn):
+    """Temel tablolar, indeksler ve eski usage_log tablosunun taşınması."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS usage_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            process_name TEXT NOT NULL,
+            window_title TEXT,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER NOT NULL,
+            duration_seconds INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL,
+            encrypted_data BLOB
+        )""")
+
+    if _table_exists(conn, 'usage_log'):
+        logging.info("Eski usage_log tablosu bulundu, migration yapılıyor...")
+        _migrate_legacy_usage_log(conn)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS app_categories (
+            process_name TEXT PRIMARY KEY,
+            category TEXT NOT NULL
+        )""")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT, 
+            process_name TEXT, 
+            goal_type TEXT NOT NULL, 
+            time_limit_minutes INTEGER, 
+            start_time_of_day TEXT, 
+            end_time_of_day TEXT,
+            created_at INTEGER DEFAULT (strftime('%s', 'now')),
+            UNIQUE(category, goal_type, process_name, start_time_of_day, end_time_of_day)
+        )""")
+
+    # Eski goals tablolarına sütun eklemeleri
+    columns = [col[1] for col in conn.execute("PRAGMA table_info(goals)")]
+    if 'process_name' not in columns:
+        conn.execute("ALTER TABLE goals ADD COLUMN process_name TEXT")
+    if 'start_time_of_day' not in columns:
+        conn.execute("ALTER TABLE goals ADD COLUMN start_time_of_day TEXT")
+    if 'end_time_of_day' not in columns:
+        conn.execute("ALTER TABLE goals ADD COLUMN end_time_of_day TEXT")
+    if 'created_at' not in columns:
+        conn.execute("ALTER TABLE goals ADD COLUMN created_at INTEGER DEFAULT (strftime('%s', 'now'))")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS achievements (
+            achievement_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            icon_path TEXT,
+            unlocked_at INTEGER NOT NULL
+        )""")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            type TEXT DEFAULT 'info',
+            is_read INTEGER DEFAULT 0
+        )""")
+
+    # İndeksler oluştur (performans için)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_timestamp ON usage_logs(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_process ON usage_logs(process_name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_timestamp ON notifications(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(is_read)")
+    _create_legacy_usage_view(conn)
+
+def _migration_002_daily_usage(conn):
+    """Gün x uygulama özet tablosu (usage_logs ile aynı transaction'da güncellenir)."""
+    needs_backfill = not _table_exists(conn, 'daily_usage')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_usage (
+            day TEXT NOT NULL,
+            process_name TEXT NOT NULL,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            device_id INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (day, process_name, device_id)
+        ) WITHOUT ROWID""")
+    if needs_backfill and not rebuild_daily_usage():
+        raise sqlite3.OperationalError("daily_usage doldurulamadı")
+
+def _migration_003_hourly_usage(conn):
+    """Gün x saat aktivite özeti (oturumlar saat sınırlarından bölünerek yazılır)."""
+    needs_backfill = not _table_exists(conn, 'hourly_usage')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS hourly_usage (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            device_id INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (day, hour, device_id)
+        ) WITHOUT ROWID""")
+    if needs_backfill and not rebuild_hourly_usage():
+        raise sqlite3.OperationalError("hourly_usage doldurulamadı")
+
+def _migration_004_encrypted_segments(conn):
+    """Kapanmış günlerin toplu şifreli kopyaları ('encrypted_segments' depolama modu)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS encrypted_segments (
+            day TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+            sealed_at INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        )""")
+
+def _migration_005_apps(conn):
+    """Uygulama boyut tablosu (ilk/son görülme, oturum sayısı, toplam süre)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS apps (
+            process_name TEXT PRIMARY KEY,
+            first_seen INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0
+        )""")
+    # (process_name, timestamp) indeksi uygulama başına MIN/MAX sorgularını O(log n) yapar
+    conn.execute("DROP INDEX IF EXISTS idx_usage_logs_process")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_process_time ON usage_logs(process_name, timestamp)")
+    _create_legacy_usage_view(conn)
+    if not rebuild_apps():
+        raise sqlite3.OperationalError("apps doldurulamadı")
+
+def _migration_006_dictionary_encoding(conn):
+    """Uygulama adları ve pencere başlıklarını processes/window_titles tablolarına taşır."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processes (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS window_titles (
+            id INTEGER PRIMARY KEY,
+            title_hash INTEGER NOT NULL,
+            title TEXT NOT NULL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_window_titles_hash ON window_titles(title_hash)")
+
+    conn.create_function("kognita_title_hash", 1, _title_hash, deterministic=True)
+    conn.execute("DROP VIEW IF EXISTS usage_log_entries")
+    conn.execute("INSERT INTO processes (name) SELECT DISTINCT process_name FROM usage_logs")
+    conn.execute("""
+        INSERT INTO window_titles (title_hash, title)
+        SELECT kognita_title_hash(window_title), window_title FROM usage_logs
+        WHERE window_title IS NOT NULL GROUP BY window_title""")
+
+    # Satırlar yeni tabloya kimlikleri korunarak kopyalanır; satır başına şifreli kopya taşınmaz
+    conn.execute("""
+        CREATE TABLE usage_logs_encoded (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            process_id INTEGER NOT NULL,
+            title_id INTEGER,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER NOT NULL,
+            duration_seconds INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL
+        )""")
+    conn.execute("""
+        INSERT INTO usage_logs_encoded (id, process_id, title_id, start_time, end_time, duration_seconds, timestamp)
+        SELECT ul.id, p.id, wt.id, ul.start_time, ul.end_time, ul.duration_seconds, ul.timestamp
+        FROM usage_logs ul
+        JOIN processes p ON p.name = ul.process_name
+        LEFT JOIN window_titles wt ON wt.title_hash = kognita_title_hash(ul.window_title) AND wt.title = ul.window_title""")
+    conn.execute("DROP TABLE usage_logs")
+    conn.execute("ALTER TABLE usage_logs_encoded RENAME TO usage_logs")
+    conn.execute("CREATE INDEX idx_usage_logs_timestamp ON usage_logs(timestamp)")
+    conn.execute("CREATE INDEX idx_usage_logs_process_time ON usage_logs(process_id, timestamp)")
+
+    conn.execute("""
+        CREATE VIEW usage_log_entries AS
+        SELECT ul.id, p.name AS process_name, wt.title AS window_title, ul.start_time, ul.end_time,
+               ul.duration_seconds, ul.timestamp, 1 AS session_count, ul.process_id
+        FROM usage_logs ul
+        JOIN processes p ON p.id = ul.process_id
+        LEFT JOIN window_titles wt ON wt.id = ul.title_id""")
+    _clear_intern_cache()
+
+def _migration_007_stats(conn):
+    """Durum paneli için transaction içinde güncellenen sayaç tablosu."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stats (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""")
+    if not rebuild_stats():
+        raise sqlite3.OperationalError("stats doldurulamadı")
+
+def _migration_008_session_count(conn):
+    """Birleştirilmiş (downsample) satırların temsil ettiği oturum sayısı sütunu."""
+    conn.execute("ALTER TABLE usage_logs ADD COLUMN session_count INTEGER NOT NULL DEFAULT 1")
+    conn.execute("DROP VIEW IF EXISTS usage_log_entries")
+    conn.execute("""
+        CREATE VIEW usage_log_entries AS
+        SELECT ul.id, p.name AS process_name, wt.title AS window_title, ul.start_time, ul.end_time,
+               ul.duration_seconds, ul.timestamp, ul.session_count, ul.process_id
+        FROM usage_logs ul
+        JOIN processes p ON p.id = ul.process_id
+        LEFT JOIN window_titles wt ON wt.id = ul.title_id""")
+
+def _migration_009_archive_manifest(conn):
+    """Aylık arşiv dosyalarının zaman aralığı ve toplamlarını tutan manifest tablosu."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_manifest (
+            month TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            start_ts INTEGER NOT NULL,
+            end_ts INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            session_count INTEGER NOT NULL,
+            total_seconds INTEGER NOT NULL,
+            archived_at INTEGER NOT NULL
+        )""")
+
+def _migration_010_unique_session_key(conn):
+    """
+    (uygulama, başlangıç zamanı) anahtarını tekil yapar; içe aktarma bu anahtarla
+    idempotent çalışır. timestamp her zaman start_time'a eşittir, bu yüzden
+    mevcut (process_id, timestamp) indeksi tekil hale getirilir. Önceden oluşmuş
+    çift kayıtlar seyreltmedeki gibi tek satırda birleştirilir.
+    """
+    duplicates = conn.execute("""
+        SELECT MIN(id), COUNT(*), MAX(end_time), SUM(duration_seconds), SUM(session_count),
+               process_id, timestamp, date(timestamp, 'unixepoch', 'localtime')
+        FROM usage_logs GROUP BY process_id, timestamp HAVING COUNT(*) > 1""").fetchall()
+    if duplicates:
+        conn.executemany("""
+            UPDATE usage_logs SET end_time = ?, duration_seconds = ?, session_count = ? WHERE id = ?""",
+            [(end_time, duration, sessions, keep_id) for keep_id, _, end_time, duration, sessions, *_ in duplicates])
+        conn.executemany("DELETE FROM usage_logs WHERE process_id = ? AND timestamp = ? AND id != ?",
+                         [(process_id, timestamp, keep_id) for keep_id, *_, process_id, timestamp, _ in duplicates])
+        # Birleşen günler yeniden mühürlenir
+        conn.executemany("DELETE FROM encrypted_segments WHERE day = ?", {(row[7],) for row in duplicates})
+        _bump_stat(conn, STAT_USAGE_LOGS, -sum(row[1] - 1 for row in duplicates))
+        logging.info(f"Aynı başlangıç zamanlı {len(duplicates)} kayıt grubu birleştirildi.")
+    conn.execute("DROP INDEX IF EXISTS idx_usage_logs_process_time")
+    conn.execute("CREATE UNIQUE INDEX idx_usage_logs_process_time ON usage_logs(process_id, timestamp)")
+
+def _usage_log_entries_view_sql(schema='main'):
+    """usage_log_entries görünümünün (ana dosya veya arşiv şeması için) CREATE ifadesini döndürür."""
+    return f"""
+        CREATE VIEW {schema}.usage_log_entries AS
+        SELECT ul.id, p.name AS process_name, wt.title AS window_title, ul.start_time, ul.end_time,
+               ul.duration_seconds, ul.timestamp, ul.session_count, ul.process_id, ul.device_id
+        FROM usage_logs ul
+        JOIN processes p ON p.id = ul.process_id
+        LEFT JOIN window_titles wt ON wt.id = ul.title_id"""
+
+def _add_device_to_rollup(conn, table_name, key_columns, value_columns):
+    """Özet tablosunu device_id'li birincil anahtarla yeniden oluşturur; mevcut satırlar yerel cihaza yazılır."""
+    if 'device_id' in [col[1] for col in conn.execute(f"PRAGMA table_info({table_name})")]:
+        return
+    columns = ", ".join(key_columns + value_columns)
+    definitions = "".join(f"{name} {'INTEGER' if name == 'hour' else 'TEXT'} NOT NULL, " for name in key_columns)
+    definitions += "".join(f"{name} INTEGER NOT NULL DEFAULT 0, " for name in value_columns)
+    conn.execute(f"ALTER TABLE {table_name} RENAME TO {table_name}_old")
+    conn.execute(f"""
+        CREATE TABLE {table_name} (
+            {definitions}device_id INTEGER NOT NULL DEFAULT {LOCAL_DEVICE_ID},
+            PRIMARY KEY ({", ".join(key_columns)}, device_id)
+        ) WITHOUT ROWID""")
+    conn.execute(f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {table_name}_old")
+    conn.execute(f"DROP TABLE {table_name}_old")
+
+def _alter_archive_files(conn, description, statements):
+    """
+    Manifest'teki her arşiv dosyasında şema değişikliği ifadelerini dosya başına
+    tek transaction'da çalıştırır. Arşivler ayrı dosyalar olduğundan bu değişiklikler
+    ana dosyadaki migration transaction'ının dışındadır; migration geri alınıp tekrar
+    denendiğinde zaten uygulanmış arşivler uyarıyla atlanır.
+    """
+    for month, file_name in conn.execute("SELECT month, file_name FROM archive_manifest").fetchall():
+        path = get_archive_dir() / file_name
+        if not path.exists():
+            continue
+        archive_conn = sqlite3.connect(str(path))
+        try:
+            with archive_conn:
+                for statement in statements:
+                    archive_conn.execute(statement)
+        except sqlite3.Error as e:
+            logging.warning(f"{month} arşivine {description} eklenemedi: {e}")
+        finally:
+            archive_conn.close()
+
+def _migration_011_devices(conn):
+    """
+    Cihaz tablosu, eşitleme işaretleri ve usage_logs ile özet tablolarında
+    device_id. Mevcut kayıtlar yerel cihaza aittir; arşiv dosyalarına da sütun eklenir.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS devices (
+            id INTEGER PRIMARY KEY,
+            device_uuid TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            is_local INTEGER NOT NULL DEFAULT 0,
+            last_synced_at INTEGER
+        )""")
+    conn.execute("INSERT OR IGNORE INTO devices (id, device_uuid, name, is_local) VALUES (?, ?, ?, 1)",
+                 (LOCAL_DEVICE_ID, uuid.uuid4().hex, socket.gethostname() or 'local'))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_watermarks (
+            peer_uuid TEXT NOT NULL,
+            device_uuid TEXT NOT NULL,
+            last_row_id INTEGER NOT NULL,
+            synced_at INTEGER NOT NULL,
+            PRIMARY KEY (peer_uuid, device_uuid)
+        ) WITHOUT ROWID""")
+
+    conn.execute(f"ALTER TABLE usage_logs ADD COLUMN device_id INTEGER NOT NULL DEFAULT {LOCAL_DEVICE_ID}")
+    conn.execute("DROP INDEX IF EXISTS idx_usage_logs_process_time")
+    conn.execute("CREATE UNIQUE INDEX idx_usage_logs_process_time ON usage_logs(process_id, timestamp, device_id)")
+    conn.execute("DROP VIEW IF EXISTS usage_log_entries")
+    conn.execute(_usage_log_entries_view_sql())
+    _add_device_to_rollup(conn, 'daily_usage', ['day', 'process_name'], ['total_seconds', 'session_count'])
+    _add_device_to_rollup(conn, 'hourly_usage', ['day', 'hour'], ['total_seconds'])
+
+    _alter_archive_files(conn, "device_id", [
+        f"ALTER TABLE usage_logs ADD COLUMN device_id INTEGER NOT NULL DEFAULT {LOCAL_DEVICE_ID}",
+        "DROP VIEW IF EXISTS usage_log_entries",
+        _usage_log_entries_view_sql()])
+
+def _migration_012_input_counters(conn):
+    """Oturum başına tuş ve tıklama sayaçları (usage_logs ve arşiv dosyaları)."""
+    statements = ["ALTER TABLE usage_logs ADD COLUMN key_count INTEGER NOT NULL DEFAULT 0",
+                  "ALTER TABLE usage_logs ADD COLUMN click_count INTEGER NOT NULL DEFAULT 0"]
+    for statement in statements:
+        conn.execute(statement)
+    _alter_archive_files(conn, "giriş sayaçları", statements)
+
+SCHEMA_MIGRATIONS = [
+    (1, "Temel tablolar", _migration_001_base_schema),
+    (2, "Günlük özet tablosu", _migration_002_daily_usage),
+    (3, "Saatlik özet tablosu", _migration_003_hourly_usage),
+    (4, "Şifreli gün segmentleri", _migration_004_encrypted_segments),
+    (5, "Uygulama boyut tablosu", _migration_005_apps),
+    (6, "Uygulama adı ve pencere başlığı sözlükleri", _migration_006_dictionary_encoding),
+    (7, "Sayaç tablosu", _migration_007_stats),
+    (8, "Birleştirilmiş oturum sayısı", _migration_008_session_count),
+    (9, "Aylık arşiv manifest tablosu", _migration_009_archive_manifest),
+    (10, "Tekil (uygulama, başlangıç) anahtarı", _migration_010_unique_session_key),
+    (11, "Cihazlar ve çoklu makine eşitlemesi", _migration_011_devices),
+    (12, "Oturum başına giriş sayaçları", _migration_012_input_counters),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """Veritabanının uygulanmış şema sürümünü (PRAGMA user_version) döndürür."""
+    with _write_lock:
+        return _get_writer_connection().execute("PRAGMA user_version").fetchone()[0]
+
 def initialize_database():
-    """Tüm tabloları oluşturur."""
+    """
+    Bekleyen şema migration'larını tek bir transaction içinde uygular. sqlite3
+    DDL ifadelerinden önce kendiliğinden transaction açmadığından BEGIN açıkça
+    verilir; bir adım başarısız olursa tablo değişiklikleri ve user_version birlikte
+    geri alınır. Arşiv dosyalarındaki değişiklikler bu transaction'a dahil değildir.
+    """
     is_new_db = not DB_FILE.exists()
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None: 
                 logging.error("Veritabanı bağlantısı kurulamadı!")
                 return False
-                
-            cursor = conn.cursor()
-            
-            # Usage logs tablosu - timestamp alanı eklendi
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS usage_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    process_name TEXT NOT NULL,
-                    window_title TEXT,
-                    start_time INTEGER NOT NULL,
-                    end_time INTEGER NOT NULL,
-                    duration_seconds INTEGER NOT NULL,
-                    timestamp INTEGER NOT NULL,
-                    encrypted_data BLOB
-                )""")
-            
-            # Eski usage_log tablosu varsa migrate et
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='usage_log'")
-            if cursor.fetchone():
-                logging.info("Eski usage_log tablosu bulundu, migration yapılıyor...")
-                try:
-                    # Eski verileri yeni tabloya taşı
-                    cursor.execute("SELECT encrypted_data FROM usage_log")
-                    old_data = cursor.fetchall()
-                    
-                    for (encrypted_data,) in old_data:
-                        try:
-                            decrypted_str = decrypt_data(encrypted_data)
-                            log_data = json.loads(decrypted_str)
-                            
-                            cursor.execute("""
-                                INSERT INTO usage_logs 
-                                (process_name, window_title, start_time, end_time, duration_seconds, timestamp, encrypted_data) 
-                                VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                                (log_data.get('process_name', 'unknown'),
-                                 log_data.get('window_title', ''),
-                                 log_data.get('start_time', 0),
-                                 log_data.get('end_time', 0),
-                                 log_data.get('duration_seconds', 0),
-                                 log_data.get('start_time', 0),  # timestamp olarak start_time kullan
-                                 encrypted_data))
-                        except Exception as e:
-                            logging.error(f"Migration sırasında veri hatası: {e}")
-                    
-                    # Eski tabloyu sil
-                    cursor.execute("DROP TABLE usage_log")
-                    conn.commit()
-                    logging.info("Migration tamamlandı.")
-                except Exception as e:
-                    logging.error(f"Migration hatası: {e}")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS app_categories (
-                    process_name TEXT PRIMARY KEY,
-                    category TEXT NOT NULL
-                )""")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS goals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category TEXT, 
-                    process_name TEXT, 
-                    goal_type TEXT NOT NULL, 
-                    time_limit_minutes INTEGER, 
-                    start_time_of_day TEXT, 
-                    end_time_of_day TEXT,
-                    created_at INTEGER DEFAULT (strftime('%s', 'now')),
-                    UNIQUE(category, goal_type, process_name, start_time_of_day, end_time_of_day)
-                )""")
-            
-            # Goals tablosuna sütun eklemeleri
-            cursor.execute("PRAGMA table_info(goals)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'process_name' not in columns:
-                cursor.execute("ALTER TABLE goals ADD COLUMN process_name TEXT")
-            if 'start_time_of_day' not in columns:
-                cursor.execute("ALTER TABLE goals ADD COLUMN start_time_of_day TEXT")
-            if 'end_time_of_day' not in columns:
-                cursor.execute("ALTER TABLE goals ADD COLUMN end_time_of_day TEXT")
-            if 'created_at' not in columns:
-                cursor.execute("ALTER TABLE goals ADD COLUMN created_at INTEGER DEFAULT (strftime('%s', 'now'))")
 
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS achievements (
-                    achievement_id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    icon_path TEXT,
-                    unlocked_at INTEGER NOT NULL
-                )""")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS notifications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    type TEXT DEFAULT 'info',
-                    is_read INTEGER DEFAULT 0
-                )""")
-            
-            # İndeksler oluştur (performans için)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_timestamp ON usage_logs(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_process ON usage_logs(process_name)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_timestamp ON notifications(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(is_read)")
-            
-            conn.commit()
+            current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if current_version >= SCHEMA_VERSION:
+                if current_version > SCHEMA_VERSION:
+                    logging.warning(f"Veritabanı şema sürümü ({current_version}) uygulamanınkinden ({SCHEMA_VERSION}) yeni.")
+                return True
 
             if is_new_db:
                 logging.info("Creating Kognita database for the first time...")
+            total_started = time.perf_counter()
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for version, description, migrate in SCHEMA_MIGRATIONS:
+                if version <= current_version:
+                    continue
+                step_started = time.perf_counter()
+                migrate(conn)
+                logging.info(f"Şema migration {version} ({description}) uygulandı: {time.perf_counter() - step_started:.3f} sn")
+
+            if is_new_db:
                 _populate_initial_categories(conn)
-                logging.info("Database initialized successfully.")
-            
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            _invalidate_category_map()
+            logging.info(f"Veritabanı şeması {current_version} -> {SCHEMA_VERSION} sürümüne yükseltildi "
+                         f"({time.perf_counter() - total_started:.3f} sn).")
             return True
     except Exception as e:
         logging.critical(f"Database initialization failed: {e}", exc_info=True)
         return False
 
+# --- Sözlük (Intern) Önbelleği ---
+# usage_logs satırları uygulama adı ve pencere başlığı yerine processes ve
+# window_titles tablolarındaki tamsayı kimlikleri tutar. Yazma yolunda kimlikler
+# bellekteki sözlüklerden çözülür; başlık önbelleği sınırlı boyuttadır.
+_process_ids = {}
+_title_ids = {}
+_TITLE_CACHE_LIMIT = 20000
+
+def _title_hash(title):
+    """Pencere başlığının 64 bit işaretli özetini döndürür (window_titles.title_hash)."""
+    if title is None:
+        return None
+    return int.from_bytes(hashlib.blake2b(title.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+def _clear_intern_cache():
+    """Kimlik önbelleklerini temizler (geri alınan yazmalar veya şema değişikliği sonrası)."""
+    _process_ids.clear()
+    _title_ids.clear()
+
+def _intern_process(conn, process_name):
+    """Uygulama adının processes kimliğini döndürür; yoksa ekler."""
+    process_id = _process_ids.get(process_name)
+    if process_id is None:
+        row = conn.execute("SELECT id FROM processes WHERE name = ?", (process_name,)).fetchone()
+        if row:
+            process_id = row[0]
+        else:
+            process_id = conn.execute("INSERT INTO processes (name) VALUES (?)", (process_name,)).lastrowid
+        _process_ids[process_name] = process_id
+    return process_id
+
+def _intern_title(conn, title):
+    """Pencere başlığının window_titles kimliğini döndürür; yoksa ekler."""
+    if title is None:
+        return None
+    title_id = _title_ids.get(title)
+    if title_id is None:
+        title_hash = _title_hash(title)
+        for candidate_id, candidate_title in conn.execute(
+                "SELECT id, title FROM window_titles WHERE title_hash = ?", (title_hash,)):
+            if candidate_title == title:
+                title_id = candidate_id
+                break
+        if title_id is None:
+            title_id = conn.execute("INSERT INTO window_titles (title_hash, title) VALUES (?, ?)",
+                                    (title_hash, title)).lastrowid
+        if len(_title_ids) >= _TITLE_CACHE_LIMIT:
+            _title_ids.clear()
+        _title_ids[title] = title_id
+    return title_id
+
 # --- Kullanım Log Fonksiyonları ---
 def add_usage_log(process_name, window_title, start_time, end_time, duration):
     """Kullanım verisini veritabanına ekler."""
+    return add_usage_logs([(process_name, window_title, start_time, end_time, duration)])
+
+def add_usage_logs(logs):
+    """
+    Birden fazla kullanım kaydını tek bir transaction içinde toplu olarak ekler.
+    logs: [(process_name, window_title, start_time, end_time, duration[, key_count, click_count]), ...]
+
+    Uygulama adı ve pencere başlığı processes/window_titles kimlikleri olarak
+    yazılır. 'encrypted_segments' modunda kapanmış günlerin şifreli kopyası
+    seal_closed_days ile toplu olarak ayrıca yazılır.
+    """
+    if not logs:
+        return True
     try:
-        with get_db_connection() as conn:
+        rows = [(process_name, window_title, int(start_time), int(end_time), int(duration), int(start_time),
+                 *(counts or (0, 0)))
+                for process_name, window_title, start_time, end_time, duration, *counts in logs]
+
+        with write_transaction() as conn:
             if conn is None:
                 logging.error("Veritabanı bağlantısı kurulamadı!")
                 return False
                 
-            cursor = conn.cursor()
-            
-            # Şifrelenmiş veri de sakla (geriye uyumluluk için)
-            log_data = {
-                "process_name": process_name,
-                "window_title": window_title,
-                "start_time": int(start_time),
-                "end_time": int(end_time),
-                "duration_seconds": int(duration)
-            }
-            encrypted_log = encrypt_data(log_data) if CRYPTO_AVAILABLE else json.dumps(log_data)
-            
-            cursor.execute("""
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM usage_logs").fetchone()[0]
+            # Aynı uygulama ve başlangıç zamanlı bir kayıt varsa (ör. içe aktarılmış veri) oturum ona eklenir
+            conn.executemany("""
                 INSERT INTO usage_logs 
-                (process_name, window_title, start_time, end_time, duration_seconds, timestamp, encrypted_data) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (process_name, window_title, int(start_time), int(end_time), int(duration), int(start_time), encrypted_log))
-            conn.commit()
+                (process_id, title_id, start_time, end_time, duration_seconds, timestamp, key_count, click_count) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(process_id, timestamp, device_id) DO UPDATE SET
+                    end_time = MAX(end_time, excluded.end_time),
+                    duration_seconds = duration_seconds + excluded.duration_seconds,
+                    session_count = session_count + 1,
+                    key_count = key_count + excluded.key_count,
+                    click_count = click_count + excluded.click_count""",
+                [(_intern_process(conn, row[0]), _intern_title(conn, row[1])) + row[2:] for row in rows])
+            inserted = conn.execute("SELECT COUNT(*) FROM usage_logs WHERE id > ?", (last_id,)).fetchone()[0]
+            # Günlük özet tablosunu aynı transaction içinde güncelle
+            conn.executemany("""
+                INSERT INTO daily_usage (day, process_name, total_seconds, session_count)
+                VALUES (date(?, 'unixepoch', 'localtime'), ?, ?, 1)
+                ON CONFLICT(day, process_name, device_id) DO UPDATE SET
+                    total_seconds = total_seconds + excluded.total_seconds,
+                    session_count = session_count + 1""",
+                [(row[5], row[0], row[4]) for row in rows])
+            _add_hourly_usage(conn, [(row[0], row[2], row[4], LOCAL_DEVICE_ID) for row in rows])
+            _add_apps_usage(conn, [(row[0], row[2], row[3], row[4]) for row in rows])
+            _bump_stat(conn, STAT_USAGE_LOGS, inserted)
             return True
     except Exception as e:
+        # Geri alınan transaction'da eklenen kimlikler önbellekte kalmamalı
+        _clear_intern_cache()
         logging.error(f"Usage log ekleme hatası: {e}")
         return False
 
-def get_all_usage_logs():
-    """Tüm kullanım loglarını getirir."""
+# Akış (streaming) API'sinin döndürdüğü kompakt satır tipi
+UsageLog = namedtuple('UsageLog', ['id', 'process_name', 'window_title', 'start_time', 'end_time', 'duration_seconds', 'category'])
+
+def iter_usage_logs(start_timestamp=None, end_timestamp=None, process_name=None, category=None, batch_size=2000, device_id=None):
+    """
+    Kullanım loglarını fetchmany ile parça parça okuyarak UsageLog olarak üretir.
+    Tüm geçmişi belleğe almadan tek geçişte işlemek isteyen çağıranlar içindir.
+    Kayıtlar zaman indeksine göre (eskiden yeniye) sıralı gelir; aralıkla
+    kesişen arşivlenmiş aylar ana dosyadaki kayıtlardan önce okunur.
+    Okuma yarıda kesilirse hata loglanıp yeniden fırlatılır; eksik geçmiş
+    tamammış gibi kullanılmaz.
+    """
+    conditions, params = [], []
+    if start_timestamp is not None:
+        conditions.append("timestamp >= ?")
+        params.append(int(start_timestamp))
+    if end_timestamp is not None:
+        conditions.append("timestamp <= ?")
+        params.append(int(end_timestamp))
+    if process_name is not None:
+        conditions.append("process_name = ?")
+        params.append(process_name)
+    if device_id is not None:
+        conditions.append("device_id = ?")
+        params.append(device_id)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT id, process_name, window_title, start_time, end_time, duration_seconds
+        FROM usage_log_entries
+        {where_clause}
+        ORDER BY timestamp"""
+
+    conn = get_db_connection()
+    if conn is None:
+        raise sqlite3.OperationalError("Veritabanı bağlantısı kurulamadı")
+    # Kategori arşiv dosyalarında tutulmaz; tüm bölümler için önbellekten çözülür
+    category_map = get_category_map()
     try:
-        with get_db_connection() as conn:
-            if conn is None:
-                return []
-                
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, process_name, window_title, start_time, end_time, duration_seconds 
-                FROM usage_logs ORDER BY start_time DESC
-            """)
-            
-            logs = []
-            for row in cursor.fetchall():
-                logs.append({
-                    'id': row[0],
-                    'process_name': row[1],
-                    'window_title': row[2],
-                    'start_time': row[3],
-                    'end_time': row[4],
-                    'duration_seconds': row[5]
-                })
-            return logs
+        with _open_archives(conn, start_timestamp, end_timestamp) as archives:
+            partitions = [archive_conn for _, archive_conn in archives] + [conn]
+            for rows in _iter_partition_chunks(partitions, query, params, batch_size):
+                for row in rows:
+                    row_category = category_map.get(row[1], 'Other')
+                    if category is None or row_category == category:
+                        yield UsageLog(*row, row_category)
     except Exception as e:
-        logging.error(f"Usage logs getirme hatası: {e}")
+        logging.error(f"Usage logs akış hatası: {e}")
+        raise
+
+def get_all_usage_logs():
+    """
+    Tüm kullanım loglarını liste olarak getirir.
+    Geçmişin tamamını belleğe alır; tek geçişlik işler için iter_usage_logs kullanın.
+    Okuma yarıda kesilirse kısmi liste yerine boş liste döner.
+    """
+    try:
+        return [{
+            'id': log.id,
+            'process_name': log.process_name,
+            'window_title': log.window_title,
+            'start_time': log.start_time,
+            'end_time': log.end_time,
+            'duration_seconds': log.duration_seconds
+        } for log in iter_usage_logs()]
+    except Exception:
         return []
 
 def get_recent_usage_logs(limit=50):
@@ -313,8 +902,8 @@ def get_recent_usage_logs(limit=50):
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT process_name, window_title, start_time, end_time, duration_seconds 
-                FROM usage_logs 
-                ORDER BY start_time DESC 
+                FROM usage_log_entries 
+                ORDER BY timestamp DESC 
                 LIMIT ?
             """, (limit,))
             
@@ -332,37 +921,1567 @@ def get_recent_usage_logs(limit=50):
         logging.error(f"Recent usage logs getirme hatası: {e}")
         return []
 
-def delete_old_usage_logs(days_to_keep):
-    """Belirtilen gün sayısından daha eski kullanım loglarını siler."""
-    if days_to_keep < 0:
-        return 0
-    
+# --- Toplama (Aggregation) Fonksiyonları ---
+# Sorgular, aralığın tam günlerini daily_usage özet tablosundan, gün ortasında
+# başlayan/biten kısmi uçlarını ise idx_usage_logs_timestamp indeksi üzerinden
+# usage_logs tablosundan okur. Böylece ay/yıl aralıkları satır sayısıyla değil
+# gün sayısıyla orantılı kalır. 'idle' kayıtları toplamlara dahil edilmez.
+
+def _split_range_by_days(start_timestamp, end_timestamp):
+    """
+    Kapsayıcı [başlangıç, bitiş] aralığını tam günler ve kısmi uçlar olarak ayırır.
+    Dönüş: ((ilk_gün, son_gün), [(ham_başlangıç, ham_bitiş), ...])
+    """
+    start_timestamp, end_timestamp = int(start_timestamp), int(end_timestamp)
+    start_dt = datetime.datetime.fromtimestamp(start_timestamp)
+    first_midnight = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if first_midnight < start_dt:
+        first_midnight += datetime.timedelta(days=1)
+    # Bitiş kapsayıcı olduğundan bir sonraki saniyenin gece yarısına yuvarla
+    last_midnight = datetime.datetime.fromtimestamp(end_timestamp + 1).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if first_midnight >= last_midnight:
+        return None, [(start_timestamp, end_timestamp)]
+
+    full_days = (first_midnight.strftime('%Y-%m-%d'), (last_midnight - datetime.timedelta(days=1)).strftime('%Y-%m-%d'))
+    raw_ranges = []
+    if start_timestamp < int(first_midnight.timestamp()):
+        raw_ranges.append((start_timestamp, int(first_midnight.timestamp()) - 1))
+    if int(last_midnight.timestamp()) <= end_timestamp:
+        raw_ranges.append((int(last_midnight.timestamp()), end_timestamp))
+    return full_days, raw_ranges
+
+@contextmanager
+def _usage_source(conn, start_timestamp, end_timestamp, device_id=None):
+    """
+    Aralık için (day, process_name, seconds, sessions) satırları üreten bir
+    alt sorgu ve parametrelerini verir. Kısmi uçlar arşivlenmiş bir aya denk
+    gelirse o ayın arşivi yalnızca blok süresince bağlanır. device_id verilirse
+    yalnızca o cihazın kayıtları, verilmezse tüm cihazların toplamı okunur.
+    """
+    full_days, raw_ranges = _split_range_by_days(start_timestamp, end_timestamp)
+    device_filter = "" if device_id is None else " AND device_id = ?"
+    device_params = () if device_id is None else (device_id,)
+    parts, params = [], []
+    if full_days:
+        parts.append(f"""
+            SELECT day, process_name, total_seconds AS seconds, session_count AS sessions
+            FROM daily_usage WHERE day BETWEEN ? AND ?{device_filter}""")
+        params.extend(full_days + device_params)
+    with _attached_archives(conn, raw_ranges) as schemas:
+        for raw_start, raw_end in raw_ranges:
+            for schema in ['main'] + schemas:
+                parts.append(f"""
+                    SELECT date(timestamp, 'unixepoch', 'localtime') AS day, process_name,
+                           duration_seconds AS seconds, session_count AS sessions
+                    FROM {schema}.usage_log_entries WHERE timestamp BETWEEN ? AND ?{device_filter}""")
+                params.extend((raw_start, raw_end) + device_params)
+        yield " UNION ALL ".join(parts), params
+
+def get_category_totals(start_timestamp, end_timestamp, device_id=None):
+    """Verilen aralıktaki kategori bazlı toplam süreleri {kategori: saniye} olarak döndürür."""
     try:
-        cutoff_timestamp = int((datetime.datetime.now() - datetime.timedelta(days=days_to_keep)).timestamp())
-        
         with get_db_connection() as conn:
             if conn is None:
-                return 0
-                
+                return {}
+
+            with _usage_source(conn, start_timestamp, end_timestamp, device_id) as (source, params):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT COALESCE(ac.category, 'Other'), SUM(t.total)
+                    FROM (
+                        SELECT process_name, SUM(seconds) AS total
+                        FROM ({source})
+                        WHERE process_name != 'idle'
+                        GROUP BY process_name
+                    ) t
+                    LEFT JOIN app_categories ac ON ac.process_name = t.process_name
+                    GROUP BY 1
+                """, params)
+                return {category: total for category, total in cursor.fetchall()}
+    except Exception as e:
+        logging.error(f"Kategori toplamları getirme hatası: {e}")
+        return {}
+
+def get_process_totals(start_timestamp, end_timestamp, device_id=None):
+    """Verilen aralıktaki uygulama bazlı toplam süreleri {process_name: saniye} olarak döndürür."""
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return {}
+
+            with _usage_source(conn, start_timestamp, end_timestamp, device_id) as (source, params):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT process_name, SUM(seconds)
+                    FROM ({source})
+                    WHERE process_name != 'idle'
+                    GROUP BY process_name
+                """, params)
+                return {process_name: total for process_name, total in cursor.fetchall()}
+    except Exception as e:
+        logging.error(f"Uygulama toplamları getirme hatası: {e}")
+        return {}
+
+def get_daily_category_totals(start_timestamp, end_timestamp, device_id=None):
+    """
+    Verilen aralıktaki günlük kategori toplamlarını döndürür.
+    Dönüş formatı: [(date_str 'YYYY-MM-DD', kategori, saniye), ...]
+    """
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return []
+
+            with _usage_source(conn, start_timestamp, end_timestamp, device_id) as (source, params):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT t.day, COALESCE(ac.category, 'Other'), SUM(t.total)
+                    FROM (
+                        SELECT day, process_name, SUM(seconds) AS total
+                        FROM ({source})
+                        WHERE process_name != 'idle'
+                        GROUP BY day, process_name
+                    ) t
+                    LEFT JOIN app_categories ac ON ac.process_name = t.process_name
+                    GROUP BY 1, 2
+                    ORDER BY 1
+                """, params)
+                return cursor.fetchall()
+    except Exception as e:
+        logging.error(f"Günlük kategori toplamları getirme hatası: {e}")
+        return []
+
+def _day_bounds(start_timestamp, end_timestamp):
+    """Zaman damgası aralığını kapsayan yerel gün dizgelerini ('YYYY-MM-DD') döndürür."""
+    return (datetime.datetime.fromtimestamp(int(start_timestamp)).strftime('%Y-%m-%d'),
+            datetime.datetime.fromtimestamp(int(end_timestamp)).strftime('%Y-%m-%d'))
+
+def _hourly_filter(start_timestamp, end_timestamp, device_id):
+    """hourly_usage sorguları için WHERE koşulunu ve parametrelerini döndürür."""
+    if device_id is None:
+        return "day BETWEEN ? AND ?", _day_bounds(start_timestamp, end_timestamp)
+    return "day BETWEEN ? AND ? AND device_id = ?", _day_bounds(start_timestamp, end_timestamp) + (device_id,)
+
+def get_hourly_totals(start_timestamp, end_timestamp, device_id=None):
+    """
+    Verilen aralığı kapsayan günlerdeki saat bazlı (0-23) toplam aktif süreleri
+    {saat: saniye} olarak döndürür. hourly_usage özetinden okunur.
+    """
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return {}
+
+            where_clause, params = _hourly_filter(start_timestamp, end_timestamp, device_id)
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM usage_logs WHERE timestamp < ?", (cutoff_timestamp,))
-            count_to_delete = cursor.fetchone()[0]
-            
-            if count_to_delete > 0:
-                cursor.execute("DELETE FROM usage_logs WHERE timestamp < ?", (cutoff_timestamp,))
-                conn.commit()
-                logging.info(f"{count_to_delete} adet eski kullanım logu silindi.")
-            
-            return count_to_delete
+            cursor.execute(f"""
+                SELECT hour, SUM(total_seconds)
+                FROM hourly_usage
+                WHERE {where_clause}
+                GROUP BY hour
+            """, params)
+            return {hour: total for hour, total in cursor.fetchall()}
+    except Exception as e:
+        logging.error(f"Saatlik toplamlar getirme hatası: {e}")
+        return {}
+
+def get_weekday_hourly_totals(start_timestamp, end_timestamp, device_id=None):
+    """
+    Verilen aralığı kapsayan günlerdeki haftanın günü x saat toplamlarını döndürür.
+    Dönüş formatı: {(weekday, saat): saniye}; weekday 0=Pazartesi ... 6=Pazar.
+    """
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return {}
+
+            where_clause, params = _hourly_filter(start_timestamp, end_timestamp, device_id)
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT (CAST(strftime('%w', day) AS INTEGER) + 6) % 7, hour, SUM(total_seconds)
+                FROM hourly_usage
+                WHERE {where_clause}
+                GROUP BY 1, 2
+            """, params)
+            return {(weekday, hour): total for weekday, hour, total in cursor.fetchall()}
+    except Exception as e:
+        logging.error(f"Haftalık saat toplamları getirme hatası: {e}")
+        return {}
+
+def get_process_daily_totals(process_name, start_timestamp, end_timestamp, device_id=None):
+    """Bir uygulamanın aralıktaki günlük toplam sürelerini {date_str: saniye} olarak döndürür."""
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return {}
+
+            with _usage_source(conn, start_timestamp, end_timestamp, device_id) as (source, params):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT day, SUM(seconds)
+                    FROM ({source})
+                    WHERE process_name = ? COLLATE NOCASE
+                    GROUP BY day
+                """, params + [process_name])
+                return {day: total for day, total in cursor.fetchall()}
+    except Exception as e:
+        logging.error(f"Uygulama günlük toplamları getirme hatası: {e}")
+        return {}
+
+# --- Günlük Özet (Rollup) Fonksiyonları ---
+
+def _rebuild_daily_usage_days(conn, first_day, last_day):
+    """daily_usage tablosundaki [first_day, last_day] günlerini ham loglardan yeniden hesaplar."""
+    start_ts = int(datetime.datetime.strptime(first_day, '%Y-%m-%d').timestamp())
+    end_ts = int((datetime.datetime.strptime(last_day, '%Y-%m-%d') + datetime.timedelta(days=1)).timestamp()) - 1
+    conn.execute("DELETE FROM daily_usage WHERE day BETWEEN ? AND ?", (first_day, last_day))
+    conn.execute("""
+        INSERT INTO daily_usage (day, process_name, device_id, total_seconds, session_count)
+        SELECT date(timestamp, 'unixepoch', 'localtime'), process_name, device_id, SUM(duration_seconds), SUM(session_count)
+        FROM usage_log_entries
+        WHERE timestamp BETWEEN ? AND ?
+        GROUP BY 1, 2, 3
+    """, (start_ts, end_ts))
+
+def rebuild_daily_usage():
+    """daily_usage özet tablosunu tüm ham loglardan (arşivler dahil) baştan oluşturur."""
+    try:
+        with write_transaction() as conn:
+            if conn is None:
+                return False
+
+            conn.execute("DELETE FROM daily_usage")
+            conn.execute("""
+                INSERT INTO daily_usage (day, process_name, device_id, total_seconds, session_count)
+                SELECT date(timestamp, 'unixepoch', 'localtime'), process_name, device_id, SUM(duration_seconds), SUM(session_count)
+                FROM usage_log_entries
+                GROUP BY 1, 2, 3
+            """)
+            # Arşivlenmiş ayların günleri arşiv dosyalarından eklenir
+            with _open_archives(conn) as archives:
+                for _, archive_conn in archives:
+                    conn.executemany("""
+                        INSERT INTO daily_usage (day, process_name, device_id, total_seconds, session_count)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(day, process_name, device_id) DO UPDATE SET
+                            total_seconds = total_seconds + excluded.total_seconds,
+                            session_count = session_count + excluded.session_count""",
+                        archive_conn.execute("""
+                            SELECT date(timestamp, 'unixepoch', 'localtime'), process_name, device_id, SUM(duration_seconds), SUM(session_count)
+                            FROM usage_log_entries
+                            GROUP BY 1, 2, 3""").fetchall())
+            row_count = conn.execute("SELECT COUNT(*) FROM daily_usage").fetchone()[0]
+            logging.info(f"Günlük özet tablosu yeniden oluşturuldu: {row_count} satır.")
+            return True
+    except Exception as e:
+        logging.error(f"Günlük özet tablosu oluşturma hatası: {e}")
+        return False
+
+def _split_by_hour(start_time, duration):
+    """
+    Bir oturumu yerel saat sınırlarından böler.
+    Dönüş: [(date_str, saat, saniye), ...]; saniyelerin toplamı duration'a eşittir.
+    """
+    buckets = []
+    current = int(start_time)
+    end = current + int(duration)
+    while current < end:
+        current_dt = datetime.datetime.fromtimestamp(current)
+        next_hour = int(current_dt.replace(minute=0, second=0, microsecond=0).timestamp()) + 3600
+        segment_end = min(end, max(next_hour, current + 1))
+        buckets.append((current_dt.strftime('%Y-%m-%d'), current_dt.hour, segment_end - current))
+        current = segment_end
+    return buckets
+
+def _local_hour_slot(timestamp, slots):
+    """
+    Zaman damgasının yerel (gün, saat, saat_bitişi) bilgisini döndürür. Saat
+    dilimi farkları ve yaz saati geçişleri 15 dakikanın katı olduğundan sonuç
+    15 dakikalık dilim başına hesaplanıp slots sözlüğünde saklanır.
+    """
+    slot = timestamp // 900
+    local = slots.get(slot)
+    if local is None:
+        slot_dt = datetime.datetime.fromtimestamp(slot * 900)
+        hour_start = int(slot_dt.replace(minute=0, second=0, microsecond=0).timestamp())
+        local = slots[slot] = (slot_dt.strftime('%Y-%m-%d'), slot_dt.hour, hour_start + 3600)
+    return local
+
+def _add_hourly_usage(conn, logs):
+    """(process_name, start_time, duration, device_id) kayıtlarını hourly_usage tablosuna saat saat dağıtır."""
+    hourly = {}
+    slots = {}
+    for process_name, start_time, duration, device_id in logs:
+        if process_name == 'idle' or duration <= 0:
+            continue
+        start_time = int(start_time)
+        day, hour, hour_end = _local_hour_slot(start_time, slots)
+        # Oturumların çoğu tek bir saat içinde kalır; yalnızca saat sınırını aşanlar bölünür
+        if start_time + duration <= hour_end:
+            hourly[(day, hour, device_id)] = hourly.get((day, hour, device_id), 0) + duration
+            continue
+        for day, hour, seconds in _split_by_hour(start_time, duration):
+            hourly[(day, hour, device_id)] = hourly.get((day, hour, device_id), 0) + seconds
+    _upsert_hourly_usage(conn, hourly)
+
+def _upsert_hourly_usage(conn, hourly):
+    """{(gün, saat, cihaz): saniye} toplamlarını hourly_usage tablosuna ekler."""
+    if hourly:
+        conn.executemany("""
+            INSERT INTO hourly_usage (day, hour, device_id, total_seconds) VALUES (?, ?, ?, ?)
+            ON CONFLICT(day, hour, device_id) DO UPDATE SET total_seconds = total_seconds + excluded.total_seconds""",
+            [(day, hour, device_id, seconds) for (day, hour, device_id), seconds in hourly.items()])
+
+def _hourly_replay_start(conn):
+    """
+    Saatlik özetin ham loglardan yeniden hesaplanabildiği ilk anı döndürür.
+    Seyreltilmiş satırlar yalnızca ilk oturumun başlangıcını ve toplam süreyi
+    taşıdığından bu günlerin saatlik dağılımı loglardan çıkarılamaz; bu günlerin
+    hourly_usage satırları seyreltmeden önce hesaplandığı haliyle korunur.
+    """
+    if not _table_exists(conn, 'stats'):
+        return 0
+    return max(_downsampled_until(conn).values(), default=0)
+
+def _rebuild_hourly_usage_days(conn, first_day, last_day):
+    """
+    hourly_usage tablosundaki [first_day, last_day] günlerini ham loglardan
+    yeniden hesaplar; seyreltilmiş günler atlanır (bkz. _hourly_replay_start).
+    """
+    replay_start = _hourly_replay_start(conn)
+    start_ts = max(int(datetime.datetime.strptime(first_day, '%Y-%m-%d').timestamp()), replay_start)
+    end_ts = int((datetime.datetime.strptime(last_day, '%Y-%m-%d') + datetime.timedelta(days=1)).timestamp()) - 1
+    if start_ts > end_ts:
+        return
+    first_day = datetime.datetime.fromtimestamp(start_ts).strftime('%Y-%m-%d')
+    conn.execute("DELETE FROM hourly_usage WHERE day BETWEEN ? AND ?", (first_day, last_day))
+    # Aralıktan önce başlayıp bu günlere taşan oturumlar da hesaba katılır; seyreltilmiş
+    # satırların taşması yalnızca tüm oturumları son saatte başlamışsa gerçeğe yakındır
+    cursor = conn.execute("""
+        SELECT process_name, start_time, duration_seconds, device_id FROM usage_log_entries
+        WHERE timestamp BETWEEN ? AND ? AND end_time >= ? AND (timestamp >= ? OR session_count = 1)
+    """, (start_ts - 86400, end_ts, start_ts, replay_start - 3600))
+    rows = []
+    for process_name, start_time, duration, device_id in cursor:
+        rows.extend((process_name, clipped_start, seconds, device_id) for clipped_start, seconds in
+                    _clip_session(start_time, duration, start_ts, end_ts + 1))
+    _add_hourly_usage(conn, rows)
+
+def _clip_session(start_time, duration, range_start, range_end):
+    """Oturumun [range_start, range_end) içinde kalan kısmını [(başlangıç, süre)] olarak döndürür."""
+    clipped_start = max(int(start_time), range_start)
+    clipped_end = min(int(start_time) + int(duration), range_end)
+    return [(clipped_start, clipped_end - clipped_start)] if clipped_end > clipped_start else []
+
+def rebuild_hourly_usage():
+    """
+    hourly_usage özet tablosunu tüm ham loglardan (arşivler dahil) baştan
+    oluşturur. Seyreltilmiş günlerin satırları korunur (bkz. _hourly_replay_start).
+    """
+    try:
+        with write_transaction() as conn:
+            if conn is None:
+                return False
+
+            replay_start = _hourly_replay_start(conn)
+            replay_day = datetime.datetime.fromtimestamp(replay_start).strftime('%Y-%m-%d') if replay_start else ''
+            conn.execute("DELETE FROM hourly_usage WHERE day >= ?", (replay_day,))
+            with _open_archives(conn, start_timestamp=replay_start - 86400 if replay_start else None) as archives:
+                partitions = [archive_conn for _, archive_conn in archives] + [conn]
+                query = """
+                    SELECT process_name, start_time, duration_seconds, device_id FROM usage_log_entries
+                    WHERE end_time >= ? AND (timestamp >= ? OR session_count = 1)"""
+                for batch in _iter_partition_chunks(partitions, query, (replay_start, replay_start - 3600), 10000):
+                    _add_hourly_usage(conn, [(process_name, clipped_start, seconds, device_id)
+                                             for process_name, start_time, duration, device_id in batch
+                                             for clipped_start, seconds in
+                                             _clip_session(start_time, duration, replay_start, int(start_time) + int(duration))])
+            row_count = conn.execute("SELECT COUNT(*) FROM hourly_usage").fetchone()[0]
+            logging.info(f"Saatlik özet tablosu yeniden oluşturuldu: {row_count} satır.")
+            return True
+    except Exception as e:
+        logging.error(f"Saatlik özet tablosu oluşturma hatası: {e}")
+        return False
+
+# --- Uygulama Boyut Tablosu (apps) Fonksiyonları ---
+# apps tablosu her uygulama için tek satır tutar ve usage_logs ile aynı
+# transaction'da güncellenir; uygulama listeleri log tablosunu taramaz.
+
+_APPS_UPSERT_SQL = """
+    INSERT INTO apps (process_name, first_seen, last_seen, session_count, total_seconds)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(process_name) DO UPDATE SET
+        first_seen = MIN(first_seen, excluded.first_seen),
+        last_seen = MAX(last_seen, excluded.last_seen),
+        session_count = session_count + excluded.session_count,
+        total_seconds = total_seconds + excluded.total_seconds"""
+
+_APPS_SUBTRACT_SQL = """
+    UPDATE apps SET session_count = session_count - ?, total_seconds = total_seconds - ?
+    WHERE process_name = ?"""
+
+def _add_apps_usage(conn, logs):
+    """Kayıtları uygulama başına birleştirip apps tablosuna ekler. logs: [(process_name, start, end, duration)]"""
+    apps = {}
+    for process_name, start_time, end_time, duration in logs:
+        current = apps.get(process_name)
+        if current is None:
+            apps[process_name] = [start_time, end_time, 1, duration]
+        else:
+            current[0] = min(current[0], start_time)
+            current[1] = max(current[1], end_time)
+            current[2] += 1
+            current[3] += duration
+    _upsert_apps(conn, apps)
+
+def _upsert_apps(conn, apps):
+    """{process_name: [first_seen, last_seen, oturum, saniye]} toplamlarını apps tablosuna ve sayaca ekler."""
+    existing = conn.execute(
+        f"SELECT COUNT(*) FROM apps WHERE process_name IN ({','.join('?' * len(apps))})", list(apps)).fetchone()[0]
+    _bump_stat(conn, STAT_APPS, len(apps) - existing)
+    conn.executemany(_APPS_UPSERT_SQL, [(process_name, *values) for process_name, values in apps.items()])
+
+def _subtract_apps_usage(conn, id_sql, params):
+    """Silinecek kayıtların (id IN id_sql) katkısını apps tablosundan düşer."""
+    removed = conn.execute(f"""
+        SELECT SUM(ul.session_count), SUM(ul.duration_seconds), p.name
+        FROM usage_logs ul JOIN processes p ON p.id = ul.process_id
+        WHERE ul.id IN ({id_sql}) GROUP BY ul.process_id""", params).fetchall()
+    conn.executemany(_APPS_SUBTRACT_SQL, removed)
+
+def _refresh_apps_first_seen(conn, upto_timestamp):
+    """Kayıt silindikten sonra kalmayan uygulamaları kaldırır, first_seen değerlerini günceller."""
+    removed = conn.execute("DELETE FROM apps WHERE session_count <= 0").rowcount
+    _bump_stat(conn, STAT_APPS, -removed)
+    stale = {row[0] for row in conn.execute("SELECT process_name FROM apps WHERE first_seen <= ?", (upto_timestamp,))}
+    if not stale:
+        return
+    first_seen = {}
+    # Arşivler eskiden yeniye açılır; uygulamanın en erken kaydı içinde bulunduğu ilk arşivdedir
+    with _open_archives(conn) as archives:
+        for _, archive_conn in archives:
+            if len(first_seen) == len(stale):
+                break
+            for process_name, earliest in archive_conn.execute("""
+                    SELECT p.name, MIN(ul.timestamp) FROM usage_logs ul
+                    JOIN processes p ON p.id = ul.process_id GROUP BY ul.process_id"""):
+                if process_name in stale:
+                    first_seen.setdefault(process_name, earliest)
+    for process_name in stale - first_seen.keys():
+        earliest = conn.execute("""
+            SELECT MIN(ul.timestamp) FROM processes p JOIN usage_logs ul ON ul.process_id = p.id
+            WHERE p.name = ?""", (process_name,)).fetchone()[0]
+        if earliest is not None:
+            first_seen[process_name] = earliest
+    conn.executemany("UPDATE apps SET first_seen = ? WHERE process_name = ?",
+                     [(earliest, process_name) for process_name, earliest in first_seen.items()])
+
+def rebuild_apps():
+    """apps tablosunu tüm ham loglardan (arşivler dahil) baştan oluşturur."""
+    try:
+        with write_transaction() as conn:
+            if conn is None:
+                return False
+            conn.execute("DELETE FROM apps")
+            conn.execute("""
+                INSERT INTO apps (process_name, first_seen, last_seen, session_count, total_seconds)
+                SELECT process_name, MIN(start_time), MAX(end_time), SUM(session_count), SUM(duration_seconds)
+                FROM usage_log_entries
+                GROUP BY process_name
+            """)
+            with _open_archives(conn) as archives:
+                for _, archive_conn in archives:
+                    conn.executemany(_APPS_UPSERT_SQL, archive_conn.execute("""
+                        SELECT process_name, MIN(start_time), MAX(end_time), SUM(session_count), SUM(duration_seconds)
+                        FROM usage_log_entries
+                        GROUP BY process_name""").fetchall())
+            row_count = conn.execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+            logging.info(f"Uygulama tablosu yeniden oluşturuldu: {row_count} satır.")
+            return True
+    except Exception as e:
+        logging.error(f"Uygulama tablosu oluşturma hatası: {e}")
+        return False
+
+def get_app_stats():
+    """Uygulama başına özet bilgileri döndürür: {process_name: (first_seen, last_seen, session_count, total_seconds)}"""
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            return {}
+        cursor = conn.execute("SELECT process_name, first_seen, last_seen, session_count, total_seconds FROM apps")
+        return {row[0]: row[1:] for row in cursor}
+    except Exception as e:
+        logging.error(f"Uygulama özetlerini getirme hatası: {e}")
+        return {}
+
+# --- Sayaç (stats) Fonksiyonları ---
+# Toplam log ve uygulama sayıları, kayıt ekleyen/silen işlemlerle aynı
+# transaction'da güncellenir; durum paneli COUNT(*) taraması yapmaz.
+STAT_USAGE_LOGS = 'usage_logs'
+STAT_APPS = 'apps'
+
+def _bump_stat(conn, key, delta):
+    """Sayacı delta kadar değiştirir (yazma transaction'ı içinde çağrılmalıdır)."""
+    if delta:
+        conn.execute("""
+            INSERT INTO stats (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value""", (key, delta))
+
+def rebuild_stats():
+    """Sayaçları tablolardan baştan hesaplar."""
+    try:
+        with write_transaction() as conn:
+            if conn is None:
+                return False
+            # Seyreltme ilerleme anahtarları da bu tabloda tutulur; yalnızca sayaçlar sıfırlanır
+            conn.execute("DELETE FROM stats WHERE key IN (?, ?)", (STAT_USAGE_LOGS, STAT_APPS))
+            usage_log_count = conn.execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0]
+            if _table_exists(conn, 'archive_manifest'):
+                usage_log_count += conn.execute("SELECT COALESCE(SUM(row_count), 0) FROM archive_manifest").fetchone()[0]
+            conn.executemany("INSERT INTO stats (key, value) VALUES (?, ?)", [
+                (STAT_USAGE_LOGS, usage_log_count),
+                (STAT_APPS, conn.execute("SELECT COUNT(*) FROM apps").fetchone()[0]),
+            ])
+            return True
+    except Exception as e:
+        logging.error(f"Sayaç tablosu oluşturma hatası: {e}")
+        return False
+
+def get_stats():
+    """Sayaçları {anahtar: değer} olarak döndürür."""
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            return {}
+        return dict(conn.execute("SELECT key, value FROM stats"))
+    except Exception as e:
+        logging.error(f"Sayaçları getirme hatası: {e}")
+        return {}
+
+# --- Depolama Modu ve Şifreli Segment Fonksiyonları ---
+# 'plain' (varsayılan): yalnızca düz sütunlar saklanır.
+# 'encrypted_segments': düz sütunlara ek olarak kapanmış (bugünden önceki)
+# günlerin kayıtları gün başına tek bir sıkıştırılmış ve AES ile şifrelenmiş
+# yedek kopya olarak da saklanır. Düz sütunlar şifrelenmez; bu mod verileri
+# gizlemez, dosyayı büyütür ve yalnızca makineye bağlı şifreli kopya isteyenler içindir.
+STORAGE_MODE_PLAIN = 'plain'
+STORAGE_MODE_ENCRYPTED_SEGMENTS = 'encrypted_segments'
+STORAGE_MODES = (STORAGE_MODE_PLAIN, STORAGE_MODE_ENCRYPTED_SEGMENTS)
+
+def seal_closed_days():
+    """
+    Mühürlenmemiş veya mühürlendikten sonra değişmiş kapanmış günleri şifreli
+    segment olarak yazar. Mühürlenen gün sayısını döndürür.
+    """
+    if not CRYPTO_AVAILABLE:
+        logging.warning("Şifreleme kütüphanesi yok, günlük segmentler mühürlenmedi.")
+        return 0
+
+    today = datetime.date.today().strftime('%Y-%m-%d')
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            return 0
+        # Gün başına satır sayısı daily_usage'tan O(gün) maliyetle okunur; arşivlenmiş
+        # ayların segmentleri arşiv dosyasına taşındığından yeniden mühürlenmez
+        days_to_seal = conn.execute("""
+            SELECT d.day, d.row_count
+            FROM (SELECT day, SUM(session_count) AS row_count FROM daily_usage
+                  WHERE day < ? AND substr(day, 1, 7) NOT IN (SELECT month FROM archive_manifest)
+                  GROUP BY day) d
+            LEFT JOIN encrypted_segments es ON es.day = d.day
+            WHERE es.day IS NULL OR es.row_count != d.row_count
+            ORDER BY d.day
+        """, (today,)).fetchall()
+
+        sealed = 0
+        for day, _ in days_to_seal:
+            start_ts = int(datetime.datetime.strptime(day, '%Y-%m-%d').timestamp())
+            end_ts = int((datetime.datetime.strptime(day, '%Y-%m-%d') + datetime.timedelta(days=1)).timestamp()) - 1
+            rows = conn.execute("""
+                SELECT process_name, window_title, start_time, end_time, duration_seconds, session_count
+                FROM usage_log_entries WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp
+            """, (start_ts, end_ts)).fetchall()
+            session_count = sum(r[5] for r in rows)
+            payload = encrypt_bytes(zlib.compress(json.dumps(rows, ensure_ascii=False).encode('utf-8'), 6))
+
+            # Her gün ayrı transaction'da yazılır; tracker yazmaları uzun süre beklemez
+            with write_transaction() as write_conn:
+                write_conn.execute("""
+                    INSERT OR REPLACE INTO encrypted_segments (day, row_count, sealed_at, payload)
+                    VALUES (?, ?, ?, ?)""", (day, session_count, int(datetime.datetime.now().timestamp()), payload))
+            sealed += 1
+
+        if sealed:
+            logging.info(f"{sealed} gün şifreli segment olarak mühürlendi.")
+        return sealed
+    except Exception as e:
+        logging.error(f"Günlük segment mühürleme hatası: {e}")
+        return 0
+
+def apply_storage_mode(storage_mode):
+    """
+    Depolama modunu uygular: 'encrypted_segments' modunda kapanmış günleri
+    mühürler, 'plain' modunda ana dosyadaki şifreli kopyaları siler (arşiv
+    dosyalarındakiler ay silinene kadar kalır). Mühürlenen veya silinen gün sayısını döndürür.
+    """
+    if storage_mode == STORAGE_MODE_ENCRYPTED_SEGMENTS:
+        return seal_closed_days()
+    try:
+        with write_transaction() as conn:
+            if conn is None:
+                return 0
+            dropped = conn.execute("DELETE FROM encrypted_segments").rowcount
+        if dropped:
+            logging.info(f"Düz depolama modu: {dropped} günün şifreli kopyası silindi.")
+        return dropped
+    except Exception as e:
+        logging.error(f"Şifreli segment silme hatası: {e}")
+        return 0
+
+def read_sealed_day(day):
+    """Mühürlenmiş bir günün kayıtlarını çözerek sözlük listesi olarak döndürür."""
+    try:
+        conn = get_db_connection()
+        if conn is None:
+            return []
+        row = conn.execute("SELECT payload FROM encrypted_segments WHERE day = ?", (day,)).fetchone()
+        if not row:
+            # Arşivlenmiş ayların segmentleri arşiv dosyasında tutulur
+            with _open_archives(conn, *_month_bounds(day[:7])) as archives:
+                for _, archive_conn in archives:
+                    row = archive_conn.execute("SELECT payload FROM encrypted_segments WHERE day = ?", (day,)).fetchone()
+        if not row:
+            return []
+        rows = json.loads(zlib.decompress(decrypt_bytes(row[0])).decode('utf-8'))
+        keys = ('process_name', 'window_title', 'start_time', 'end_time', 'duration_seconds', 'session_count')
+        return [dict(zip(keys, r)) for r in rows]
+    except Exception as e:
+        logging.error(f"Mühürlü gün okuma hatası ({day}): {e}")
+        return []
+
+def vacuum_database():
+    """Veritabanı dosyasını sıkıştırır ve geri kazanılan byte miktarını döndürür."""
+    try:
+        with _write_lock:
+            conn = _get_writer_connection()
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            # Eski dosyalarda artımlı vakumu etkinleştir (yalnızca VACUUM ile uygulanır)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+        reclaimed = (pages_before - pages_after) * page_size
+        logging.info(f"VACUUM tamamlandı, {reclaimed} byte geri kazanıldı.")
+        return reclaimed
+    except Exception as e:
+        logging.error(f"VACUUM hatası: {e}")
+        return 0
+
+def incremental_vacuum(step_pages=256, pause_seconds=0.05, stop_event=None):
+    """
+    auto_vacuum=INCREMENTAL olan veritabanında boş sayfaları küçük adımlarla
+    dosyaya iade eder. Adımlar arasında yazıcı kilidi bırakılır; tracker
+    yazmaları beklemez. Geri kazanılan byte miktarını döndürür.
+    """
+    started = time.perf_counter()
+    reclaimed = 0
+    try:
+        with _write_lock:
+            conn = _get_writer_connection()
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logging.debug("auto_vacuum INCREMENTAL değil, artımlı vakum atlandı.")
+                return 0
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+        while not (stop_event and stop_event.is_set()):
+            with write_transaction() as conn:
+                if conn is None:
+                    break
+                free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free_before == 0:
+                    break
+                # Pragma her sonuç satırında bir sayfa boşaltır; tüm adımlar için sonuçlar tüketilmelidir.
+                # executescript kullanılmaz: açık transaction'ı commit eder ve write_transaction'ı bozar
+                conn.execute(f"PRAGMA incremental_vacuum({int(step_pages)})").fetchall()
+                freed = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            reclaimed += freed * page_size
+            if freed <= 0:
+                break
+            time.sleep(pause_seconds)
+
+        if reclaimed:
+            with _write_lock:
+                # WAL içeriğini ana dosyaya aktar ki dosya boyutu gerçekten küçülsün
+                _get_writer_connection().execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+            logging.info(f"Artımlı vakum: {reclaimed} byte geri kazanıldı, {time.perf_counter() - started:.2f} sn sürdü.")
+    except Exception as e:
+        logging.error(f"Artımlı vakum hatası: {e}")
+    return reclaimed
+
+def delete_old_usage_logs(days_to_keep, batch_size=5000, pause_seconds=0.05, stop_event=None):
+    """
+    Belirtilen gün sayısından daha eski kullanım loglarını en fazla batch_size
+    satırlık parçalar halinde siler (0 = sonsuza kadar sakla). Her parça ayrı
+    bir transaction'dır ve sayaçlarla apps toplamları aynı transaction'da
+    düşülür; parçalar arasında yazıcı kilidi bırakılır. Günlük/saatlik özetler,
+    first_seen değerleri ve şifreli segmentler döngüden sonra bir kez
+    düzeltilir. Tamamı kesimden eski arşiv ayları dosya olarak silinir.
+    Silinen log sayısını döndürür.
+    """
+    if days_to_keep <= 0:
+        return 0
+
+    started = time.perf_counter()
+    deleted = 0
+    last_end = None
+    try:
+        cutoff_timestamp = int((datetime.datetime.now() - datetime.timedelta(days=days_to_keep)).timestamp())
+        deleted += _drop_expired_archives(cutoff_timestamp)
+
+        # Aynı zaman damgasını paylaşan çok sayıda kayıt olsa da parça boyutu sınırlı kalır
+        batch_sql = "SELECT id FROM usage_logs WHERE timestamp < ? ORDER BY timestamp, id LIMIT ?"
+        batch_params = (cutoff_timestamp, batch_size)
+        while not (stop_event and stop_event.is_set()):
+            with write_transaction() as conn:
+                if conn is None:
+                    break
+                cursor = conn.cursor()
+                batch_end = cursor.execute(f"SELECT MAX(timestamp) FROM usage_logs WHERE id IN ({batch_sql})",
+                                           batch_params).fetchone()[0]
+                if batch_end is None:
+                    break
+                _subtract_apps_usage(conn, batch_sql, batch_params)
+                cursor.execute(f"DELETE FROM usage_logs WHERE id IN ({batch_sql})", batch_params)
+                changed = cursor.rowcount
+                _bump_stat(conn, STAT_USAGE_LOGS, -changed)
+            deleted += changed
+            last_end = batch_end
+            if changed < batch_size:
+                break
+            time.sleep(pause_seconds)
+
+        if last_end is not None:
+            _refresh_purged_rollups(last_end)
+        if deleted:
+            _delete_orphan_window_titles()
+            logging.info(f"{deleted} adet eski kullanım logu silindi, {time.perf_counter() - started:.2f} sn sürdü.")
+        return deleted
     except Exception as e:
         logging.error(f"Eski log silme hatası: {e}")
+        return deleted
+
+def _refresh_purged_rollups(last_end):
+    """
+    Silme döngüsünden sonra, last_end zaman damgasına kadar silinmiş kayıtlar
+    için özet tabloları, first_seen değerlerini ve şifreli segmentleri düzeltir.
+    """
+    boundary_day = datetime.datetime.fromtimestamp(last_end).strftime('%Y-%m-%d')
+    with write_transaction() as conn:
+        if conn is None:
+            return
+        cursor = conn.cursor()
+        _refresh_apps_first_seen(conn, last_end)
+
+        # Tamamen silinen günlerin özetlerini kaldır, sınır gününü yeniden hesapla
+        cursor.execute("DELETE FROM daily_usage WHERE day < ?", (boundary_day,))
+        _rebuild_daily_usage_days(conn, boundary_day, boundary_day)
+        # Seyreltilmiş sınır günü yeniden hesaplanamaz; kalan ilk kaydın saatinden öncesi kaldırılır
+        next_start = cursor.execute("SELECT MIN(timestamp) FROM usage_logs").fetchone()[0]
+        keep_from = datetime.datetime.fromtimestamp(last_end + 1 if next_start is None else next_start)
+        keep_day = keep_from.strftime('%Y-%m-%d')
+        cursor.execute("DELETE FROM hourly_usage WHERE day < ? OR (day = ? AND hour < ?)",
+                       (keep_day, keep_day, keep_from.hour))
+        _rebuild_hourly_usage_days(conn, boundary_day, boundary_day)
+
+        # Sınır gününde kayıt kaldıysa segmenti korunur ve aşağıda yeniden mühürlenir
+        cursor.execute("""
+            DELETE FROM encrypted_segments
+            WHERE day < ? OR (day = ? AND NOT EXISTS (SELECT 1 FROM daily_usage WHERE day = ?))""",
+                       (boundary_day, boundary_day, boundary_day))
+        reseal = cursor.execute("SELECT 1 FROM encrypted_segments WHERE day = ?", (boundary_day,)).fetchone()
+    if reseal:
+        # Satır sayısı değişen gün mühürlenmiş olduğundan yeniden yazılır
+        seal_closed_days()
+
+# --- Kademeli Seyreltme (Downsampling) ---
+# Belirli bir yaştan eski ham oturumlar aynı uygulamanın saatlik, daha da
+# eskileri günlük satırlarında birleştirilir. Birleşen satır toplam süreyi ve
+# session_count sütununda temsil ettiği oturum sayısını taşır; böylece
+# daily_usage, hourly_usage ve apps değişmez ve kategori toplamları aynı kalır.
+# Saatlik dağılım birleşen satırlardan geri çıkarılamadığından seyreltilmiş
+# günlerin hourly_usage satırları yeniden hesaplamalarda korunur.
+DOWNSAMPLE_TIERS = (
+    # (kademe, gruplama ifadesi, ilerleme anahtarı)
+    ('hourly', "strftime('%H', timestamp, 'unixepoch', 'localtime')", 'downsampled_hourly_until'),
+    ('daily', "date(timestamp, 'unixepoch', 'localtime')", 'downsampled_daily_until'),
+)
+
+def _merge_usage_day(conn, day, bucket_sql):
+    """Bir günün satırlarını (uygulama, cihaz, kova) başına tek satırda birleştirir; azalan satır sayısını döndürür."""
+    start_ts = int(datetime.datetime.strptime(day, '%Y-%m-%d').timestamp())
+    end_ts = int((datetime.datetime.strptime(day, '%Y-%m-%d') + datetime.timedelta(days=1)).timestamp()) - 1
+    row_count, group_count = conn.execute(f"""
+        SELECT COUNT(*), COUNT(DISTINCT process_id || ':' || device_id || ':' || {bucket_sql})
+        FROM usage_logs WHERE timestamp BETWEEN ? AND ?""", (start_ts, end_ts)).fetchone()
+    if row_count == group_count:
+        return 0
+
+    # Tek oturumluk gruplar pencere başlığını korur; birleşen satırlarda başlık tutulmaz.
+    # Birleşik satır grubun ilk kaydının (uygulama, başlangıç, cihaz) anahtarını aldığından
+    # eski satırlar eklemeden önce silinir.
+    merged = conn.execute(f"""
+        SELECT process_id, CASE WHEN COUNT(*) = 1 THEN MAX(title_id) END, MIN(start_time), MAX(end_time),
+               SUM(duration_seconds), MIN(timestamp), SUM(session_count), device_id, SUM(key_count), SUM(click_count)
+        FROM usage_logs WHERE timestamp BETWEEN ? AND ?
+        GROUP BY process_id, device_id, {bucket_sql}""", (start_ts, end_ts)).fetchall()
+    deleted = conn.execute("DELETE FROM usage_logs WHERE timestamp BETWEEN ? AND ?", (start_ts, end_ts)).rowcount
+    conn.executemany("""
+        INSERT INTO usage_logs (process_id, title_id, start_time, end_time, duration_seconds, timestamp, session_count,
+                                device_id, key_count, click_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", merged)
+    inserted = len(merged)
+    _bump_stat(conn, STAT_USAGE_LOGS, inserted - deleted)
+    # Gün yeniden mühürlenir; şifreli segment de seyreltilmiş satırları tutar
+    conn.execute("DELETE FROM encrypted_segments WHERE day = ?", (day,))
+    return deleted - inserted
+
+def downsample_usage_logs(hourly_after_days, daily_after_days, pause_seconds=0.05, stop_event=None):
+    """
+    hourly_after_days günden eski oturumları saatlik, daily_after_days günden
+    eskileri günlük satırlarda birleştirir (0 = kademe kapalı). Her gün ayrı bir
+    transaction'dır. Azalan satır sayısını döndürür.
+    """
+    started = time.perf_counter()
+    reduced = 0
+    try:
+        for (tier, bucket_sql, progress_key), after_days in zip(DOWNSAMPLE_TIERS, (hourly_after_days, daily_after_days)):
+            if after_days <= 0:
+                continue
+            cutoff_day = (datetime.date.today() - datetime.timedelta(days=after_days)).strftime('%Y-%m-%d')
+            conn = get_db_connection()
+            if conn is None:
+                break
+            # İşlenen son günden sonraki gün stats tablosunda (gün sıra numarası) tutulur
+            done_until = conn.execute("SELECT value FROM stats WHERE key = ?", (progress_key,)).fetchone()
+            done_until_day = datetime.date.fromordinal(done_until[0]).strftime('%Y-%m-%d') if done_until else ''
+            days = [row[0] for row in conn.execute(
+                "SELECT DISTINCT day FROM daily_usage WHERE day >= ? AND day < ? ORDER BY day", (done_until_day, cutoff_day))]
+
+            for day in days:
+                if stop_event and stop_event.is_set():
+                    return reduced
+                with write_transaction() as write_conn:
+                    if write_conn is None:
+                        return reduced
+                    reduced += _merge_usage_day(write_conn, day, bucket_sql)
+                    write_conn.execute("INSERT OR REPLACE INTO stats (key, value) VALUES (?, ?)",
+                                       (progress_key, datetime.date.fromisoformat(day).toordinal() + 1))
+                time.sleep(pause_seconds)
+
+        if reduced:
+            _delete_orphan_window_titles()
+            logging.info(f"Seyreltme: {reduced} satır azaltıldı, {time.perf_counter() - started:.2f} sn sürdü.")
+    except Exception as e:
+        logging.error(f"Seyreltme hatası: {e}")
+    return reduced
+
+# --- Aylık Arşiv Bölümleri ---
+# Kapanmış ayların ham kayıtları (ve şifreli segmentleri) ay başına ayrı bir
+# arşiv veritabanına taşınır; ana dosyada yalnızca yakın aylar kalır. Özet
+# tablolar (daily_usage, hourly_usage, apps, stats) ana dosyada kalır ve tüm
+# geçmişi kapsar. archive_manifest her ayın dosyasını, zaman aralığını ve
+# toplamlarını tutar; ham kayıt okuyan sorgular yalnızca aralıklarıyla kesişen
+# arşivleri salt okunur olarak açar.
+
+def get_archive_dir():
+    """Arşiv dosyalarının klasörünü döndürür (ana veritabanının yanında)."""
+    return DB_FILE.parent / f"{DB_FILE.stem}_archive"
+
+def _month_bounds(month):
+    """'YYYY-MM' ayının yerel saatle kapsayıcı [başlangıç, bitiş] zaman damgalarını döndürür."""
+    first_day = datetime.datetime.strptime(month, '%Y-%m')
+    next_month = (first_day + datetime.timedelta(days=32)).replace(day=1)
+    return int(first_day.timestamp()), int(next_month.timestamp()) - 1
+
+def _archives_in_range(conn, start_timestamp, end_timestamp):
+    """Manifest'e göre aralıkla kesişen arşivleri eskiden yeniye [(ay, dosya_yolu)] olarak döndürür."""
+    rows = conn.execute("""
+        SELECT month, file_name FROM archive_manifest
+        WHERE end_ts >= ? AND start_ts <= ?
+        ORDER BY month""", (int(start_timestamp), int(end_timestamp))).fetchall()
+    archives = []
+    for month, file_name in rows:
+        path = get_archive_dir() / file_name
+        if path.exists():
+            archives.append((month, path))
+        else:
+            logging.warning(f"Arşiv dosyası bulunamadı, {month} ayı atlandı: {path}")
+    return archives
+
+@contextmanager
+def _attached_archives(conn, ranges):
+    """
+    [(başlangıç, bitiş)] aralıklarıyla kesişen arşivleri okuyucu bağlantısına
+    bağlar ve şema adlarını verir; blok bitince ayırır. Okuyucu bağlantıları
+    query_only olduğundan arşivler salt okunur kalır.
+    """
+    months = {}
+    for range_start, range_end in ranges:
+        months.update(_archives_in_range(conn, range_start, range_end))
+    schemas = []
+    try:
+        for month, path in sorted(months.items()):
+            schema = f"archive_{month.replace('-', '_')}"
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+            schemas.append(schema)
+        yield schemas
+    finally:
+        for schema in schemas:
+            try:
+                conn.execute(f"DETACH DATABASE {schema}")
+            except sqlite3.Error as e:
+                logging.error(f"Arşiv ayırma hatası ({schema}): {e}")
+
+@contextmanager
+def _open_archives(conn, start_timestamp=None, end_timestamp=None):
+    """
+    Aralıkla kesişen arşivleri ayrı, salt okunur bağlantılarla açar ve
+    [(ay, bağlantı)] listesini eskiden yeniye verir; blok bitince kapatır.
+    Açık bir transaction'ı olan bağlantıyla da kullanılabilir.
+    """
+    archives = []
+    try:
+        # Rollup yeniden oluşturma, manifest tablosu eklenmeden önceki migration'larda da çalışır
+        if _table_exists(conn, 'archive_manifest'):
+            start_timestamp = 0 if start_timestamp is None else start_timestamp
+            end_timestamp = 2**62 if end_timestamp is None else end_timestamp
+            for month, path in _archives_in_range(conn, start_timestamp, end_timestamp):
+                archive_conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+                archives.append((month, archive_conn))
+        yield archives
+    finally:
+        for _, archive_conn in archives:
+            archive_conn.close()
+
+def _iter_partition_chunks(partitions, query, params, chunk_size, cancel_event=None):
+    """Sorguyu bölümlerde (arşivler ve ana dosya) sırayla çalıştırıp fetchmany parçalarını üretir."""
+    for partition in partitions:
+        cursor = partition.execute(query, params)
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+def _archive_month(month):
+    """
+    Bir ayın ham kayıtlarını arşiv dosyasına kopyalar, ardından manifest'e
+    yazıp ana dosyadan siler. Arşivlenen satır sayısını döndürür.
+    """
+    start_ts, end_ts = _month_bounds(month)
+    first_day, last_day = f"{month}-01", f"{month}-31"
+    archive_dir = get_archive_dir()
+    archive_dir.mkdir(exist_ok=True)
+    file_name = f"{DB_FILE.stem}_{month}.db"
+    path = archive_dir / file_name
+    build_path = archive_dir / f"{file_name}.tmp"
+
+    # Kopyalama ile silme arasında aynı aya kayıt eklenmemesi için yazıcı kilidi boyunca tutulur
+    with _write_lock:
+        conn = _get_writer_connection()
+        conn.execute("ATTACH DATABASE ? AS archive_build", (str(build_path),))
+        try:
+            with write_transaction() as conn:
+                conn.execute("CREATE TABLE archive_build.processes (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+                conn.execute("""
+                    CREATE TABLE archive_build.window_titles (
+                        id INTEGER PRIMARY KEY, title_hash INTEGER NOT NULL, title TEXT NOT NULL)""")
+                conn.execute("""
+                    CREATE TABLE archive_build.usage_logs (
+                        id INTEGER PRIMARY KEY,
+                        process_id INTEGER NOT NULL,
+                        title_id INTEGER,
+                        start_time INTEGER NOT NULL,
+                        end_time INTEGER NOT NULL,
+                        duration_seconds INTEGER NOT NULL,
+                        timestamp INTEGER NOT NULL,
+                        session_count INTEGER NOT NULL DEFAULT 1,
+                        device_id INTEGER NOT NULL DEFAULT 1,
+                        key_count INTEGER NOT NULL DEFAULT 0,
+                        click_count INTEGER NOT NULL DEFAULT 0
+                    )""")
+                conn.execute("""
+                    CREATE TABLE archive_build.encrypted_segments (
+                        day TEXT PRIMARY KEY, row_count INTEGER NOT NULL,
+                        sealed_at INTEGER NOT NULL, payload BLOB NOT NULL)""")
+                # Kimlikler ana dosyadakilerle aynıdır; arşiv kendi sözlük kopyasıyla tek başına okunabilir
+                conn.execute("""
+                    INSERT INTO archive_build.usage_logs
+                        (id, process_id, title_id, start_time, end_time, duration_seconds, timestamp, session_count, device_id,
+                         key_count, click_count)
+                    SELECT id, process_id, title_id, start_time, end_time, duration_seconds, timestamp, session_count, device_id,
+                           key_count, click_count
+                    FROM main.usage_logs WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp""", (start_ts, end_ts))
+                conn.execute("""
+                    INSERT INTO archive_build.processes (id, name)
+                    SELECT id, name FROM main.processes
+                    WHERE id IN (SELECT process_id FROM archive_build.usage_logs)""")
+                conn.execute("""
+                    INSERT INTO archive_build.window_titles (id, title_hash, title)
+                    SELECT id, title_hash, title FROM main.window_titles
+                    WHERE id IN (SELECT title_id FROM archive_build.usage_logs)""")
+                conn.execute("""
+                    INSERT INTO archive_build.encrypted_segments
+                    SELECT day, row_count, sealed_at, payload FROM main.encrypted_segments
+                    WHERE day BETWEEN ? AND ?""", (first_day, last_day))
+                conn.execute("CREATE INDEX archive_build.idx_usage_logs_timestamp ON usage_logs(timestamp)")
+                conn.execute(_usage_log_entries_view_sql('archive_build'))
+                totals = conn.execute("""
+                    SELECT COUNT(*), MIN(timestamp), MAX(timestamp), SUM(session_count), SUM(duration_seconds)
+                    FROM archive_build.usage_logs""").fetchone()
+        finally:
+            conn.execute("DETACH DATABASE archive_build")
+
+        row_count = totals[0]
+        if row_count == 0:
+            build_path.unlink()
+            return 0
+        os.replace(build_path, path)
+
+        with write_transaction() as conn:
+            conn.execute("""
+                INSERT INTO archive_manifest
+                    (month, file_name, start_ts, end_ts, row_count, session_count, total_seconds, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (month, file_name, *totals[1:3], row_count, *totals[3:5], int(datetime.datetime.now().timestamp())))
+            # Özet tablolar ve sayaçlar tüm geçmişi kapsadığından değişmez
+            conn.execute("DELETE FROM usage_logs WHERE timestamp BETWEEN ? AND ?", (start_ts, end_ts))
+            conn.execute("DELETE FROM encrypted_segments WHERE day BETWEEN ? AND ?", (first_day, last_day))
+    return row_count
+
+def archive_closed_months(keep_months, pause_seconds=0.05, stop_event=None):
+    """
+    İçinde bulunulan ay ve ondan önceki keep_months ay dışındaki kapanmış
+    ayların ham kayıtlarını ay başına bir arşiv dosyasına taşır (0 = kapalı).
+    Arşivlenen ay sayısını döndürür.
+    """
+    if keep_months <= 0:
+        return 0
+
+    started = time.perf_counter()
+    archived_months = archived_rows = 0
+    try:
+        cutoff = datetime.date.today().replace(day=1)
+        for _ in range(keep_months):
+            cutoff = (cutoff - datetime.timedelta(days=1)).replace(day=1)
+        conn = get_db_connection()
+        if conn is None:
+            return 0
+        _remove_orphan_archive_files(conn)
+        months = [row[0] for row in conn.execute("""
+            SELECT DISTINCT substr(day, 1, 7) FROM daily_usage
+            WHERE day < ? AND substr(day, 1, 7) NOT IN (SELECT month FROM archive_manifest)
+            ORDER BY 1""", (cutoff.strftime('%Y-%m-%d'),))]
+
+        for month in months:
+            if stop_event and stop_event.is_set():
+                break
+            row_count = _archive_month(month)
+            if row_count:
+                archived_months += 1
+                archived_rows += row_count
+                logging.info(f"{month} ayı arşivlendi: {row_count} kayıt.")
+            time.sleep(pause_seconds)
+
+        if archived_months:
+            _delete_orphan_window_titles()
+            logging.info(f"Arşivleme: {archived_months} ay ({archived_rows} kayıt) taşındı, "
+                         f"{time.perf_counter() - started:.2f} sn sürdü.")
+    except Exception as e:
+        logging.error(f"Aylık arşivleme hatası: {e}")
+    return archived_months
+
+def _remove_orphan_archive_files(conn):
+    """
+    Manifest'te olmayan arşiv klasörü dosyalarını siler: yarıda kalmış bir
+    arşivlemenin kopyası (kayıtlar hâlâ ana dosyadadır) veya silinememiş eski arşivler.
+    """
+    archive_dir = get_archive_dir()
+    if not archive_dir.exists():
+        return
+    known = {row[0] for row in conn.execute("SELECT file_name FROM archive_manifest")}
+    for path in archive_dir.iterdir():
+        if path.name not in known:
+            try:
+                path.unlink()
+            except OSError as e:
+                logging.warning(f"Artık arşiv dosyası silinemedi ({path.name}): {e}")
+
+def _drop_expired_archives(cutoff_timestamp):
+    """
+    Tüm kayıtları kesimden eski olan arşiv aylarını siler; özet tablolar,
+    apps ve sayaçlar aynı transaction'da güncellenir. Silinen kayıt sayısını döndürür.
+    """
+    conn = get_db_connection()
+    if conn is None:
         return 0
+    expired = conn.execute("""
+        SELECT month, file_name, end_ts, row_count FROM archive_manifest
+        WHERE end_ts < ? ORDER BY month""", (cutoff_timestamp,)).fetchall()
+
+    dropped = 0
+    for month, file_name, end_ts, row_count in expired:
+        removed = []
+        with _open_archives(conn, *_month_bounds(month)) as archives:
+            for _, archive_conn in archives:
+                removed = archive_conn.execute("""
+                    SELECT SUM(ul.session_count), SUM(ul.duration_seconds), p.name
+                    FROM usage_logs ul JOIN processes p ON p.id = ul.process_id
+                    GROUP BY ul.process_id""").fetchall()
+
+        with write_transaction() as write_conn:
+            if write_conn is None:
+                break
+            write_conn.execute("DELETE FROM archive_manifest WHERE month = ?", (month,))
+            write_conn.executemany(_APPS_SUBTRACT_SQL, removed)
+            _bump_stat(write_conn, STAT_USAGE_LOGS, -row_count)
+            _refresh_apps_first_seen(write_conn, end_ts)
+            write_conn.execute("DELETE FROM daily_usage WHERE day BETWEEN ? AND ?", (f"{month}-01", f"{month}-31"))
+            write_conn.execute("DELETE FROM hourly_usage WHERE day BETWEEN ? AND ?", (f"{month}-01", f"{month}-31"))
+        try:
+            (get_archive_dir() / file_name).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Dosya başka bir okuyucuda açıksa bir sonraki arşivleme turunda artık dosya olarak silinir
+            logging.warning(f"Arşiv dosyası silinemedi ({file_name}): {e}")
+        dropped += row_count
+        logging.info(f"{month} arşivi saklama süresi dolduğu için silindi: {row_count} kayıt.")
+    return dropped
+
+def _delete_orphan_window_titles():
+    """Hiçbir kullanım kaydının başvurmadığı pencere başlıklarını siler."""
+    with write_transaction() as conn:
+        if conn is None:
+            return 0
+        removed = conn.execute("""
+            DELETE FROM window_titles
+            WHERE id NOT IN (SELECT title_id FROM usage_logs WHERE title_id IS NOT NULL)""").rowcount
+        # Silinen kimlikler önbellekte kalmamalı
+        _title_ids.clear()
+    if removed:
+        logging.info(f"{removed} kullanılmayan pencere başlığı silindi.")
+    return removed
+
+# --- Toplu İçe Aktarma ---
+# Dışa aktarılmış veya başka izleyicilerden gelen kayıtlar büyük parçalar
+# halinde eklenir. (uygulama, başlangıç zamanı) anahtarı tekil olduğundan var
+# olan kayıtlar atlanır; aynı dosya tekrar içe aktarılabilir. Özet tablolar,
+# apps ve sayaçlar her parçanın sonunda yeni satırlardan SQL ile toplu güncellenir.
+
+def _unarchive_month(month):
+    """
+    Arşivlenmiş bir ayın kayıtlarını ve segmentlerini ana dosyaya geri taşır
+    (o aya kayıt içe aktarılırken). Özet tablolar ve sayaçlar tüm geçmişi
+    kapsadığından değişmez; ay bir sonraki arşivleme turunda yeniden arşivlenir.
+    """
+    conn = get_db_connection()
+    row = conn.execute("SELECT file_name FROM archive_manifest WHERE month = ?", (month,)).fetchone()
+    if row is None:
+        return 0
+    path = get_archive_dir() / row[0]
+
+    with _write_lock:
+        conn = _get_writer_connection()
+        conn.execute("ATTACH DATABASE ? AS archive_restore", (str(path),))
+        try:
+            with write_transaction() as conn:
+                # Sözlük kimlikleri ana dosyada değişmiş olabilir; ad ve başlıklar metinleriyle eşlenir
+                conn.execute("INSERT OR IGNORE INTO main.processes (name) SELECT name FROM archive_restore.processes")
+                conn.execute("""
+                    INSERT INTO main.window_titles (title_hash, title)
+                    SELECT at.title_hash, at.title FROM archive_restore.window_titles at
+                    WHERE NOT EXISTS (SELECT 1 FROM main.window_titles wt
+                                      WHERE wt.title_hash = at.title_hash AND wt.title = at.title)""")
+                restored = conn.execute("""
+                    INSERT INTO main.usage_logs
+                        (id, process_id, title_id, start_time, end_time, duration_seconds, timestamp, session_count, device_id,
+                         key_count, click_count)
+                    SELECT ul.id, p.id,
+                           (SELECT MIN(wt.id) FROM main.window_titles wt
+                            WHERE wt.title_hash = at.title_hash AND wt.title = at.title),
+                           ul.start_time, ul.end_time, ul.duration_seconds, ul.timestamp, ul.session_count, ul.device_id,
+                           ul.key_count, ul.click_count
+                    FROM archive_restore.usage_logs ul
+                    JOIN archive_restore.processes ap ON ap.id = ul.process_id
+                    JOIN main.processes p ON p.name = ap.name
+                    LEFT JOIN archive_restore.window_titles at ON at.id = ul.title_id""").rowcount
+                conn.execute("INSERT OR REPLACE INTO main.encrypted_segments SELECT * FROM archive_restore.encrypted_segments")
+                conn.execute("DELETE FROM archive_manifest WHERE month = ?", (month,))
+        finally:
+            conn.execute("DETACH DATABASE archive_restore")
+    try:
+        path.unlink()
+    except OSError as e:
+        # Manifest'te olmayan dosya bir sonraki arşivleme turunda silinir
+        logging.warning(f"Geri taşınan arşiv dosyası silinemedi ({path.name}): {e}")
+    logging.info(f"{month} arşivi içe aktarma için ana dosyaya geri taşındı: {restored} kayıt.")
+    return restored
+
+def _unarchive_months_for(conn, starts):
+    """Başlangıç zamanlarından herhangi biri arşivlenmiş bir aya düşüyorsa o ayları geri taşır."""
+    if not starts or not _table_exists(conn, 'archive_manifest'):
+        return
+    first, last = min(starts), max(starts)
+    for month, _ in _archives_in_range(conn, first, last):
+        month_start, month_end = _month_bounds(month)
+        if any(month_start <= start <= month_end for start in starts):
+            _unarchive_month(month)
+
+def _add_imported_rollups(conn, names, rows):
+    """
+    İçe aktarılan kayıtların katkısını özet tablolara, apps tablosuna ve sayaçlara toplu ekler.
+    names: uygulama adları; rows: [(process_id, title_id, start_time, end_time, duration, timestamp,
+    session_count, device_id, key_count, click_count)]
+    """
+    # Tüm toplamlar tek geçişte, yerel saat dilimi önbelleğiyle hesaplanır
+    daily = {}
+    hourly = {}
+    apps = {}
+    slots = {}
+    for process_name, (_, _, start_time, end_time, duration, _, sessions, device_id, _, _) in zip(names, rows):
+        day, hour, hour_end = slots.get(start_time // 900) or _local_hour_slot(start_time, slots)
+        totals = daily.get((day, process_name, device_id))
+        if totals is None:
+            daily[(day, process_name, device_id)] = [duration, sessions]
+        else:
+            totals[0] += duration
+            totals[1] += sessions
+        app = apps.get(process_name)
+        if app is None:
+            apps[process_name] = [start_time, end_time, sessions, duration]
+        else:
+            if start_time < app[0]:
+                app[0] = start_time
+            if end_time > app[1]:
+                app[1] = end_time
+            app[2] += sessions
+            app[3] += duration
+        if process_name == 'idle' or duration <= 0:
+            continue
+        if start_time + duration <= hour_end:
+            hourly[(day, hour, device_id)] = hourly.get((day, hour, device_id), 0) + duration
+        else:
+            for split_day, split_hour, seconds in _split_by_hour(start_time, duration):
+                hourly[(split_day, split_hour, device_id)] = hourly.get((split_day, split_hour, device_id), 0) + seconds
+    conn.executemany("""
+        INSERT INTO daily_usage (day, process_name, device_id, total_seconds, session_count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(day, process_name, device_id) DO UPDATE SET
+            total_seconds = total_seconds + excluded.total_seconds,
+            session_count = session_count + excluded.session_count""",
+        [key + tuple(totals) for key, totals in daily.items()])
+    _upsert_hourly_usage(conn, hourly)
+    _upsert_apps(conn, apps)
+    _bump_stat(conn, STAT_USAGE_LOGS, len(rows))
+
+def _downsampled_until(conn):
+    """Seyreltme kademelerinin işlediği günlerin bitişini {kademe: zaman_damgası} olarak döndürür."""
+    merged_until = {}
+    for tier, _, progress_key in DOWNSAMPLE_TIERS:
+        row = conn.execute("SELECT value FROM stats WHERE key = ?", (progress_key,)).fetchone()
+        if row:
+            merged_until[tier] = int(datetime.datetime.combine(
+                datetime.date.fromordinal(row[0]), datetime.time()).timestamp())
+    return merged_until
+
+def _drop_merged_duplicates(conn, after_id, existing_until_id, merged_until):
+    """
+    Seyreltilmiş günlere düşen yeni (id'si after_id'den büyük) kayıtlardan, aynı
+    cihazdaki aynı uygulamanın aynı kovasında (saat veya gün) içe aktarmadan önce de kaydı
+    (id <= existing_until_id) olanları siler; bu oturumlar birleştirilmiş
+    satırlarda zaten temsil edilir. Kalan yeni kayıtların günlerini {gün: kademe}
+    olarak döndürür.
+    """
+    daily_until = merged_until.get('daily', 0)
+    candidates = conn.execute("SELECT id, process_id, device_id, timestamp FROM usage_logs WHERE id > ? AND timestamp < ?",
+                              (after_id, max(merged_until.values()))).fetchall()
+    covered = []
+    merge_days = {}
+    for row_id, process_id, device_id, timestamp in candidates:
+        local = datetime.datetime.fromtimestamp(timestamp)
+        if timestamp < daily_until:
+            tier, bucket_start = 'daily', local.replace(hour=0, minute=0, second=0)
+            bucket_end = bucket_start + datetime.timedelta(days=1)
+        else:
+            tier, bucket_start = 'hourly', local.replace(minute=0, second=0)
+            bucket_end = bucket_start + datetime.timedelta(hours=1)
+        if conn.execute("""
+                SELECT 1 FROM usage_logs
+                WHERE process_id = ? AND device_id = ? AND timestamp >= ? AND timestamp < ? AND id <= ?
+                LIMIT 1""", (process_id, device_id, int(bucket_start.timestamp()), int(bucket_end.timestamp()),
+                             existing_until_id)).fetchone():
+            covered.append((row_id,))
+        else:
+            merge_days[local.strftime('%Y-%m-%d')] = tier
+    conn.executemany("DELETE FROM usage_logs WHERE id = ?", covered)
+    return merge_days
+
+def import_usage_logs(logs, batch_size=50000, progress_callback=None):
+    """
+    Kullanım kayıtlarını akış halinde, batch_size satırlık transaction'larla içe aktarır.
+    logs: (process_name, window_title, start_time, end_time, duration) üreten yinelenebilir nesne.
+
+    Aynı (uygulama, başlangıç zamanı) anahtarına sahip kayıtlar atlanır; yarıda
+    kalan bir içe aktarma tekrar çalıştırılarak tamamlanabilir. Seyreltilmiş
+    günlerde aynı uygulamanın aynı saatinde (günlük kademede aynı gününde) kaydı
+    olan oturumlar da atlanır, eklenenler o günlerle birlikte yeniden birleştirilir.
+    Arşivlenmiş aylara düşen kayıtlar için o aylar önce ana dosyaya geri taşınır.
+    progress_callback(eklenen, atlanan) her parçadan sonra çağrılır.
+    Dönüş: (eklenen, atlanan); veritabanı hatasında None (yazılmış parçalar
+    kalır, içe aktarma tekrar çalıştırılarak tamamlanabilir).
+    """
+    return _import_rows(((*log, 1, 0, 0) for log in logs), LOCAL_DEVICE_ID, batch_size, progress_callback)
+
+def _import_rows(logs, device_id, batch_size, progress_callback=None, on_batch=None):
+    """
+    import_usage_logs ve cihaz birleştirmesinin ortak gövdesi. logs:
+    (process_name, window_title, start_time, end_time, duration, session_count,
+    key_count, click_count) kayıtları; hepsi device_id cihazına yazılır. on_batch(conn, batch) her parça
+    aynı transaction içinde yazılırken çağrılır (eşitleme işaretleri için).
+    Dönüş: (eklenen, atlanan); veritabanı hatasında None.
+    """
+    started = time.perf_counter()
+    inserted = skipped = 0
+    merge_days = {}
+    iterator = iter(logs)
+    try:
+        conn = get_db_connection()
+        merged_until = _downsampled_until(conn)
+        # Arşivden geri taşınan kayıtlar da önceden var olan sayılır; AUTOINCREMENT sayacı hepsini kapsar
+        existing_until_id = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'usage_logs'").fetchone()[0]
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+            starts = [int(log[2]) for log in batch]
+            _unarchive_months_for(get_db_connection(), starts)
+
+            with write_transaction() as conn:
+                if conn is None:
+                    raise sqlite3.OperationalError("Veritabanı bağlantısı kurulamadı")
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM usage_logs").fetchone()[0]
+                names = [log[0] for log in batch]
+                rows = [(_process_ids.get(process_name) or _intern_process(conn, process_name),
+                         _title_ids.get(window_title) or _intern_title(conn, window_title),
+                         start_time, int(end_time), int(duration), start_time, int(session_count), device_id,
+                         key_count, click_count)
+                        for (process_name, window_title, _, end_time, duration, session_count, key_count, click_count), start_time
+                        in zip(batch, starts)]
+                conn.executemany("""
+                    INSERT INTO usage_logs
+                        (process_id, title_id, start_time, end_time, duration_seconds, timestamp, session_count, device_id,
+                         key_count, click_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(process_id, timestamp, device_id) DO NOTHING""", rows)
+                if merged_until and min(starts) < max(merged_until.values()):
+                    merge_days.update(_drop_merged_duplicates(conn, last_id, existing_until_id, merged_until))
+                batch_inserted = conn.execute("SELECT COUNT(*) FROM usage_logs WHERE id > ?", (last_id,)).fetchone()[0]
+                if batch_inserted < len(batch):
+                    # Atlananlar çıkarılır; parça içinde tekrarlanan anahtarlarda ilk kayıt eklenmiştir
+                    new_keys = set(conn.execute("SELECT process_id, timestamp FROM usage_logs WHERE id > ?", (last_id,)))
+                    added = {}
+                    for process_name, row in zip(names, rows):
+                        if (row[0], row[5]) in new_keys:
+                            added.setdefault((row[0], row[5]), (process_name, row))
+                    names = [process_name for process_name, _ in added.values()]
+                    rows = [row for _, row in added.values()]
+                if rows:
+                    _add_imported_rollups(conn, names, rows)
+                if on_batch:
+                    on_batch(conn, batch)
+            inserted += len(rows)
+            skipped += len(batch) - len(rows)
+            if progress_callback:
+                progress_callback(inserted, skipped)
+
+        # Seyreltilmiş günlere eklenen kayıtlar birleştirilir; ilerleme anahtarları geçerli kalır
+        bucket_sqls = {tier: bucket_sql for tier, bucket_sql, _ in DOWNSAMPLE_TIERS}
+        for day, tier in sorted(merge_days.items()):
+            with write_transaction() as conn:
+                _merge_usage_day(conn, day, bucket_sqls[tier])
+        if skipped:
+            # Atlanan kayıtlar için eklenmiş başlıklar temizlenir
+            _delete_orphan_window_titles()
+    except Exception as e:
+        _clear_intern_cache()
+        logging.error(f"İçe aktarma hatası ({inserted} kayıt eklendikten sonra): {e}")
+        return None
+    elapsed = time.perf_counter() - started
+    logging.info(f"İçe aktarma: {inserted} kayıt eklendi, {skipped} kayıt atlandı, {elapsed:.2f} sn "
+                 f"({(inserted + skipped) / max(elapsed, 1e-9):.0f} kayıt/sn).")
+    return inserted, skipped
+
+# --- Cihazlar ve Çoklu Makine Eşitlemesi ---
+# Her kayıt onu toplayan cihazın device_id'sini taşır; yerel cihaz her zaman
+# LOCAL_DEVICE_ID'dir. Başka bir makinenin veritabanı (veya paylaşılan klasöre
+# yazılmış eşitleme kopyası) merge_device_database ile birleştirilir. Kaynak
+# cihazdaki her cihazın aktarılan son satır id'si sync_watermarks tablosunda
+# (kaynak, cihaz) başına tutulur; tekrar eden eşitlemeler yalnızca yeni satırları okur.
+
+LOCAL_DEVICE_ID = 1
+
+def get_local_device_uuid():
+    """Bu veritabanının cihaz kimliğini (uuid) döndürür."""
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return None
+            row = conn.execute("SELECT device_uuid FROM devices WHERE id = ?", (LOCAL_DEVICE_ID,)).fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        logging.error(f"Cihaz kimliği getirme hatası: {e}")
+        return None
+
+def get_devices():
+    """Bilinen cihazları yerel cihaz önce olacak şekilde liste olarak getirir."""
+    try:
+        with get_db_connection() as conn:
+            if conn is None:
+                return []
+            return [{
+                'id': row[0],
+                'device_uuid': row[1],
+                'name': row[2],
+                'is_local': bool(row[3]),
+                'last_synced_at': row[4]
+            } for row in conn.execute(
+                "SELECT id, device_uuid, name, is_local, last_synced_at FROM devices ORDER BY is_local DESC, id")]
+    except Exception as e:
+        logging.error(f"Cihaz listesi getirme hatası: {e}")
+        return []
+
+def _ensure_device(device_uuid, name):
+    """Cihazı yerel devices tablosunda bulur, yoksa ekler; yerel device_id'yi döndürür."""
+    with write_transaction() as conn:
+        conn.execute("INSERT OR IGNORE INTO devices (device_uuid, name) VALUES (?, ?)", (device_uuid, name))
+        conn.execute("UPDATE devices SET name = ? WHERE device_uuid = ? AND is_local = 0", (name, device_uuid))
+        return conn.execute("SELECT id FROM devices WHERE device_uuid = ?", (device_uuid,)).fetchone()[0]
+
+def _iter_source_rows(partitions, source_device_id, after_id, position):
+    """
+    Kaynak veritabanının (ana dosya ve arşivleri) bir cihaza ait after_id'den
+    büyük satırlarını id sırasıyla verir. Bölümler id'ye göre birleştirildiğinden
+    verilen son satırın id'si (position[0]) eşitleme işareti olarak kullanılabilir.
+    """
+    cursors = []
+    for partition in partitions:
+        # Giriş sayaçları olmayan (eski sürüm) kaynaklarda sayaçlar 0 okunur
+        columns = {row[1] for row in partition.execute("PRAGMA table_info(usage_logs)")}
+        counters = "ul.key_count, ul.click_count" if 'key_count' in columns else "0, 0"
+        cursors.append(partition.execute(f"""
+            SELECT ul.id, p.name, wt.title, ul.start_time, ul.end_time, ul.duration_seconds, ul.session_count, {counters}
+            FROM usage_logs ul
+            JOIN processes p ON p.id = ul.process_id
+            LEFT JOIN window_titles wt ON wt.id = ul.title_id
+            WHERE ul.device_id = ? AND ul.id > ? ORDER BY ul.id""", (source_device_id, after_id)))
+    for row in heapq.merge(*cursors, key=lambda row: row[0]):
+        position[0] = row[0]
+        yield row[1:]
+
+def merge_device_database(source_path, batch_size=50000, progress_callback=None):
+    """
+    Başka bir makinenin Kognita veritabanını (veya eşitleme kopyasını) bu
+    veritabanına katar. Kaynaktaki her cihazın kayıtları o cihazın device_id'siyle
+    yazılır; bu cihazdan kaynağa geçmiş kayıtlar geri alınmaz. Kaynağın arşiv
+    ayları '<ad>_archive' klasöründen okunur; biri eksikse (ör. dosya eşitleme
+    aracı henüz taşımadıysa) eşitleme işareti o ayın kayıtlarını atlamasın diye
+    birleştirme yapılmaz. Her parça eşitleme işaretiyle
+    aynı transaction'da yazıldığından yarıda kalan birleştirme kaldığı yerden sürer.
+    Dönüş: (eklenen, atlanan); kaynak okunamaz veya kayıtlar yazılamazsa None.
+    """
+    source_path = Path(source_path)
+    started = time.perf_counter()
+    local_uuid = get_local_device_uuid()
+    if local_uuid is None:
+        return None
+    try:
+        source = sqlite3.connect(f"{source_path.resolve().as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        logging.error(f"Birleştirilecek veritabanı açılamadı ({source_path}): {e}")
+        return None
+
+    inserted = skipped = 0
+    partitions = [source]
+    try:
+        if not _table_exists(source, 'devices'):
+            logging.error(f"{source_path.name} eski bir Kognita sürümüne ait; o makinedeki Kognita güncellenmeli.")
+            return None
+        peer = source.execute("SELECT device_uuid, name FROM devices WHERE is_local = 1").fetchone()
+        if peer is None or peer[0] == local_uuid:
+            logging.error(f"{source_path.name} bu cihazın kendi veritabanı veya kopyası; birleştirilmedi.")
+            return None
+        peer_uuid = peer[0]
+
+        archive_dir = source_path.parent / f"{source_path.stem}_archive"
+        for month, file_name in source.execute("SELECT month, file_name FROM archive_manifest ORDER BY month").fetchall():
+            archive_path = archive_dir / file_name
+            if not archive_path.exists():
+                logging.error(f"Kaynağın {month} arşivi bulunamadı, birleştirme ertelendi: {archive_path}")
+                return None
+            partitions.append(sqlite3.connect(f"{archive_path.resolve().as_uri()}?mode=ro", uri=True))
+
+        for source_device_id, device_uuid, name in source.execute(
+                "SELECT id, device_uuid, name FROM devices ORDER BY id").fetchall():
+            if device_uuid == local_uuid:
+                continue
+            device_id = _ensure_device(device_uuid, name)
+            watermark = get_db_connection().execute(
+                "SELECT last_row_id FROM sync_watermarks WHERE peer_uuid = ? AND device_uuid = ?",
+                (peer_uuid, device_uuid)).fetchone()
+            position = [watermark[0] if watermark else 0]
+
+            def save_watermark(conn, batch, device_uuid=device_uuid, position=position):
+                now = int(time.time())
+                conn.execute("""
+                    INSERT OR REPLACE INTO sync_watermarks (peer_uuid, device_uuid, last_row_id, synced_at)
+                    VALUES (?, ?, ?, ?)""", (peer_uuid, device_uuid, position[0], now))
+                conn.execute("UPDATE devices SET last_synced_at = ? WHERE device_uuid = ?", (now, device_uuid))
+
+            result = _import_rows(
+                _iter_source_rows(partitions, source_device_id, position[0], position),
+                device_id, batch_size, progress_callback, on_batch=save_watermark)
+            if result is None:
+                # Yazılan parçaların eşitleme işareti kaydedilmiştir; sonraki eşitleme kaldığı yerden sürer
+                return None
+            device_inserted, device_skipped = result
+            inserted += device_inserted
+            skipped += device_skipped
+            if device_inserted or device_skipped:
+                logging.info(f"{name}: {device_inserted} kayıt eklendi, {device_skipped} kayıt zaten vardı.")
+    except Exception as e:
+        logging.error(f"Cihaz veritabanı birleştirme hatası ({source_path}): {e}")
+        return None
+    finally:
+        for partition in partitions:
+            partition.close()
+    logging.info(f"{source_path.name} birleştirildi: {inserted} kayıt eklendi, {skipped} kayıt atlandı, "
+                 f"{time.perf_counter() - started:.2f} sn sürdü.")
+    return inserted, skipped
 
 # --- Bildirim Fonksiyonları ---
 def add_notification(title, message, notification_type="info"):
     """Bildirimi veritabanına kaydeder."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
@@ -372,7 +2491,6 @@ def add_notification(title, message, notification_type="info"):
                 "INSERT INTO notifications (timestamp, title, message, type) VALUES (?, ?, ?, ?)",
                 (timestamp, title, message, notification_type)
             )
-            conn.commit()
             logging.info(f"Bildirim veritabanına eklendi: {title}")
             return True
     except Exception as e:
@@ -403,13 +2521,12 @@ def get_all_notifications():
 def mark_notification_as_read(notification_id):
     """Belirli bir bildirimi okundu olarak işaretler."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
             cursor = conn.cursor()
             cursor.execute("UPDATE notifications SET is_read = 1 WHERE id = ?", (notification_id,))
-            conn.commit()
             return True
     except Exception as e:
         logging.error(f"Bildirim okuma işaretleme hatası: {e}")
@@ -418,13 +2535,12 @@ def mark_notification_as_read(notification_id):
 def delete_notification(notification_id):
     """Belirli bir bildirimi siler."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
             cursor = conn.cursor()
             cursor.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
-            conn.commit()
             return True
     except Exception as e:
         logging.error(f"Bildirim silme hatası: {e}")
@@ -445,6 +2561,52 @@ def get_unread_notification_count():
         return 0
 
 # --- Kategori Fonksiyonları ---
+# app_categories tablosu süreç genelinde tek bir sözlükte önbelleklenir. Sözlük
+# yerinde değiştirilmez (copy-on-write); her yazmada sürüm sayacı artar, böylece
+# çağıranlar elindeki kopyanın güncel olup olmadığını ucuzca anlayabilir.
+_category_map = None
+_category_map_version = 0
+_category_map_lock = threading.Lock()
+
+def get_category_map():
+    """process_name -> kategori sözlüğünü döndürür (ilk çağrıda yüklenir; değiştirilmemelidir)."""
+    global _category_map
+    category_map = _category_map
+    if category_map is not None:
+        return category_map
+    with _category_map_lock:
+        if _category_map is None:
+            try:
+                conn = get_db_connection()
+                if conn is None:
+                    return {}
+                _category_map = dict(conn.execute("SELECT process_name, category FROM app_categories"))
+            except sqlite3.Error as e:
+                logging.error(f"Kategori önbelleği yükleme hatası: {e}")
+                return {}
+        return _category_map
+
+def get_category_map_version():
+    """Kategori önbelleğinin sürüm sayacını döndürür; her kategori değişikliğinde artar."""
+    return _category_map_version
+
+def _invalidate_category_map():
+    """Kategori önbelleğini geçersiz kılar; bir sonraki okumada tablodan yeniden yüklenir."""
+    global _category_map, _category_map_version
+    with _category_map_lock:
+        _category_map = None
+        _category_map_version += 1
+
+def _set_cached_category(process_name, category):
+    """Tek bir uygulamanın kategorisini önbelleğe yazar (write-through)."""
+    global _category_map, _category_map_version
+    with _category_map_lock:
+        if _category_map is not None:
+            updated = dict(_category_map)
+            updated[process_name] = category
+            _category_map = updated
+        _category_map_version += 1
+
 def _populate_initial_categories(conn):
     """İlk kategorileri doldurur."""
     categories = {
@@ -461,27 +2623,14 @@ def _populate_initial_categories(conn):
         "steam.exe": "Gaming Platform", "epicgameslauncher.exe": "Gaming Platform"
     }
     try:
-        cursor = conn.cursor()
-        for process, category in categories.items():
-            cursor.execute("INSERT OR IGNORE INTO app_categories (process_name, category) VALUES (?, ?)", (process, category))
-        conn.commit()
+        conn.executemany("INSERT OR IGNORE INTO app_categories (process_name, category) VALUES (?, ?)", categories.items())
         logging.info("Initial categories populated.")
     except Exception as e:
         logging.error(f"Failed to populate categories: {e}")
 
 def get_all_categories():
     """Tüm kategorileri getirir."""
-    try:
-        with get_db_connection() as conn:
-            if conn is None:
-                return []
-                
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT category FROM app_categories ORDER BY category")
-            return [item[0] for item in cursor.fetchall()]
-    except Exception as e:
-        logging.error(f"Kategorileri getirme hatası: {e}")
-        return []
+    return sorted(set(get_category_map().values()))
 
 def get_all_processes():
     """Tüm loglanmış process isimlerini döner."""
@@ -492,8 +2641,8 @@ def get_all_processes():
                 
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT process_name 
-                FROM usage_logs 
+                SELECT process_name 
+                FROM apps 
                 WHERE process_name NOT IN ('idle', 'unknown')
                 ORDER BY process_name
             """)
@@ -511,12 +2660,12 @@ def get_uncategorized_apps():
                 
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT ul.process_name 
-                FROM usage_logs ul
-                LEFT JOIN app_categories ac ON ul.process_name = ac.process_name
+                SELECT a.process_name 
+                FROM apps a
+                LEFT JOIN app_categories ac ON a.process_name = ac.process_name
                 WHERE ac.process_name IS NULL 
-                AND ul.process_name NOT IN ('idle', 'unknown')
-                ORDER BY ul.process_name
+                AND a.process_name NOT IN ('idle', 'unknown')
+                ORDER BY a.process_name
             """)
             return [row[0] for row in cursor.fetchall()]
     except Exception as e:
@@ -526,40 +2675,43 @@ def get_uncategorized_apps():
 def update_app_category(process_name, category):
     """Uygulama kategorisini günceller."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
             cursor = conn.cursor()
             cursor.execute("INSERT OR REPLACE INTO app_categories (process_name, category) VALUES (?, ?)",
                            (process_name, category))
-            conn.commit()
-            logging.info(f"Assigned category '{category}' to process '{process_name}'.")
-            return True
+        _set_cached_category(process_name, category)
+        logging.info(f"Assigned category '{category}' to process '{process_name}'.")
+        return True
     except Exception as e:
         logging.error(f"Kategori güncelleme hatası: {e}")
         return False
 
-def get_category_for_process(process_name):
-    """Process için kategorisini getirir."""
+def delete_category(category, fallback_category='Other'):
+    """Kategoriyi siler; bu kategorideki uygulamaları fallback_category'ye taşır."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
-                return 'Other'
-                
-            cursor = conn.cursor()
-            cursor.execute("SELECT category FROM app_categories WHERE process_name = ?", (process_name,))
-            result = cursor.fetchone()
-            return result[0] if result else 'Other'
+                return False
+            conn.execute("UPDATE app_categories SET category = ? WHERE category = ?", (fallback_category, category))
+        _invalidate_category_map()
+        logging.info(f"Category '{category}' deleted, apps moved to '{fallback_category}'.")
+        return True
     except Exception as e:
-        logging.error(f"Kategori getirme hatası: {e}")
-        return 'Other'
+        logging.error(f"Kategori silme hatası: {e}")
+        return False
+
+def get_category_for_process(process_name):
+    """Process için kategorisini getirir (bellekteki kategori önbelleğinden)."""
+    return get_category_map().get(process_name, 'Other')
 
 # --- Hedef Fonksiyonları ---
 def add_goal(category=None, process_name=None, goal_type=None, time_limit_minutes=None, start_time_of_day=None, end_time_of_day=None):
     """Hedef ekler veya günceller."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
@@ -569,7 +2721,6 @@ def add_goal(category=None, process_name=None, goal_type=None, time_limit_minute
                 (category, process_name, goal_type, time_limit_minutes, start_time_of_day, end_time_of_day) 
                 VALUES (?, ?, ?, ?, ?, ?)""",
                 (category, process_name, goal_type.lower() if goal_type else None, time_limit_minutes, start_time_of_day, end_time_of_day))
-            conn.commit()
             logging.info(f"Goal added/updated: Type={goal_type}, Category={category}, Process={process_name}")
             return True
     except Exception as e:
@@ -601,13 +2752,12 @@ def get_goals():
 def delete_goal(goal_id):
     """Hedef siler."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
             cursor = conn.cursor()
             cursor.execute("DELETE FROM goals WHERE id = ?", (goal_id,))
-            conn.commit()
             logging.info(f"Goal with ID {goal_id} deleted.")
             return True
     except Exception as e:
@@ -632,7 +2782,7 @@ def get_unlocked_achievement_ids():
 def unlock_achievement(ach_id, name, description, icon_path):
     """Başarım açar."""
     try:
-        with get_db_connection() as conn:
+        with write_transaction() as conn:
             if conn is None:
                 return False
                 
@@ -642,7 +2792,6 @@ def unlock_achievement(ach_id, name, description, icon_path):
                 "INSERT OR IGNORE INTO achievements (achievement_id, name, description, icon_path, unlocked_at) VALUES (?, ?, ?, ?, ?)",
                 (ach_id, name, description, icon_path, timestamp)
             )
-            conn.commit()
             add_notification(f"🏆 Yeni Başarım: {name}", description, "achievement")
             return True
     except Exception as e:
@@ -664,29 +2813,246 @@ def get_all_unlocked_achievements():
         return []
 
 # --- Dışa Aktarma Fonksiyonları ---
-def export_all_data_to_csv(file_path):
-    """Verileri CSV olarak dışa aktarır."""
+CSV_EXPORT_HEADERS = ["id", "process_name", "window_title", "start_time_str", "end_time_str", "duration_seconds"]
+
+def export_usage_logs_to_csv(file_path, start_timestamp=None, end_timestamp=None,
+                             progress_callback=None, cancel_event=None, chunk_size=10000):
+    """
+    Kullanım loglarını CSV dosyasına parça parça akıtarak yazar.
+    Zaman damgaları SQLite tarafında biçimlendirilir, satırlar fetchmany ile
+    okunup writerows ile yazılır; bellek kullanımı chunk_size ile sınırlıdır.
+    Aralıkla kesişen arşivlenmiş aylar ana dosyadaki kayıtlardan önce yazılır.
+
+    progress_callback(yazılan_satır, toplam_satır) her parçadan sonra çağrılır.
+    cancel_event set edilirse yazma durur ve yarım dosya silinir.
+    Dönüş: (başarılı_mı, hata_mesajı)
+    """
+    start_timestamp = 0 if start_timestamp is None else int(start_timestamp)
+    end_timestamp = 2**62 if end_timestamp is None else int(end_timestamp)
+    completed = False
     try:
-        all_logs = get_all_usage_logs()
-        if not all_logs:
-            logging.info("Dışa aktarılacak log verisi bulunamadı.")
-            return True, None
+        conn = get_db_connection()
+        if conn is None:
+            return False, "Veritabanı bağlantısı kurulamadı"
 
-        headers = ["id", "process_name", "window_title", "start_time_str", "end_time_str", "duration_seconds"]
-        
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(headers)
-            for log in all_logs:
-                writer.writerow([
-                    log.get("id", ""),
-                    log.get("process_name", ""),
-                    log.get("window_title", ""),
-                    datetime.datetime.fromtimestamp(log.get("start_time", 0)).strftime('%Y-%m-%d %H:%M:%S') if log.get("start_time") else '',
-                    datetime.datetime.fromtimestamp(log.get("end_time", 0)).strftime('%Y-%m-%d %H:%M:%S') if log.get("end_time") else '',
-                    log.get("duration_seconds", 0)
-                ])
+        query = """
+            SELECT id, process_name, COALESCE(window_title, ''),
+                   CASE WHEN start_time THEN strftime('%Y-%m-%d %H:%M:%S', start_time, 'unixepoch', 'localtime') ELSE '' END,
+                   CASE WHEN end_time THEN strftime('%Y-%m-%d %H:%M:%S', end_time, 'unixepoch', 'localtime') ELSE '' END,
+                   COALESCE(duration_seconds, 0)
+            FROM usage_log_entries
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        """
+        params = (start_timestamp, end_timestamp)
+        written = 0
+        started_at = datetime.datetime.now()
+
+        with _open_archives(conn, start_timestamp, end_timestamp) as archives:
+            partitions = [archive_conn for _, archive_conn in archives] + [conn]
+            total_rows = sum(partition.execute("SELECT COUNT(*) FROM usage_logs WHERE timestamp BETWEEN ? AND ?",
+                                               params).fetchone()[0] for partition in partitions)
+            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(CSV_EXPORT_HEADERS)
+                for rows in _iter_partition_chunks(partitions, query, params, chunk_size, cancel_event):
+                    writer.writerows(rows)
+                    written += len(rows)
+                    if progress_callback:
+                        progress_callback(written, total_rows)
+        completed = not (cancel_event is not None and cancel_event.is_set())
+
+        if not completed:
+            logging.info(f"CSV dışa aktarma iptal edildi ({written}/{total_rows} satır).")
+            return False, "İptal edildi"
+
+        elapsed = (datetime.datetime.now() - started_at).total_seconds()
+        rate = written / elapsed if elapsed > 0 else written
+        logging.info(f"CSV dışa aktarma tamamlandı: {written} satır, {elapsed:.2f}sn ({rate:.0f} satır/sn).")
         return True, None
     except Exception as e:
         logging.error(f"CSV dışa aktarma hatası: {e}")
         return False, str(e)
+    finally:
+        if not completed:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+# Sütunsal dışa aktarma biçimleri (dosya uzantısına göre seçilir)
+COLUMNAR_EXPORT_FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.npz': 'npz'}
+
+def _load_columnar_backend(export_format):
+    """
+    Sütunsal dışa aktarma için isteğe bağlı kütüphaneleri yükler.
+    pyarrow/numpy yalnızca bu özellik kullanıldığında içe aktarılır; uygulama
+    açılışını yavaşlatmaz.
+    """
+    if export_format in ('parquet', 'arrow'):
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+            return pyarrow
+        except ImportError:
+            return None
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+def export_usage_logs_columnar(file_path, start_timestamp=None, end_timestamp=None,
+                               progress_callback=None, cancel_event=None, row_group_size=100000):
+    """
+    Kullanım loglarını sütunsal biçimde dışa aktarır. Biçim uzantıdan belirlenir:
+    .parquet (Parquet), .arrow/.feather (Arrow IPC) - pyarrow gerektirir;
+    .npz (NumPy) - yalnızca numpy gerektirir.
+
+    process_name ve category sözlük (dictionary) kodlamalı, zaman damgaları
+    int64 olarak yazılır. Parquet/Arrow çıktısında her fetchmany parçası doğrudan
+    bir row group / record batch olur. Aralıkla kesişen arşivlenmiş aylar ana
+    dosyadaki kayıtlardan önce yazılır. Dönüş: (başarılı_mı, hata_mesajı)
+    """
+    export_format = COLUMNAR_EXPORT_FORMATS.get(Path(file_path).suffix.lower())
+    if export_format is None:
+        return False, f"Desteklenmeyen dosya uzantısı: {Path(file_path).suffix}"
+    backend = _load_columnar_backend(export_format)
+    if backend is None:
+        needed = "pyarrow" if export_format in ('parquet', 'arrow') else "numpy"
+        return False, f"Bu biçim için '{needed}' paketi gerekli (pip install {needed})"
+
+    start_timestamp = 0 if start_timestamp is None else int(start_timestamp)
+    end_timestamp = 2**62 if end_timestamp is None else int(end_timestamp)
+    completed = False
+    conn = None
+    archive_stack = ExitStack()
+    try:
+        # Anlık görüntü (snapshot) için ayrı bir okuma bağlantısı açılır; iş parçacığının
+        # paylaşılan okuyucusu dışa aktarma boyunca açık bir transaction'da tutulmaz
+        with _write_lock:
+            _get_writer_connection()
+        conn = _open_connection(read_only=True)
+
+        # Sözlükler, manifest ve satırlar aynı anlık görüntüden okunur;
+        # arşiv dosyaları bir kez yazıldıktan sonra değişmez
+        conn.execute("BEGIN")
+        params = (start_timestamp, end_timestamp)
+        archives = archive_stack.enter_context(_open_archives(conn, start_timestamp, end_timestamp))
+        partitions = [archive_conn for _, archive_conn in archives] + [conn]
+        total_rows = sum(partition.execute("SELECT COUNT(*) FROM usage_logs WHERE timestamp BETWEEN ? AND ?",
+                                           params).fetchone()[0] for partition in partitions)
+        # Uygulama sözlüğü doğrudan processes tablosundan okunur (aralığı taramaz); arşivlerdeki
+        # adlar da ana dosyanın processes tablosundan kopyalandığından sözlükte bulunur
+        process_names = [row[0] for row in conn.execute("SELECT name FROM processes ORDER BY name")]
+        category_of = dict(conn.execute("SELECT process_name, category FROM app_categories"))
+        categories = sorted(set(category_of.values()) | {'Other'})
+        process_index = {name: i for i, name in enumerate(process_names)}
+        category_index = {name: i for i, name in enumerate(categories)}
+
+        query = """
+            SELECT id, process_name, COALESCE(window_title, ''), start_time, end_time, duration_seconds
+            FROM usage_log_entries
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        """
+
+        def chunks():
+            for rows in _iter_partition_chunks(partitions, query, params, row_group_size, cancel_event):
+                yield [(row_id, process_name, title, category_of.get(process_name, 'Other'), *rest)
+                       for row_id, process_name, title, *rest in rows]
+
+        written = 0
+        started_at = datetime.datetime.now()
+        if export_format in ('parquet', 'arrow'):
+            pa = backend
+            process_dictionary = pa.array(process_names, type=pa.string())
+            category_dictionary = pa.array(categories, type=pa.string())
+            schema = pa.schema([
+                ('id', pa.int64()),
+                ('process_name', pa.dictionary(pa.int32(), pa.string())),
+                ('window_title', pa.string()),
+                ('category', pa.dictionary(pa.int32(), pa.string())),
+                ('start_time', pa.int64()),
+                ('end_time', pa.int64()),
+                ('duration_seconds', pa.int64()),
+            ])
+            if export_format == 'parquet':
+                writer = pa.parquet.ParquetWriter(file_path, schema, compression='zstd')
+            else:
+                writer = pa.ipc.new_file(file_path, schema)
+            try:
+                for rows in chunks():
+                    ids, procs, titles, cats, starts, ends, durations = zip(*rows)
+                    batch = pa.record_batch([
+                        pa.array(ids, type=pa.int64()),
+                        pa.DictionaryArray.from_arrays(
+                            pa.array([process_index[p] for p in procs], type=pa.int32()), process_dictionary),
+                        pa.array(titles, type=pa.string()),
+                        pa.DictionaryArray.from_arrays(
+                            pa.array([category_index[c] for c in cats], type=pa.int32()), category_dictionary),
+                        pa.array(starts, type=pa.int64()),
+                        pa.array(ends, type=pa.int64()),
+                        pa.array(durations, type=pa.int64()),
+                    ], schema=schema)
+                    if export_format == 'parquet':
+                        writer.write_table(pa.Table.from_batches([batch]))
+                    else:
+                        writer.write_batch(batch)
+                    written += len(rows)
+                    if progress_callback:
+                        progress_callback(written, total_rows)
+            finally:
+                writer.close()
+        else:
+            np = backend
+            title_index = {}
+            columns = {key: [] for key in ('id', 'process_code', 'title_code', 'category_code', 'start_time', 'end_time', 'duration_seconds')}
+            for rows in chunks():
+                ids, procs, titles, cats, starts, ends, durations = zip(*rows)
+                columns['id'].append(np.array(ids, dtype=np.int64))
+                columns['process_code'].append(np.array([process_index[p] for p in procs], dtype=np.int32))
+                columns['title_code'].append(np.array([title_index.setdefault(t, len(title_index)) for t in titles], dtype=np.int32))
+                columns['category_code'].append(np.array([category_index[c] for c in cats], dtype=np.int32))
+                columns['start_time'].append(np.array(starts, dtype=np.int64))
+                columns['end_time'].append(np.array(ends, dtype=np.int64))
+                columns['duration_seconds'].append(np.array(durations, dtype=np.int64))
+                written += len(rows)
+                if progress_callback:
+                    progress_callback(written, total_rows)
+            if not (cancel_event is not None and cancel_event.is_set()):
+                arrays = {key: (np.concatenate(parts) if parts else np.array([], dtype=np.int64))
+                          for key, parts in columns.items()}
+                np.savez_compressed(
+                    file_path,
+                    process_dictionary=np.array(process_names, dtype=str),
+                    category_dictionary=np.array(categories, dtype=str),
+                    title_dictionary=np.array(list(title_index), dtype=str),
+                    **arrays)
+
+        completed = not (cancel_event is not None and cancel_event.is_set())
+        if not completed:
+            logging.info(f"Sütunsal dışa aktarma iptal edildi ({written}/{total_rows} satır).")
+            return False, "İptal edildi"
+
+        elapsed = (datetime.datetime.now() - started_at).total_seconds()
+        rate = written / elapsed if elapsed > 0 else written
+        logging.info(f"{export_format} dışa aktarma tamamlandı: {written} satır, {elapsed:.2f}sn ({rate:.0f} satır/sn).")
+        return True, None
+    except Exception as e:
+        logging.error(f"Sütunsal dışa aktarma hatası: {e}")
+        return False, str(e)
+    finally:
+        archive_stack.close()
+        if conn is not None:
+            conn.close()
+        if not completed:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+def export_all_data_to_csv(file_path):
+    """Verileri CSV olarak dışa aktarır."""
+    return export_usage_logs_to_csv(file_path)
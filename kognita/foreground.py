@@ -0,0 +1,343 @@
+# kognita/foreground.py
+
+import logging
+import os
+import select
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# Pencere sistemi kütüphanelerini güvenli şekilde import et
+try:
+    from Xlib import X, display as xdisplay, error as xerror
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# Ön plandaki pencere: process_name arka uç biliyorsa dolu, değilse None (pid'den çözülür)
+ForegroundWindow = namedtuple('ForegroundWindow', ['pid', 'process_name', 'title'])
+
+class ForegroundBackend:
+    """
+    Ön plan penceresi arka uçlarının ortak arayüzü. Tracker get_foreground ile
+    o anki pencereyi okur, wait_for_change ile bir sonraki değişikliği bekler.
+    Olay tabanlı arka uçlarda (event_driven) bekleme, pencere veya başlığı
+    değiştiğinde hemen döner; diğerlerinde yalnızca zaman aşımıyla döner.
+    """
+
+    name = 'base'
+    event_driven = False
+
+    def __init__(self):
+        self._changed = threading.Event()
+
+    def start(self):
+        """Arka ucu başlatır (olay kancaları, bağlantılar)."""
+
+    def stop(self):
+        """Arka ucu durdurur ve bekleyen wait_for_change çağrısını uyandırır."""
+        self._changed.set()
+
+    def wake(self):
+        """Bekleyen wait_for_change çağrısını değişiklik olmadan uyandırır."""
+        self._changed.set()
+
+    def close(self):
+        """Arka ucun tuttuğu bağlantı ve dosya tanıtıcılarını bırakır; stop'tan sonra bir kez çağrılır."""
+
+    def get_foreground(self):
+        """Ön plandaki pencereyi ForegroundWindow olarak, pencere yoksa None döndürür."""
+        raise NotImplementedError
+
+    def wait_for_change(self, timeout):
+        """En fazla timeout saniye bekler; bir değişiklik bildirildiyse True döndürür."""
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+class NullForegroundBackend(ForegroundBackend):
+    """Ön plan penceresinin okunamadığı platformlar için; her şeyi 'unknown' olarak bildirir."""
+
+    name = 'null'
+
+    def get_foreground(self):
+        return ForegroundWindow(0, None, '')
+
+class FakeForegroundBackend(ForegroundBackend):
+    """
+    Testler için betikle sürülen arka uç; gerçek pencere sistemine dokunmaz.
+    set_foreground her çağrıldığında bekleyen tracker uyanır, böylece oturum
+    sınırları çağrı sırasıyla birebir belirlenir.
+    """
+
+    name = 'fake'
+    event_driven = True
+
+    def __init__(self, window=None):
+        super().__init__()
+        self._window = window
+        self._condition = threading.Condition()
+        self._version = 0
+        self._read_version = -1
+        self._waiting_version = -1
+
+    def set_foreground(self, pid, process_name, title):
+        """Ön plandaki pencereyi değiştirir ve değişikliği bildirir."""
+        with self._condition:
+            self._window = ForegroundWindow(pid, process_name, title)
+            self._version += 1
+        self._changed.set()
+
+    def get_foreground(self):
+        with self._condition:
+            self._read_version = self._version
+            return self._window
+
+    def wait_for_change(self, timeout):
+        with self._condition:
+            self._waiting_version = self._read_version
+            self._condition.notify_all()
+        return super().wait_for_change(timeout)
+
+    def wait_until_processed(self, timeout=5):
+        """
+        Tracker son set_foreground penceresini okuyup yeniden beklemeye geçene
+        kadar bekler; testler saati ancak bundan sonra ilerletir. Başarılıysa True.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._waiting_version == self._version, timeout)
+
+class WindowsForegroundBackend(ForegroundBackend):
+    """
+    SetWinEventHook ile ön plan değişikliklerini (EVENT_SYSTEM_FOREGROUND) ve
+    yalnızca ön plandaki işlemin başlık değişikliklerini (EVENT_OBJECT_NAMECHANGE)
+    dinler. Kancalar kendi mesaj döngüsü olan ayrı bir iş parçacığında çalışır;
+    pywin32 yerine ctypes kullanılır.
+    """
+
+    name = 'windows'
+    event_driven = True
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        super().__init__()
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self._user32.SetWinEventHook.restype = wintypes.HANDLE
+        self._user32.GetForegroundWindow.restype = wintypes.HWND
+        self._WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                                wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self._user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, self._WinEventProc,
+                                                 wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        self._callback = self._WinEventProc(self._on_event)  # Çöp toplayıcıya karşı referans tutulur
+        self._foreground_hwnd = None
+        self._title_hook = None
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="KognitaForegroundHook", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        if not self.event_driven:
+            logging.warning("Ön plan olay kancası kurulamadı, pencere değişiklikleri zaman aşımıyla okunacak.")
+
+    def stop(self):
+        if self._thread_id:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        if self._thread:
+            self._thread.join(timeout=2)
+        super().stop()
+
+    def _run(self):
+        """Kancaları kurar ve WM_QUIT gelene kadar mesaj döngüsünü çalıştırır."""
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        # Kognita'nın kendi penceresine geçiş de oturum sınırıdır; bu kancada kendi işlem atlanmaz
+        foreground_hook = self._user32.SetWinEventHook(
+            self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND, 0, self._callback, 0, 0,
+            self.WINEVENT_OUTOFCONTEXT)
+        if not foreground_hook:
+            self.event_driven = False
+            self._ready.set()
+            return
+        self._watch_titles(self._user32.GetForegroundWindow())
+        self._ready.set()
+        msg = self._wintypes.MSG()
+        try:
+            while self._user32.GetMessageW(self._ctypes.byref(msg), 0, 0, 0) > 0:
+                self._user32.TranslateMessage(self._ctypes.byref(msg))
+                self._user32.DispatchMessageW(self._ctypes.byref(msg))
+        finally:
+            if self._title_hook:
+                self._user32.UnhookWinEvent(self._title_hook)
+            self._user32.UnhookWinEvent(foreground_hook)
+
+    def _watch_titles(self, hwnd):
+        """Başlık kancasını yalnızca yeni ön plan penceresinin işlemine taşır."""
+        self._foreground_hwnd = hwnd
+        if self._title_hook:
+            self._user32.UnhookWinEvent(self._title_hook)
+            self._title_hook = None
+        if not hwnd:
+            return
+        pid = self._wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd, self._ctypes.byref(pid))
+        self._title_hook = self._user32.SetWinEventHook(
+            self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE, 0, self._callback,
+            pid.value, 0, self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS)
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        """WinEvent geri çağrısı; yalnızca bayrak kaldırır, pencere bilgisi tracker'da okunur."""
+        if event == self.EVENT_SYSTEM_FOREGROUND:
+            self._watch_titles(hwnd)
+            self._changed.set()
+        elif id_object == self.OBJID_WINDOW and id_child == 0 and hwnd == self._foreground_hwnd:
+            self._changed.set()
+
+    def get_foreground(self):
+        hwnd = self._user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        pid = self._wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd, self._ctypes.byref(pid))
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        buffer = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return ForegroundWindow(pid.value, None, buffer.value)
+
+class X11ForegroundBackend(ForegroundBackend):
+    """
+    Kök penceredeki _NET_ACTIVE_WINDOW ve etkin penceredeki _NET_WM_NAME
+    özellik değişikliklerini (PropertyNotify) python-xlib ile dinler. Bekleme
+    X bağlantısının soketi üzerinde select ile yapılır; olay yokken CPU kullanılmaz.
+    Wayland oturumlarında yalnızca XWayland üzerinden çalışan pencereler görülür.
+    """
+
+    name = 'x11'
+    event_driven = True
+
+    def __init__(self):
+        super().__init__()
+        self._display = None
+        self._root = None
+        self._window = None
+        # wake başka iş parçacıklarından çağrılır; kapatılmış (ve yeniden kullanılmış olabilecek) uca yazılmaz
+        self._pipe_lock = threading.Lock()
+        self._wake_read, self._wake_write = os.pipe()
+
+    def start(self):
+        self._display = xdisplay.Display()
+        self._root = self._display.screen().root
+        self._atoms = {name: self._display.intern_atom(name)
+                       for name in ('_NET_ACTIVE_WINDOW', '_NET_WM_NAME', 'WM_NAME', '_NET_WM_PID', 'UTF8_STRING')}
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._watch_window(self._active_window_id())
+        self._display.flush()
+
+    def stop(self):
+        self.wake()
+        super().stop()
+
+    def wake(self):
+        with self._pipe_lock:
+            if self._wake_write is not None:
+                os.write(self._wake_write, b'\0')
+
+    def close(self):
+        if self._display is not None:
+            try:
+                self._display.close()
+            except Exception as e:
+                logging.debug(f"X11 bağlantısı kapatılırken hata: {e}")
+            self._display = None
+        with self._pipe_lock:
+            for fd in (self._wake_read, self._wake_write):
+                if fd is not None:
+                    os.close(fd)
+            self._wake_read = self._wake_write = None
+
+    def _active_window_id(self):
+        prop = self._root.get_full_property(self._atoms['_NET_ACTIVE_WINDOW'], X.AnyPropertyType)
+        return prop.value[0] if prop and len(prop.value) else 0
+
+    def _watch_window(self, window_id):
+        """Başlık değişikliklerini yalnızca etkin pencerede dinler."""
+        try:
+            if self._window is not None:
+                self._window.change_attributes(event_mask=X.NoEventMask)
+            self._window = self._display.create_resource_object('window', window_id) if window_id else None
+            if self._window is not None:
+                self._window.change_attributes(event_mask=X.PropertyChangeMask)
+        except xerror.XError as e:
+            logging.debug(f"X11 pencere izleme hatası: {e}")
+            self._window = None
+
+    def _process_events(self):
+        """Bekleyen X olaylarını işler; etkin pencere veya başlığı değiştiyse True döndürür."""
+        changed = False
+        while self._display.pending_events():
+            event = self._display.next_event()
+            if event.type != X.PropertyNotify:
+                continue
+            if event.atom == self._atoms['_NET_ACTIVE_WINDOW']:
+                self._watch_window(self._active_window_id())
+                changed = True
+            elif event.atom in (self._atoms['_NET_WM_NAME'], self._atoms['WM_NAME']) and \
+                    self._window is not None and event.window.id == self._window.id:
+                changed = True
+        self._display.flush()
+        return changed
+
+    def wait_for_change(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._process_events():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self._display, self._wake_read], [], [], remaining)
+            if self._wake_read in ready:
+                os.read(self._wake_read, 64)
+                return True
+
+    def get_foreground(self):
+        window_id = self._active_window_id()
+        if not window_id:
+            return None
+        try:
+            window = self._display.create_resource_object('window', window_id)
+            pid_prop = window.get_full_property(self._atoms['_NET_WM_PID'], X.AnyPropertyType)
+            title_prop = (window.get_full_property(self._atoms['_NET_WM_NAME'], self._atoms['UTF8_STRING'])
+                          or window.get_full_property(self._atoms['WM_NAME'], X.AnyPropertyType))
+        except xerror.XError as e:
+            logging.debug(f"X11 etkin pencere okunamadı: {e}")
+            return None
+        title = title_prop.value if title_prop else b''
+        if isinstance(title, bytes):
+            title = title.decode('utf-8', errors='replace')
+        return ForegroundWindow(int(pid_prop.value[0]) if pid_prop else 0, None, title)
+
+def create_backend():
+    """Çalışılan platform için uygun ön plan penceresi arka ucunu oluşturur."""
+    if sys.platform == 'win32':
+        return WindowsForegroundBackend()
+    if sys.platform.startswith('linux') and os.environ.get('DISPLAY') and XLIB_AVAILABLE:
+        if os.environ.get('WAYLAND_DISPLAY'):
+            # Wayland, istemcilere odaktaki pencereyi bildiren standart bir protokol sunmaz
+            logging.warning("Wayland oturumu: yalnızca XWayland pencereleri izlenebilir.")
+        return X11ForegroundBackend()
+    logging.warning(f"{sys.platform} için ön plan penceresi arka ucu yok; etkinlik 'unknown' olarak kaydedilecek.")
+    return NullForegroundBackend()
@@ -0,0 +1,153 @@
+# kognita/importer.py
+
+import csv
+import datetime
+import json
+import logging
+from pathlib import Path
+from . import database
+
+# Desteklenen içe aktarma biçimleri
+IMPORT_FORMATS = ('csv', 'json', 'activitywatch')
+
+# ActivityWatch pencere izleyicisinin kova tipi; AFK ve diğer kovalar içe aktarılmaz
+_AW_WINDOW_BUCKET_TYPE = 'currentwindow'
+
+# 'MM:SS' -> saat başından itibaren saniye
+_SECONDS_IN_HOUR = {f"{minute:02d}:{second:02d}": minute * 60 + second for minute in range(60) for second in range(60)}
+
+def _parse_local_time(value, hours):
+    """
+    'YYYY-MM-DD HH:MM:SS' biçimli yerel zamanı Unix zaman damgasına çevirir.
+    Saat başlarının zaman damgası hours sözlüğünde saklanır; dakika ve saniye eklenir.
+    """
+    hour_start = hours.get(value[:13])
+    if hour_start is None:
+        hour_start = hours[value[:13]] = int(datetime.datetime.fromisoformat(value[:13] + ':00:00').timestamp())
+    return hour_start + _SECONDS_IN_HOUR[value[14:]]
+
+def _parse_time(value):
+    """Sayı (Unix zaman damgası) veya ISO 8601 metnini Unix zaman damgasına çevirir."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+def iter_kognita_csv(file_path):
+    """
+    export_all_data_to_csv ile yazılmış CSV dosyasını satır satır okur.
+    Boş pencere başlığı başlıksız kayıt olarak alınır.
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header != database.CSV_EXPORT_HEADERS:
+            raise ValueError(f"Beklenmeyen CSV başlığı: {header}")
+        hours = {}
+        for _, process_name, window_title, start_str, end_str, duration in reader:
+            start_time = _parse_local_time(start_str, hours)
+            duration = int(duration)
+            end_time = _parse_local_time(end_str, hours) if end_str else start_time + duration
+            yield process_name, window_title or None, start_time, end_time, duration
+
+def _records_from_json(file_path):
+    """JSON dizisi veya her satırı bir nesne olan JSON Lines dosyasındaki kayıtları verir."""
+    with open(file_path, encoding='utf-8-sig') as json_file:
+        first_char = json_file.read(1)
+        while first_char.isspace():
+            first_char = json_file.read(1)
+        json_file.seek(0)
+        if first_char == '[':
+            yield from json.load(json_file)
+            return
+        # JSON Lines dosyası satır satır okunur, bellekte tutulmaz
+        for line in json_file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def iter_json(file_path):
+    """
+    process_name, window_title, start_time, end_time ve duration_seconds
+    alanlı kayıtları okur. Zamanlar Unix zaman damgası veya ISO 8601 olabilir;
+    end_time veya duration_seconds eksikse diğerinden hesaplanır.
+    """
+    for record in _records_from_json(file_path):
+        start_time = _parse_time(record['start_time'])
+        if record.get('end_time') is not None:
+            end_time = _parse_time(record['end_time'])
+            duration = int(record.get('duration_seconds', end_time - start_time))
+        else:
+            duration = int(record['duration_seconds'])
+            end_time = start_time + duration
+        yield record['process_name'], record.get('window_title') or None, start_time, end_time, duration
+
+def iter_activitywatch(file_path):
+    """
+    ActivityWatch dışa aktarma dosyasının (tüm kovalar veya tek kova) pencere
+    izleyicisi olaylarını okur. Uygulama adı data.app, başlık data.title alanından alınır.
+    """
+    with open(file_path, encoding='utf-8-sig') as json_file:
+        export = json.load(json_file)
+    buckets = export['buckets'].values() if 'buckets' in export else [export]
+    for bucket in buckets:
+        if bucket.get('type', _AW_WINDOW_BUCKET_TYPE) != _AW_WINDOW_BUCKET_TYPE:
+            continue
+        for event in bucket.get('events', []):
+            data = event.get('data', {})
+            if not data.get('app'):
+                continue
+            start_time = _parse_time(event['timestamp'])
+            duration = int(event.get('duration', 0))
+            yield data['app'], data.get('title') or None, start_time, start_time + duration, duration
+
+_READERS = {
+    'csv': iter_kognita_csv,
+    'json': iter_json,
+    'activitywatch': iter_activitywatch,
+}
+
+def detect_format(file_path):
+    """Dosya uzantısı ve içeriğine bakarak içe aktarma biçimini tahmin eder."""
+    file_path = Path(file_path)
+    if file_path.suffix.lower() == '.csv':
+        return 'csv'
+    with open(file_path, encoding='utf-8-sig') as json_file:
+        head = json_file.read(4096)
+    # ActivityWatch dışa aktarmaları "buckets" (veya tek kovada "events") anahtarıyla başlar
+    if head.lstrip().startswith('{') and ('"buckets"' in head or '"events"' in head):
+        return 'activitywatch'
+    return 'json'
+
+def import_file(file_path, file_format=None, batch_size=50000, progress_callback=None):
+    """
+    Dosyadaki kayıtları veritabanına içe aktarır; aynı dosya tekrar içe
+    aktarıldığında var olan kayıtlar atlanır.
+    Dönüş: (eklenen, atlanan); dosya okunamaz veya kayıtlar yazılamazsa None.
+    """
+    try:
+        file_format = file_format or detect_format(file_path)
+        reader = _READERS[file_format]
+    except (OSError, KeyError) as e:
+        logging.error(f"İçe aktarma dosyası açılamadı ({file_path}): {e}")
+        return None
+
+    logging.info(f"İçe aktarma başladı: {file_path} ({file_format})")
+    errors = []
+
+    def rows():
+        try:
+            yield from reader(file_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Okunabilen kısım içe aktarılır; dosya düzeltilip tekrar içe aktarılabilir
+            errors.append(e)
+
+    result = database.import_usage_logs(rows(), batch_size=batch_size, progress_callback=progress_callback)
+    if result is None:
+        logging.error(f"İçe aktarma tamamlanamadı ({file_path}); dosya tekrar içe aktarılarak sürdürülebilir.")
+        return None
+    if errors:
+        logging.error(f"İçe aktarma dosyası okunurken hata ({file_path}): {errors[0]}")
+        return None
+    return result
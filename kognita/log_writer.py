@@ -0,0 +1,91 @@
+# kognita/log_writer.py
+
+import logging
+import queue
+import threading
+from . import database
+
+class UsageLogWriter:
+    """
+    Tracker ile veritabanı arasında yazma tamponu (write-behind) görevi görür.
+    Kayıtlar bellekte kuyruğa alınır ve ayrı bir iş parçacığı tarafından
+    belirli aralıklarla veya kuyruk dolduğunda tek transaction ile yazılır.
+    """
+
+    # Yazma hatalarında bellekte bekletilecek en fazla kayıt sayısı
+    MAX_PENDING_ROWS = 10000
+
+    def __init__(self, stop_event, flush_interval_seconds=30, flush_batch_size=50):
+        self.stop_event = stop_event
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self._queue = queue.Queue()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def update_settings(self, flush_interval_seconds, flush_batch_size):
+        """Yazma aralığı ve toplu yazma boyutunu günceller."""
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_batch_size = flush_batch_size
+        self._wakeup.set()
+
+    def start(self):
+        """Yazıcı iş parçacığını başlatır."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="KognitaLogWriter", daemon=True)
+        self._thread.start()
+        logging.info(f"Log yazıcısı başlatıldı: aralık {self.flush_interval_seconds}sn, toplu boyut {self.flush_batch_size}")
+
+    def submit(self, process_name, window_title, start_time, end_time, duration, key_count=0, click_count=0):
+        """Bir kullanım kaydını (oturumun tuş ve tıklama sayılarıyla) kuyruğa ekler; disk G/Ç'sini beklemez."""
+        self._queue.put((process_name, window_title, start_time, end_time, duration, key_count, click_count))
+        if self._queue.qsize() >= self.flush_batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Kuyruktaki tüm kayıtları tek bir transaction ile veritabanına yazar."""
+        with self._flush_lock:
+            batch = self._pending
+            self._pending = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+
+            if database.add_usage_logs(batch):
+                logging.debug(f"{len(batch)} kullanım kaydı toplu olarak yazıldı.")
+                return len(batch)
+
+            # Yazılamayan kayıtları bir sonraki denemeye bırak
+            if len(batch) > self.MAX_PENDING_ROWS:
+                logging.warning(f"Bekleyen kayıt sınırı aşıldı, en eski {len(batch) - self.MAX_PENDING_ROWS} kayıt atlandı.")
+                batch = batch[-self.MAX_PENDING_ROWS:]
+            self._pending = batch
+            return 0
+
+    def close(self, timeout=5):
+        """İş parçacığını durdurur ve kalan tüm kayıtların yazıldığından emin olur."""
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self.flush()
+        if self._pending:
+            logging.error(f"{len(self._pending)} kullanım kaydı veritabanına yazılamadı.")
+
+    def _run(self):
+        """Kuyruğu periyodik olarak boşaltan ana döngü."""
+        while not self.stop_event.is_set():
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Log yazıcısında hata: {e}")
+        # stop_event sonrası kuyrukta kalanları yaz
+        self.flush()
@@ -0,0 +1,125 @@
+# kognita/maintenance.py
+
+import argparse
+import logging
+import sys
+from . import database, backup, importer, sync
+from .config_manager import ConfigManager
+
+def _cmd_rebuild_rollups(args):
+    """Özet (rollup), uygulama ve sayaç tablolarını ham loglardan yeniden oluşturur."""
+    ok = database.rebuild_daily_usage()
+    ok = database.rebuild_hourly_usage() and ok
+    ok = database.rebuild_apps() and ok
+    ok = database.rebuild_stats() and ok
+    return 0 if ok else 1
+
+def _cmd_compact_storage(args):
+    """Kapanmış ayları arşivler, depolama modunu uygular ve veritabanı dosyasını küçültür."""
+    config = ConfigManager()
+    database.archive_closed_months(config.get('settings.archive_after_months', 3))
+    database.apply_storage_mode(config.get('settings.storage_mode', database.STORAGE_MODE_PLAIN))
+    reclaimed = database.vacuum_database()
+    print(f"{reclaimed / (1024 * 1024):.1f} MB geri kazanıldı.")
+    return 0
+
+def _cmd_backup(args):
+    """Veritabanının sıkıştırılmış yedeğini alır."""
+    config = ConfigManager()
+    snapshot_path = backup.create_backup(
+        args.dir or config.get('settings.backup_dir', '') or None,
+        keep=args.keep if args.keep is not None else config.get('settings.backup_keep_count', 7),
+        compression=args.compression or config.get('settings.backup_compression', 'lzma'),
+        pause_seconds=0)
+    if snapshot_path is None:
+        return 1
+    print(snapshot_path)
+    return 0
+
+def _cmd_restore(args):
+    """Yedeği doğrulayıp veritabanının yerine koyar (uygulama kapalıyken)."""
+    return 0 if backup.restore_backup(args.snapshot) else 1
+
+def _cmd_import(args):
+    """CSV, JSON veya ActivityWatch dışa aktarma dosyasını içe aktarır."""
+    result = importer.import_file(args.file, args.format, batch_size=args.batch_size)
+    if result is None:
+        return 1
+    inserted, skipped = result
+    print(f"{inserted} kayıt eklendi, {skipped} kayıt zaten vardı.")
+    return 0
+
+def _cmd_merge(args):
+    """Başka bir makinenin veritabanını veya eşitleme kopyasını birleştirir."""
+    result = database.merge_device_database(args.file, batch_size=args.batch_size)
+    if result is None:
+        return 1
+    inserted, skipped = result
+    print(f"{inserted} kayıt eklendi, {skipped} kayıt zaten vardı.")
+    return 0
+
+def _cmd_sync(args):
+    """Paylaşılan klasöre bu cihazın kopyasını yazar ve diğer cihazlarınkini birleştirir."""
+    sync_dir = args.folder or ConfigManager().get('settings.sync_dir', '')
+    if not sync_dir:
+        print("Eşitleme klasörü belirtilmedi (ayarlardaki sync_dir boş).")
+        return 1
+    inserted, skipped = sync.sync_folder(sync_dir)
+    print(f"{inserted} kayıt eklendi, {skipped} kayıt zaten vardı.")
+    for device in database.get_devices():
+        print(f"{device['id']}: {device['name']}{' (bu cihaz)' if device['is_local'] else ''}")
+    return 0
+
+def build_parser():
+    """Bakım komutları için argüman ayrıştırıcısını oluşturur."""
+    parser = argparse.ArgumentParser(prog="kognita", description="Kognita veritabanı bakım komutları")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help="Özet, uygulama ve sayaç tablolarını ham loglardan yeniden oluşturur")
+    rebuild.set_defaults(func=_cmd_rebuild_rollups)
+
+    compact = subparsers.add_parser("compact-storage", help="Kapanmış ayları arşivler, kapanmış günleri mühürler ve dosyayı küçültür")
+    compact.set_defaults(func=_cmd_compact_storage)
+
+    backup_parser = subparsers.add_parser("backup", help="Veritabanının sıkıştırılmış yedeğini alır")
+    backup_parser.add_argument("--dir", help="Yedek klasörü (varsayılan: ayarlardaki backup_dir)")
+    backup_parser.add_argument("--keep", type=int, help="Saklanacak yedek sayısı (0 = hepsi)")
+    backup_parser.add_argument("--compression", choices=sorted(backup.COMPRESSIONS), help="Sıkıştırma yöntemi")
+    backup_parser.set_defaults(func=_cmd_backup)
+
+    restore = subparsers.add_parser("restore", help="Yedeği bütünlük denetiminden geçirip geri yükler")
+    restore.add_argument("snapshot", help="Geri yüklenecek yedek dosyası (.db.xz / .db.gz)")
+    # Bozuk bir veritabanının da geri yüklenebilmesi için migration çalıştırılmaz
+    restore.set_defaults(func=_cmd_restore, needs_database=False)
+
+    import_parser = subparsers.add_parser("import", help="CSV, JSON veya ActivityWatch dışa aktarma dosyasını içe aktarır")
+    import_parser.add_argument("file", help="İçe aktarılacak dosya")
+    import_parser.add_argument("--format", choices=importer.IMPORT_FORMATS, help="Dosya biçimi (varsayılan: otomatik)")
+    import_parser.add_argument("--batch-size", type=int, default=50000, help="Transaction başına satır sayısı")
+    import_parser.set_defaults(func=_cmd_import)
+
+    merge = subparsers.add_parser("merge", help="Başka bir makinenin veritabanını veya eşitleme kopyasını birleştirir")
+    merge.add_argument("file", help="Birleştirilecek kognita_data.db veya kognita_sync_*.db dosyası")
+    merge.add_argument("--batch-size", type=int, default=50000, help="Transaction başına satır sayısı")
+    merge.set_defaults(func=_cmd_merge)
+
+    sync_parser = subparsers.add_parser("sync", help="Paylaşılan klasör üzerinden diğer makinelerle eşitler")
+    sync_parser.add_argument("folder", nargs="?", help="Paylaşılan klasör (varsayılan: ayarlardaki sync_dir)")
+    sync_parser.set_defaults(func=_cmd_sync)
+
+    return parser
+
+def run(argv=None):
+    """Bakım komutunu çalıştırır ve çıkış kodunu döndürür."""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s', stream=sys.stdout)
+    args = build_parser().parse_args(argv)
+    try:
+        if getattr(args, 'needs_database', True) and not database.initialize_database():
+            return 1
+        return args.func(args)
+    finally:
+        database.close_all_connections()
+
+if __name__ == "__main__":
+    sys.exit(run())
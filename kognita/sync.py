@@ -0,0 +1,98 @@
+# kognita/sync.py
+
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from . import database, backup
+
+# Paylaşılan klasördeki eşitleme kopyalarının adı: kognita_sync_<cihaz_uuid>.db
+SNAPSHOT_PREFIX = "kognita_sync_"
+
+def _snapshot_path(sync_dir, device_uuid):
+    """Cihazın paylaşılan klasördeki eşitleme kopyasının yolunu döndürür."""
+    return Path(sync_dir) / f"{SNAPSHOT_PREFIX}{device_uuid}.db"
+
+def export_sync_snapshot(sync_dir, pause_seconds=0.02, stop_event=None):
+    """
+    Veritabanının tutarlı bir kopyasını paylaşılan klasöre yazar; diğer
+    makineler bu dosyayı merge_file ile birleştirir. Kopya önce '.partial'
+    olarak yazılıp yerine konur, böylece okuyanlar yarım dosya görmez. Arşiv
+    dosyaları arşivlenme zamanını adlarında taşır ve kopyanın manifest'i bu
+    adları gösterir; geri açılıp yeniden arşivlenen bir ay yeni adla yazılır,
+    klasörde aynı boyutta olan sürümler tekrar kopyalanmaz.
+    Kopyanın yolunu, hata durumunda None döndürür.
+    """
+    device_uuid = database.get_local_device_uuid()
+    if device_uuid is None:
+        return None
+    snapshot_path = _snapshot_path(sync_dir, device_uuid)
+    partial_path = snapshot_path.with_name(snapshot_path.name + '.partial')
+    started = time.perf_counter()
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        _, _, _, archives = backup.copy_database(partial_path, pause_seconds=pause_seconds, stop_event=stop_event)
+        synced_names = {file_name: f"{Path(file_name).stem}_{archived_at}.db" for file_name, archived_at in archives}
+        conn = sqlite3.connect(str(partial_path))
+        try:
+            # Paylaşılan klasörde -wal/-shm dosyası bırakılmaması için tek dosyalı günlük kipine geçilir
+            conn.execute("PRAGMA journal_mode = DELETE")
+            with conn:
+                conn.executemany("UPDATE archive_manifest SET file_name = ? WHERE file_name = ?",
+                                 [(synced_name, file_name) for file_name, synced_name in synced_names.items()])
+        finally:
+            conn.close()
+
+        archive_dir = snapshot_path.parent / f"{snapshot_path.stem}_archive"
+        archive_names = set(synced_names.values())
+        for file_name, synced_name in sorted(synced_names.items()):
+            source_path = database.get_archive_dir() / file_name
+            target_path = archive_dir / synced_name
+            if target_path.exists() and target_path.stat().st_size == source_path.stat().st_size:
+                continue
+            archive_dir.mkdir(exist_ok=True)
+            partial_archive = target_path.with_name(target_path.name + '.partial')
+            shutil.copyfile(source_path, partial_archive)
+            os.replace(partial_archive, target_path)
+        os.replace(partial_path, snapshot_path)
+        # Ana dosyaya geri taşınan aylar ve eski arşiv sürümleri kopyanın manifest'inde değildir
+        if archive_dir.exists():
+            for path in archive_dir.iterdir():
+                if path.name not in archive_names:
+                    path.unlink()
+
+        logging.info(f"Eşitleme kopyası yazıldı: {snapshot_path} ({len(archive_names)} arşiv ayı), "
+                     f"{time.perf_counter() - started:.2f} sn sürdü.")
+        return snapshot_path
+    except Exception as e:
+        logging.error(f"Eşitleme kopyası yazılamadı ({snapshot_path}): {e}")
+        return None
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+def sync_folder(sync_dir, stop_event=None):
+    """
+    Paylaşılan klasör üzerinden eşitler: bu cihazın kopyasını yazar, ardından
+    klasördeki diğer cihazların kopyalarını birleştirir. Sunucu gerekmez;
+    klasörü dosya eşitleme aracı (ör. Syncthing, OneDrive) makineler arasında taşır.
+    Dönüş: (eklenen, atlanan)
+    """
+    sync_dir = Path(sync_dir)
+    device_uuid = database.get_local_device_uuid()
+    if device_uuid is None:
+        return 0, 0
+    export_sync_snapshot(sync_dir, stop_event=stop_event)
+    inserted = skipped = 0
+    for snapshot_path in sorted(sync_dir.glob(f"{SNAPSHOT_PREFIX}*.db")):
+        if snapshot_path == _snapshot_path(sync_dir, device_uuid):
+            continue
+        if stop_event is not None and stop_event.is_set():
+            break
+        result = database.merge_device_database(snapshot_path)
+        if result is not None:
+            inserted += result[0]
+            skipped += result[1]
+    return inserted, skipped
@@ -2,89 +2,323 @@
 
 import psutil
 import time
-import win32process
-import win32gui
 import logging
-from threading import Event
-from pynput import mouse, keyboard
-from . import database 
+from collections import OrderedDict, namedtuple
+from threading import Event, Lock
+from . import database
+from .log_writer import UsageLogWriter
+from .coalescer import SessionCoalescer
+from .foreground import create_backend, NullForegroundBackend
+from .activity import InputActivityDetector
+
+# Önbellekteki işlem bilgisi; ad okunamayan (erişim reddedilen) işlemlerde name None'dır
+ProcessInfo = namedtuple('ProcessInfo', ['name', 'exe', 'category'])
+
+class ProcessInfoCache:
+    """
+    PID'den işlem bilgisine (ad, çalıştırılabilir dosya yolu, kategori) LRU
+    önbellek. Anahtar (pid, create_time) olduğundan yeniden kullanılan bir PID
+    eski işlemin bilgisini döndürmez. Erişim reddedilen işlemler de önbelleğe
+    alınır; yükseltilmiş bir pencere ön plandayken her okumada tekrar denenmez.
+    Kategori, kategori önbelleğinin sürümü değiştiğinde yeniden çözülür.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (pid, create_time) -> (ProcessInfo, kategori sürümü)
+        self._create_times = {}  # pid -> önbellekteki create_time
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.pid_reuses = 0
+
+    def get(self, pid):
+        """PID'nin işlem bilgisini döndürür; işlem yoksa psutil.NoSuchProcess fırlatır."""
+        process = psutil.Process(pid)
+        try:
+            create_time = process.create_time()
+        except psutil.AccessDenied:
+            create_time = None
+        key = (pid, create_time)
+        category_version = database.get_category_map_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                info, version = entry
+                if version != category_version and info.name is not None:
+                    info = info._replace(category=database.get_category_for_process(info.name))
+                    self._entries[key] = (info, category_version)
+                return info
+            self.misses += 1
+            previous = self._create_times.get(pid)
+            if previous is not None and previous != create_time:
+                # PID yeni bir işleme verilmiş; eski kayıt atılır
+                self.pid_reuses += 1
+                self._entries.pop((pid, previous), None)
+
+        try:
+            name = process.name().lower()
+        except psutil.AccessDenied:
+            name = None
+        try:
+            exe = process.exe()
+        except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+            exe = None
+        info = ProcessInfo(name, exe, database.get_category_for_process(name) if name else 'Other')
+
+        with self._lock:
+            self._entries[key] = (info, category_version)
+            self._create_times[pid] = create_time
+            while len(self._entries) > self.max_size:
+                (old_pid, old_create_time), _ = self._entries.popitem(last=False)
+                if self._create_times.get(old_pid) == old_create_time:
+                    del self._create_times[old_pid]
+        return info
+
+    def stats(self):
+        """Önbellek isabet/ıskalama istatistiklerini döndürür."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'pid_reuses': self.pid_reuses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+class PollScheduler:
+    """
+    Takip döngüsünün okuma aralığını belirler. Pencere değiştikten hemen sonra
+    en kısa aralıkla okunur; aynı pencerede veya boştayken aralık her okumada
+    katlanarak üst sınıra kadar büyür. Pencere değişikliklerini olayla bildiren
+    arka uçlarda okuma yalnızca kaçan olaylar için yapıldığından üst sınır
+    tracker_event_poll_seconds olur. Pil profilinde (battery_saver 'on' veya
+    'auto' iken prizden çekilmişse) aralıklar battery_poll_multiplier ile çarpılır.
+    """
+
+    # Güç kaynağının yeniden okunma aralığı
+    POWER_CHECK_SECONDS = 60
+    # Etkin örnekleme hızının INFO seviyesinde yazılma aralığı
+    REPORT_INTERVAL_SECONDS = 600
+
+    def __init__(self, config):
+        self.update_settings(config)
+        self._interval = self.min_seconds
+        self._on_battery = False
+        self._power_checked_at = 0.0
+        self._polls = 0
+        self._report_started_at = time.monotonic()
+
+    def update_settings(self, config):
+        """Okuma aralığı ayarlarını yapılandırmadan okur."""
+        self.min_seconds = config.get('tracker_min_poll_seconds', 0.5)
+        self.max_seconds = config.get('tracker_max_poll_seconds', 15)
+        self.idle_max_seconds = config.get('tracker_idle_poll_seconds', 10)
+        self.event_max_seconds = config.get('tracker_event_poll_seconds', 60)
+        self.backoff = max(config.get('tracker_poll_backoff', 2.0), 1.0)
+        self.battery_saver = config.get('battery_saver', 'auto')
+        self.battery_multiplier = max(config.get('battery_poll_multiplier', 3), 1)
+
+    def on_battery(self):
+        """Pil profili etkinse True döndürür; güç kaynağı en fazla dakikada bir okunur."""
+        if self.battery_saver in ('on', 'off'):
+            return self.battery_saver == 'on'
+        now = time.monotonic()
+        if now - self._power_checked_at >= self.POWER_CHECK_SECONDS:
+            self._power_checked_at = now
+            try:
+                battery = psutil.sensors_battery()
+                on_battery = battery is not None and not battery.power_plugged
+            except Exception as e:
+                logging.debug(f"Güç kaynağı okunamadı: {e}")
+                on_battery = False
+            if on_battery != self._on_battery:
+                logging.info(f"İzleyici {'pil' if on_battery else 'normal'} profiline geçti.")
+            self._on_battery = on_battery
+        return self._on_battery
+
+    def next_interval(self, switched, idle, event_driven=False, limit=None):
+        """
+        Son okumada oturum değiştiyse switched, kullanıcı boştaysa idle;
+        değişiklikler olayla geliyorsa event_driven. Bekleme süresini döndürür;
+        limit verilirse süre onu aşmaz ama geri çekilme kaldığı yerden sürer.
+        """
+        multiplier = self.battery_multiplier if self.on_battery() else 1
+        floor = self.min_seconds * multiplier
+        if event_driven:
+            ceiling = self.event_max_seconds
+        else:
+            ceiling = self.idle_max_seconds if idle else self.max_seconds
+        ceiling = max(ceiling * multiplier, floor)
+        self._interval = floor if switched else min(max(self._interval * self.backoff, floor), ceiling)
+        wait = self._interval if limit is None else max(min(self._interval, limit), self.min_seconds)
+        self._polls += 1
+        logging.debug(f"İzleyici: sonraki okuma {wait:.2f} sn sonra ({60 / wait:.1f} okuma/dk"
+                      f"{', pil' if multiplier > 1 else ''}{', boşta' if idle else ''})")
+
+        elapsed = time.monotonic() - self._report_started_at
+        if elapsed >= self.REPORT_INTERVAL_SECONDS:
+            logging.info(f"İzleyici etkin örnekleme hızı: {self._polls * 60 / elapsed:.1f} okuma/dk "
+                         f"(son {elapsed / 60:.0f} dk, {'pil' if multiplier > 1 else 'normal'} profil).")
+            self._polls = 0
+            self._report_started_at = time.monotonic()
+        return wait
 
 class ActivityTracker:
-    def __init__(self, config, stop_event):
+    def __init__(self, config, stop_event, backend=None, input_detector=None):
         self.config = config
         self.stop_event = stop_event
-        self.last_activity_time = time.time()
+        self.backend = backend or create_backend()
+        self.input_detector = input_detector or InputActivityDetector()
+        self.input_detector.on_input = self._on_activity
+        self.process_cache = ProcessInfoCache()
+        self.scheduler = PollScheduler(config)
+        self._switched = True
+        self.current_activity = ('unknown', 'Bilinmeyen')
+        self._idle = False
+        # _idle takip döngüsünde ayarlanır, giriş dinleyicisinin iş parçacığında temizlenir
+        self._idle_lock = Lock()
+        self._input_events = 0
+        self._session_start_time = time.time()
         self.idle_threshold_seconds = self.config.get('idle_threshold_seconds', 180) # Config'ten doğrudan al
+        self.log_writer = UsageLogWriter(
+            stop_event,
+            flush_interval_seconds=self.config.get('log_flush_interval_seconds', 30),
+            flush_batch_size=self.config.get('log_flush_batch_size', 50)
+        )
+        self.coalescer = SessionCoalescer(self.log_writer.submit, config)
         logging.info(f"İzleyici ayarları güncellendi: Boşta kalma eşiği {self.idle_threshold_seconds}sn olarak ayarlandı")
 
     def update_settings(self, config):
         """Yapılandırma dosyasından izleyici ayarlarını günceller."""
         self.config = config
         self.idle_threshold_seconds = self.config.get('idle_threshold_seconds', 180)
+        self.scheduler.update_settings(config)
+        self.coalescer.update_settings(config)
+        self.log_writer.update_settings(
+            self.config.get('log_flush_interval_seconds', 30),
+            self.config.get('log_flush_batch_size', 50)
+        )
         logging.info(f"İzleyici ayarları güncellendi: Boşta kalma eşiği {self.idle_threshold_seconds}sn olarak ayarlandı")
 
+    @property
+    def last_activity_time(self):
+        """Son kullanıcı girişinin zamanı (işletim sisteminden veya giriş olaylarından)."""
+        return self.input_detector.last_input_time()
+
+    def is_user_idle(self):
+        """Kullanıcı boşta kalma eşiğinden uzun süredir hareketsizse True döndürür."""
+        return time.time() - self.last_activity_time > self.idle_threshold_seconds
+
     def _on_activity(self):
-        """Kullanıcı aktivitesi algılandığında son aktivite zamanını günceller."""
-        self.last_activity_time = time.time()
-
-    def _start_listeners(self):
-        """Klavye ve fare hareketlerini dinleyen pynput dinleyicilerini başlatır."""
-        mouse_listener = mouse.Listener(
-            on_move=lambda x, y: self._on_activity(),
-            on_click=lambda x, y, button, pressed: self._on_activity(),
-            on_scroll=lambda x, y, dx, dy: self._on_activity()
-        )
-        keyboard_listener = keyboard.Listener(
-            on_press=lambda key: self._on_activity()
-        )
-        
-        mouse_listener.daemon = True
-        keyboard_listener.daemon = True
-        mouse_listener.start()
-        keyboard_listener.start()
-        logging.info("Aktivite dinleyicileri başlatıldı.")
+        """Giriş algılandığında (saniyede en fazla bir kez) boştan dönüşü bildirir."""
+        with self._idle_lock:
+            self._input_events += 1
+            was_idle, self._idle = self._idle, False
+        if was_idle:
+            # Boştan dönüş, bir sonraki zaman aşımını beklemeden algılanır
+            self.backend.wake()
+
+    def _set_idle(self, idle, input_events):
+        """
+        Takip döngüsünün okuduğu boşta durumunu kaydeder. input_events okumadan
+        önceki giriş sayacıdır; okuma ile kayıt arasında giriş geldiyse boştan
+        dönüş _on_activity'de kaybolmasın diye boşta sayılmaz.
+        """
+        with self._idle_lock:
+            self._idle = idle and self._input_events == input_events
 
     def _get_active_process_info(self):
         """Aktif pencereye ait işlem adını ve pencere başlığını döndürür."""
         if time.time() - self.last_activity_time > self.idle_threshold_seconds:
             return 'idle', 'Kullanıcı Boşta'
         try:
-            hwnd = win32gui.GetForegroundWindow()
-            if not hwnd:
+            window = self.backend.get_foreground()
+            if window is None:
                 return 'idle', 'Aktif pencere yok'
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            if pid == 0: # PID 0 genellikle sistem boşta süreci veya izin sorunları
+            if window.pid == 0: # PID 0 genellikle sistem boşta süreci veya izin sorunları
+                return 'unknown', 'Bilinmeyen'
+            if window.process_name:
+                return window.process_name.lower(), window.title
+            info = self.process_cache.get(window.pid)
+            if info.name is None:
                 return 'unknown', 'Bilinmeyen'
-            process = psutil.Process(pid)
-            return process.name().lower(), win32gui.GetWindowText(hwnd)
+            return info.name, window.title
         except (psutil.NoSuchProcess, psutil.AccessDenied, Exception) as e:
             logging.debug(f"Aktif işlem bilgisi alınırken hata: {e}")
             return 'unknown', 'Bilinmeyen'
 
+    def get_current_activity(self):
+        """
+        Takip döngüsünün en son gördüğü (işlem adı, pencere başlığı) bilgisini
+        döndürür. Diğer iş parçacıkları pencere sistemine dokunmadan bunu kullanır.
+        """
+        if self.is_user_idle():
+            return 'idle', 'Kullanıcı Boşta'
+        return self.current_activity
+
+    def _next_wait_seconds(self):
+        """
+        Bir sonraki pencere okumasına kadar en fazla beklenecek süreyi döndürür.
+        Olay tabanlı arka uçlarda pencere değişiklikleri beklemeyi zaten erken
+        bitirir; aralık yalnızca olay kaçırılırsa ve boştan dönüş için önemlidir.
+        """
+        # Son giriş zamanı sistemden okunuyorsa fare hareketi döngüyü uyandırmaz;
+        # boştan dönüş ancak okumayla fark edilir
+        event_driven = self.backend.event_driven and not (self._idle and self.input_detector.uses_os_idle_time)
+        # Boşta kalma eşiği dolduğunda geç kalmadan okunur
+        until_idle = None if self._idle else self.last_activity_time + self.idle_threshold_seconds - time.time()
+        wait = self.scheduler.next_interval(self._switched, self._idle, event_driven, until_idle)
+        self._switched = False
+        return wait
+
+    def stop(self):
+        """Bekleyen takip döngüsünü uyandırır; stop_event ayarlandıktan sonra çağrılır."""
+        self.backend.wake()
+
     def _log_activity(self, process_name, title, start_time, end_time):
-        """Aktiviteyi veritabanına kaydeder."""
-        duration = int(end_time - start_time)
-        if duration < 1: # 1 saniyeden kısa kayıtları atla (idle ve unknown dışındaki)
-            return
-            
+        """
+        Aktiviteyi oturumun tuş ve tıklama sayılarıyla birlikte birleştiriciye
+        verir; birleştirilen kayıtlar veritabanına yazılmak üzere kuyruğa eklenir.
+        """
+        # Boştan çıkaran girişler yeni oturuma sayılır
+        key_count, click_count = (0, 0) if process_name == 'idle' else self.input_detector.take_counts()
         try:
-            database.add_usage_log(process_name, title, start_time, end_time, duration)
-            if process_name not in ['idle', 'unknown']:
-                logging.info(f"Loglandı: {process_name} - {duration}s - {title[:40]}")
+            # 1 saniyeden kısa oturumlar komşularıyla birleşmezse birleştiricide atlanır
+            self.coalescer.add(process_name, title, start_time, end_time, key_count, click_count)
         except Exception as e:
             logging.error(f"Veritabanına loglama sırasında hata: {e}")
 
     def start_tracking(self):
         """Ana takip döngüsünü başlatır."""
-        self._start_listeners()
-        logging.info("Kognita Tracker aktif.")
+        self.input_detector.start()
+        self.log_writer.start()
+        try:
+            self.backend.start()
+        except Exception as e:
+            logging.error(f"Ön plan penceresi arka ucu başlatılamadı ({self.backend.name}): {e}")
+            self.backend.close()
+            self.backend = NullForegroundBackend()
+        logging.info(f"Kognita Tracker aktif ({self.backend.name} arka ucu).")
         
         last_process_name, last_window_title = self._get_active_process_info()
-        session_start_time = time.time()
+        self.current_activity = (last_process_name, last_window_title)
+        self._session_start_time = time.time()
+        self.input_detector.take_counts()
 
         try:
             while not self.stop_event.is_set():
+                # Olay tabanlı arka uçlarda pencere veya başlık değişir değişmez uyanılır
+                self.backend.wait_for_change(self._next_wait_seconds())
+                if self.stop_event.is_set():
+                    break
+                input_events = self._input_events
                 current_process_name, current_window_title = self._get_active_process_info()
+                self._set_idle(current_process_name == 'idle', input_events)
+                if current_process_name != 'idle':
+                    self.current_activity = (current_process_name, current_window_title)
                 
                 # Sadece process değişirse veya pencere başlığı değişirse logla
                 # Boşta kalma süresi değişirse de logla (idle'a geçiş veya idle'dan çıkış)
@@ -94,15 +328,27 @@ class ActivityTracker:
                    (current_process_name != 'idle' and last_process_name == 'idle'):
                     
                     session_end_time = time.time()
-                    self._log_activity(last_process_name, last_window_title, session_start_time, session_end_time)
+                    self._log_activity(last_process_name, last_window_title, self._session_start_time, session_end_time)
                     
-                    session_start_time = time.time()
+                    self._session_start_time = time.time()
+                    self._switched = True
                     last_process_name = current_process_name
                     last_window_title = current_window_title
 
-                self.stop_event.wait(3) # Her 3 saniyede bir kontrol et
+                # Süren oturumla birleşemeyecek bekleyen kayıt beklemeden yazılır
+                self.coalescer.poll(last_process_name, last_window_title, self._session_start_time, time.time())
         finally:
             logging.info("Kognita Tracker durduruluyor...")
             final_end_time = time.time()
-            self._log_activity(last_process_name, last_window_title, session_start_time, final_end_time)
+            self._log_activity(last_process_name, last_window_title, self._session_start_time, final_end_time)
+            self.input_detector.stop()
+            self.backend.stop()
+            self.backend.close()
+            cache_stats = self.process_cache.stats()
+            logging.info(f"İşlem bilgisi önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama "
+                         f"(%{cache_stats['hit_rate'] * 100:.0f}), {cache_stats['pid_reuses']} PID yeniden kullanımı.")
+            self.coalescer.flush()
+            logging.info(f"Oturum birleştirme: {self.coalescer.sessions_in} oturum "
+                         f"{self.coalescer.rows_out} kayıt olarak yazıldı.")
+            self.log_writer.close()
             logging.info("Tracker thread'i düzgün bir şekilde sonlandırıldı.")
\ No newline at end of file
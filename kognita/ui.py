@@ -7,6 +7,7 @@ from tkinter import ttk, messagebox, Listbox, StringVar, Frame, Label, Entry, Bu
 import datetime
 import os
 import sys
+import threading
 from PIL import Image, ImageTk
 import matplotlib.pyplot as plt 
 from matplotlib.figure import Figure 
@@ -494,8 +495,17 @@ class ReportWindow(BaseWindow):
         right_controls = ttk.Frame(control_inner, style='TFrame')
         right_controls.pack(side='right')
         
-        ttk.Button(right_controls, text="CSV Dışa Aktar",
-                  command=self._export_data).pack(side='right', padx=5)
+        self.export_button = ttk.Button(right_controls, text="Dışa Aktar",
+                                        command=self._export_data)
+        self.export_button.pack(side='right', padx=5)
+        
+        # Dışa aktarma ilerlemesi (yalnızca aktarım sırasında gösterilir)
+        self.export_cancel_button = ttk.Button(right_controls, text="İptal",
+                                               command=self._cancel_export)
+        self.export_progress = ttk.Progressbar(right_controls, mode='determinate', length=140, maximum=100)
+        self.export_thread = None
+        self.export_cancel_event = threading.Event()
+        self.export_state = {}
         
         if MATPLOTLIB_AVAILABLE:
             ttk.Button(right_controls, text="PDF Rapor",
@@ -588,10 +598,14 @@ class ReportWindow(BaseWindow):
         self.hourly_chart_frame = ttk.Frame(self.chart_notebook, style='TFrame')
         self.chart_notebook.add(self.hourly_chart_frame, text="Saatlik Aktivite")
         
+        self.heatmap_chart_frame = ttk.Frame(self.chart_notebook, style='TFrame')
+        self.chart_notebook.add(self.heatmap_chart_frame, text="Haftalık Isı Haritası")
+        
         # Grafik canvas'ları için placeholder'lar
         self.pie_chart_canvas = None
         self.bar_chart_canvas = None  
         self.hourly_chart_canvas = None
+        self.heatmap_chart_canvas = None
 
     def _create_analysis_tab(self):
         """Analiz sekmesi."""
@@ -760,6 +774,7 @@ class ReportWindow(BaseWindow):
         self._draw_pie_chart(category_totals, total_duration)
         self._draw_bar_chart(category_totals, total_duration)
         self._draw_hourly_chart()
+        self._draw_weekly_heatmap()
 
     def _draw_pie_chart(self, category_totals, total_duration):
         """Pasta grafiği çizer."""
@@ -905,6 +920,54 @@ class ReportWindow(BaseWindow):
         except Exception as e:
             logging.error(f"Saatlik grafik çizilirken hata: {e}")
 
+    def _draw_weekly_heatmap(self):
+        """Haftanın günü x saat (7x24) aktivite ısı haritasını çizer."""
+        if self.heatmap_chart_canvas:
+            self.heatmap_chart_canvas.get_tk_widget().destroy()
+            self.heatmap_chart_canvas = None
+
+        try:
+            heatmap = analyzer.get_weekly_heatmap(num_weeks=4)
+            
+            if not any(any(row) for row in heatmap):
+                no_data_label = ttk.Label(self.heatmap_chart_frame,
+                                         text="Haftalık ısı haritası için yeterli veri bulunmuyor.",
+                                         font=STYLE_CONFIG["font_normal"])
+                no_data_label.pack(expand=True)
+                return
+
+            minutes = [[seconds / 60 for seconds in row] for row in heatmap]  # Dakikaya çevir
+            weekday_labels = ["Pzt", "Sal", "Çar", "Per", "Cum", "Cmt", "Paz"]
+
+            fig = Figure(figsize=(12, 5), dpi=100, facecolor=STYLE_CONFIG["bg_card"])
+            ax = fig.add_subplot(111)
+            ax.set_facecolor(STYLE_CONFIG["bg_card"])
+
+            image = ax.imshow(minutes, aspect='auto', cmap='Blues', interpolation='nearest')
+            colorbar = fig.colorbar(image, ax=ax)
+            colorbar.set_label('Ortalama Süre (Dakika)', color=STYLE_CONFIG["text_primary"])
+
+            ax.set_xticks(range(0, 24, 2))
+            ax.set_yticks(range(7))
+            ax.set_yticklabels(weekday_labels)
+            ax.set_xlabel('Saat', fontsize=12, color=STYLE_CONFIG["text_primary"])
+            ax.set_title('Son 4 Hafta - Gün ve Saate Göre Aktivite', fontsize=14, fontweight='bold',
+                        color=STYLE_CONFIG["text_primary"], pad=20)
+
+            # Renkleri ayarla
+            ax.tick_params(colors=STYLE_CONFIG["text_primary"])
+            for spine in ax.spines.values():
+                spine.set_color(STYLE_CONFIG["border_color"])
+
+            fig.tight_layout()
+
+            self.heatmap_chart_canvas = FigureCanvasTkAgg(fig, master=self.heatmap_chart_frame)
+            self.heatmap_chart_canvas.draw()
+            self.heatmap_chart_canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        except Exception as e:
+            logging.error(f"Haftalık ısı haritası çizilirken hata: {e}")
+
     def _update_analysis_data(self):
         """Analiz sekmesi verilerini günceller."""
         try:
@@ -937,7 +1000,7 @@ class ReportWindow(BaseWindow):
         """Trendler sekmesi verilerini günceller."""
         try:
             # Uygulama listesini güncelle
-            all_processes = sorted(database.get_all_processes())
+            all_processes = database.get_all_processes()
             self.trend_app_combo['values'] = all_processes
             if all_processes and not self.trend_app_var.get():
                 self.trend_app_combo.set(all_processes[0])
@@ -1036,25 +1099,93 @@ class ReportWindow(BaseWindow):
             logging.error(f"Öneriler güncellenirken hata: {e}")
 
     def _export_data(self):
-        """Verileri CSV olarak dışa aktar."""
+        """Verileri arka planda, parça parça CSV veya sütunsal biçimde dışa aktarır."""
+        if self.export_thread and self.export_thread.is_alive():
+            return
         try:
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                filetypes=[("CSV dosyaları", "*.csv"), ("Tüm dosyalar", "*.*")],
-                title="Verileri CSV Olarak Kaydet"
+                filetypes=[("CSV dosyaları", "*.csv"),
+                           ("Parquet (pyarrow)", "*.parquet"),
+                           ("Arrow IPC (pyarrow)", "*.arrow"),
+                           ("NumPy arşivi", "*.npz"),
+                           ("Tüm dosyalar", "*.*")],
+                title="Verileri Dışa Aktar"
             )
-            
-            if file_path:
-                success, error = database.export_all_data_to_csv(file_path)
-                if success:
-                    messagebox.showinfo("Başarılı", f"Veriler '{file_path}' dosyasına kaydedildi.", parent=self)
-                else:
-                    messagebox.showerror("Hata", f"Dışa aktarma hatası: {error}", parent=self)
+            if not file_path:
+                return
+            # Uzantıya göre CSV veya sütunsal (Parquet/Arrow/NPZ) dışa aktarma
+            is_columnar = os.path.splitext(file_path)[1].lower() in database.COLUMNAR_EXPORT_FORMATS
+            export_function = database.export_usage_logs_columnar if is_columnar else database.export_usage_logs_to_csv
+
+            only_range = messagebox.askyesnocancel(
+                "Dışa Aktarma Aralığı",
+                "Yalnızca seçili rapor aralığındaki veriler mi aktarılsın?\n\n"
+                "Evet: Seçili aralık\nHayır: Tüm veriler",
+                parent=self)
+            if only_range is None:
+                return
+            start_ts = end_ts = None
+            if only_range:
+                start_date, end_date = self._get_date_range(self.current_report_range)
+                start_ts, end_ts = int(start_date.timestamp()), int(end_date.timestamp())
+
+            self.export_cancel_event.clear()
+            self.export_state = {'written': 0, 'total': 0, 'result': None, 'file_path': file_path}
+
+            def on_progress(written, total):
+                self.export_state['written'] = written
+                self.export_state['total'] = total
+
+            def worker():
+                try:
+                    self.export_state['result'] = export_function(
+                        file_path, start_ts, end_ts,
+                        progress_callback=on_progress, cancel_event=self.export_cancel_event)
+                finally:
+                    database.close_thread_connection()
+
+            self.export_button.config(state='disabled')
+            self.export_progress['value'] = 0
+            self.export_progress.pack(side='right', padx=5)
+            self.export_cancel_button.pack(side='right', padx=5)
+
+            self.export_thread = threading.Thread(target=worker, daemon=True)
+            self.export_thread.start()
+            self.after(200, self._poll_export)
                     
         except Exception as e:
             logging.error(f"CSV dışa aktarma hatası: {e}")
             messagebox.showerror("Hata", f"Dışa aktarma sırasında hata oluştu: {e}", parent=self)
 
+    def _cancel_export(self):
+        """Devam eden dışa aktarmayı iptal eder."""
+        self.export_cancel_event.set()
+
+    def _poll_export(self):
+        """Arka plandaki dışa aktarmanın ilerlemesini Tk iş parçacığında günceller."""
+        if not self.winfo_exists():
+            return
+        state = self.export_state
+        if state.get('total'):
+            self.export_progress['value'] = state['written'] * 100 / state['total']
+
+        if self.export_thread and self.export_thread.is_alive():
+            self.after(200, self._poll_export)
+            return
+
+        self.export_progress.pack_forget()
+        self.export_cancel_button.pack_forget()
+        self.export_button.config(state='normal')
+
+        success, error = state.get('result') or (False, "Bilinmeyen hata")
+        if success:
+            messagebox.showinfo("Başarılı", f"{state['written']} kayıt '{state['file_path']}' dosyasına kaydedildi.", parent=self)
+        elif self.export_cancel_event.is_set():
+            messagebox.showinfo("İptal Edildi", "Dışa aktarma iptal edildi.", parent=self)
+        else:
+            messagebox.showerror("Hata", f"Dışa aktarma hatası: {error}", parent=self)
+
     def _export_pdf_report(self):
         """PDF rapor oluştur."""
         try:
@@ -1496,6 +1627,56 @@ class SettingsWindow(BaseWindow):
         ttk.Label(settings_grid, text="(0 = Sonsuz saklama)",
                  font=STYLE_CONFIG["font_small"],
                  foreground=STYLE_CONFIG["text_secondary"]).grid(row=row+1, column=1, sticky='w', pady=2)
+        row += 2
+        
+        # Kademeli seyreltme: eski oturumlar saatlik, daha eskileri günlük satırlarda birleştirilir
+        ttk.Label(settings_grid, text="Saatlik birleştirme (gün sonra):",
+                 font=STYLE_CONFIG["font_bold"]).grid(row=row, column=0, sticky='w', padx=(0, 15), pady=8)
+        self.downsample_hourly_var = tk.IntVar()
+        ttk.Spinbox(settings_grid, from_=0, to=9999, increment=30,
+                   textvariable=self.downsample_hourly_var, width=10).grid(row=row, column=1, sticky='w', pady=8)
+        row += 1
+        
+        ttk.Label(settings_grid, text="Günlük birleştirme (gün sonra):",
+                 font=STYLE_CONFIG["font_bold"]).grid(row=row, column=0, sticky='w', padx=(0, 15), pady=8)
+        self.downsample_daily_var = tk.IntVar()
+        ttk.Spinbox(settings_grid, from_=0, to=9999, increment=30,
+                   textvariable=self.downsample_daily_var, width=10).grid(row=row, column=1, sticky='w', pady=8)
+        
+        ttk.Label(settings_grid, text="(0 = Kapalı; toplam süreler değişmez, yalnızca ayrıntı azalır)",
+                 font=STYLE_CONFIG["font_small"],
+                 foreground=STYLE_CONFIG["text_secondary"]).grid(row=row+1, column=1, sticky='w', pady=2)
+        row += 2
+        
+        # Aylık arşiv: kapanmış aylar ayrı dosyalara taşınır, ana veritabanı küçük kalır
+        ttk.Label(settings_grid, text="Arşivleme (ay sonra):",
+                 font=STYLE_CONFIG["font_bold"]).grid(row=row, column=0, sticky='w', padx=(0, 15), pady=8)
+        self.archive_months_var = tk.IntVar()
+        ttk.Spinbox(settings_grid, from_=0, to=120, increment=1,
+                   textvariable=self.archive_months_var, width=10).grid(row=row, column=1, sticky='w', pady=8)
+        
+        ttk.Label(settings_grid, text="(0 = Kapalı; eski aylar yalnızca gerektiğinde okunur)",
+                 font=STYLE_CONFIG["font_small"],
+                 foreground=STYLE_CONFIG["text_secondary"]).grid(row=row+1, column=1, sticky='w', pady=2)
+        row += 2
+        
+        # Otomatik yedekleme: sıkıştırılmış anlık görüntüler, en yeni N tanesi saklanır
+        ttk.Label(settings_grid, text="Yedekleme aralığı (saat):",
+                 font=STYLE_CONFIG["font_bold"]).grid(row=row, column=0, sticky='w', padx=(0, 15), pady=8)
+        self.backup_interval_var = tk.IntVar()
+        ttk.Spinbox(settings_grid, from_=0, to=720, increment=24,
+                   textvariable=self.backup_interval_var, width=10).grid(row=row, column=1, sticky='w', pady=8)
+        row += 1
+        
+        ttk.Label(settings_grid, text="Saklanacak yedek sayısı:",
+                 font=STYLE_CONFIG["font_bold"]).grid(row=row, column=0, sticky='w', padx=(0, 15), pady=8)
+        self.backup_keep_var = tk.IntVar()
+        ttk.Spinbox(settings_grid, from_=0, to=100, increment=1,
+                   textvariable=self.backup_keep_var, width=10).grid(row=row, column=1, sticky='w', pady=8)
+        
+        ttk.Label(settings_grid, text="(Aralık 0 = Kapalı; sayı 0 = tüm yedekleri sakla)",
+                 font=STYLE_CONFIG["font_small"],
+                 foreground=STYLE_CONFIG["text_secondary"]).grid(row=row+1, column=1, sticky='w', pady=2)
 
     def _create_notification_settings(self, parent):
         """Bildirim ayarları sekmesi."""
@@ -1572,6 +1753,29 @@ class SettingsWindow(BaseWindow):
                  foreground=STYLE_CONFIG["text_secondary"],
                  wraplength=400).pack(anchor='w', pady=(5, 0))
         
+        # Veri depolama modu
+        storage_frame = ttk.LabelFrame(content, text="Veri Depolama",
+                                      style='TLabelframe')
+        storage_frame.pack(fill='x', pady=(0, 15))
+        
+        storage_content = ttk.Frame(storage_frame, style='TFrame')
+        storage_content.pack(fill='x', padx=15, pady=15)
+        
+        self.storage_mode_mapping = {
+            "Düz (yalnızca sütunlar)": database.STORAGE_MODE_PLAIN,
+            "Düz + şifreli günlük kopya": database.STORAGE_MODE_ENCRYPTED_SEGMENTS
+        }
+        self.storage_mode_var = StringVar()
+        ttk.Combobox(storage_content, textvariable=self.storage_mode_var,
+                    values=list(self.storage_mode_mapping.keys()), state="readonly", width=28).pack(anchor='w', pady=3)
+        
+        storage_desc = ("Kayıtlar her iki modda da düz sütunlarda saklanır. Şifreli kopya modu kapanmış "
+                        "günleri ayrıca gün başına tek bir sıkıştırılmış ve şifrelenmiş parça olarak yedekler; "
+                        "verileri gizlemez ve daha fazla disk alanı kullanır.")
+        ttk.Label(storage_content, text=storage_desc, font=STYLE_CONFIG["font_small"],
+                 foreground=STYLE_CONFIG["text_secondary"],
+                 wraplength=400).pack(anchor='w', pady=(5, 0))
+        
         # Güncellemeler
         update_frame = ttk.LabelFrame(content, text="Güncellemeler",
                                      style='TLabelframe')
@@ -1640,6 +1844,11 @@ class SettingsWindow(BaseWindow):
             
             self.startup_var.set(self.config_manager.get('settings.run_on_startup', False))
             self.retention_var.set(self.config_manager.get('settings.data_retention_days', 365))
+            self.downsample_hourly_var.set(self.config_manager.get('settings.downsample_hourly_after_days', 30))
+            self.downsample_daily_var.set(self.config_manager.get('settings.downsample_daily_after_days', 180))
+            self.archive_months_var.set(self.config_manager.get('settings.archive_after_months', 3))
+            self.backup_interval_var.set(self.config_manager.get('settings.backup_interval_hours', 24))
+            self.backup_keep_var.set(self.config_manager.get('settings.backup_keep_count', 7))
             
             # Bildirim ayarları
             notif_settings = self.config_manager.get('settings.notification_settings', {})
@@ -1650,6 +1859,10 @@ class SettingsWindow(BaseWindow):
             
             # Gelişmiş ayarlar
             self.sentry_var.set(self.config_manager.get('settings.enable_sentry_reporting', True))
+            storage_mode = self.config_manager.get('settings.storage_mode', database.STORAGE_MODE_PLAIN)
+            for display, mode in self.storage_mode_mapping.items():
+                if mode == storage_mode:
+                    self.storage_mode_var.set(display)
             
         except Exception as e:
             logging.error(f"Ayarlar yüklenirken hata: {e}")
@@ -1678,6 +1891,25 @@ class SettingsWindow(BaseWindow):
                 raise ValueError("Veri saklama süresi negatif olamaz.")
             self.config_manager.set('settings.data_retention_days', retention_days)
             
+            downsample_hourly_days = self.downsample_hourly_var.get()
+            downsample_daily_days = self.downsample_daily_var.get()
+            if downsample_hourly_days < 0 or downsample_daily_days < 0:
+                raise ValueError("Birleştirme süreleri negatif olamaz.")
+            self.config_manager.set('settings.downsample_hourly_after_days', downsample_hourly_days)
+            self.config_manager.set('settings.downsample_daily_after_days', downsample_daily_days)
+            
+            archive_months = self.archive_months_var.get()
+            if archive_months < 0:
+                raise ValueError("Arşivleme süresi negatif olamaz.")
+            self.config_manager.set('settings.archive_after_months', archive_months)
+            
+            backup_interval_hours = self.backup_interval_var.get()
+            backup_keep_count = self.backup_keep_var.get()
+            if backup_interval_hours < 0 or backup_keep_count < 0:
+                raise ValueError("Yedekleme ayarları negatif olamaz.")
+            self.config_manager.set('settings.backup_interval_hours', backup_interval_hours)
+            self.config_manager.set('settings.backup_keep_count', backup_keep_count)
+            
             # Bildirim ayarları
             notif_settings = {
                 'enable_goal_notifications': self.goal_notifications_var.get(),
@@ -1693,6 +1925,9 @@ class SettingsWindow(BaseWindow):
             
             # Gelişmiş ayarlar
             self.config_manager.set('settings.enable_sentry_reporting', self.sentry_var.get())
+            storage_mode = self.storage_mode_mapping.get(self.storage_mode_var.get())
+            if storage_mode:
+                self.config_manager.set('settings.storage_mode', storage_mode)
             
             # App instance güncelle
             if self.app_instance:
@@ -2032,20 +2267,11 @@ class CategoryManagementWindow(BaseWindow):
         try:
             self.categorized_tree.delete(*self.categorized_tree.get_children())
             
-            with database.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT ac.process_name, ac.category, 
-                           MAX(ul.start_time) as last_usage
-                    FROM app_categories ac
-                    LEFT JOIN usage_logs ul ON ac.process_name = ul.process_name
-                    GROUP BY ac.process_name, ac.category
-                    ORDER BY ac.category, ac.process_name
-                """)
-                
-                categorized_apps = cursor.fetchall()
+            app_stats = database.get_app_stats()
+            categorized_apps = sorted(database.get_category_map().items(), key=lambda item: (item[1], item[0]))
             
-            for app, category, last_usage in categorized_apps:
+            for app, category in categorized_apps:
+                last_usage = app_stats[app][1] if app in app_stats else None
                 if last_usage:
                     usage_date = datetime.datetime.fromtimestamp(last_usage).strftime('%Y-%m-%d')
                 else:
@@ -2061,13 +2287,9 @@ class CategoryManagementWindow(BaseWindow):
         try:
             uncategorized_count = len(self.uncategorized_apps)
             
-            with database.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM app_categories")
-                categorized_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(DISTINCT category) FROM app_categories")
-                category_count = cursor.fetchone()[0]
+            category_map = database.get_category_map()
+            categorized_count = len(category_map)
+            category_count = len(set(category_map.values()))
             
             stats_text = (f"Kategorize edilmemiş: {uncategorized_count}\n"
                          f"Kategorize edilmiş: {categorized_count}\n"
@@ -2188,11 +2410,9 @@ class CategoryManagementWindow(BaseWindow):
                 return
             
             # Kategoriyi sil ve uygulamaları Other'a taşı
-            with database.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE app_categories SET category = 'Other' WHERE category = ?", 
-                             (selected_category,))
-                conn.commit()
+            if not database.delete_category(selected_category):
+                messagebox.showerror("Hata", "Kategori silinirken bir veritabanı hatası oluştu.", parent=self)
+                return
             
             # Combobox'ı güncelle
             current_categories = list(self.category_combo['values'])
@@ -2368,10 +2588,9 @@ class NotificationHistoryWindow(BaseWindow):
         """Tüm bildirimleri okundu işaretle."""
         if messagebox.askyesno("Onay", "Tüm bildirimler okundu olarak işaretlensin mi?", parent=self):
             try:
-                with database.get_db_connection() as conn:
+                with database.write_transaction() as conn:
                     cursor = conn.cursor()
                     cursor.execute("UPDATE notifications SET is_read = 1 WHERE is_read = 0")
-                    conn.commit()
                 
                 self._load_notifications()
                 
@@ -2390,11 +2609,10 @@ class NotificationHistoryWindow(BaseWindow):
                               "Tüm okunmuş bildirimler silinsin mi?\n\nBu işlem geri alınamaz.", 
                               parent=self):
             try:
-                with database.get_db_connection() as conn:
+                with database.write_transaction() as conn:
                     cursor = conn.cursor()
                     cursor.execute("DELETE FROM notifications WHERE is_read = 1")
                     deleted_count = cursor.rowcount
-                    conn.commit()
                 
                 self._load_notifications()
                 
@@ -2693,6 +2911,7 @@ class MainDashboardWindow(BaseWindow):
             self.recent_tree.delete(*self.recent_tree.get_children())
             
             recent_logs = database.get_recent_usage_logs(limit=20)
+            category_map = database.get_category_map()
             
             for log in recent_logs:
                 start_time = datetime.datetime.fromtimestamp(log['start_time'])
@@ -2702,7 +2921,7 @@ class MainDashboardWindow(BaseWindow):
                 if len(app_name) > 20:
                     app_name = app_name[:17] + "..."
                 
-                category = database.get_category_for_process(log['process_name'])
+                category = category_map.get(log['process_name'], 'Other')
                 duration = reporter.format_duration(log['duration_seconds'])
                 
                 self.recent_tree.insert("", "end", values=(time_str, app_name, category, duration))
@@ -2715,23 +2934,18 @@ class MainDashboardWindow(BaseWindow):
     def _update_system_status(self):
         """Sistem durumunu günceller."""
         try:
-            # Basit sistem durumu bilgileri
+            # Toplam kayıt ve uygulama sayıları sayaç tablosundan okunur
+            stats = database.get_stats()
+            total_logs = stats.get(database.STAT_USAGE_LOGS, 0)
+            total_apps = stats.get(database.STAT_APPS, 0)
+            
+            # Son 24 saatteki aktivite (zaman indeksinde yalnızca son 24 saat okunur)
             with database.get_db_connection() as conn:
                 cursor = conn.cursor()
-                
-                # Toplam kayıt sayısı
-                cursor.execute("SELECT COUNT(*) FROM usage_logs")
-                total_logs = cursor.fetchone()[0]
-                
-                # Son 24 saatteki aktivite
                 yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-                cursor.execute("SELECT COUNT(*) FROM usage_logs WHERE start_time > ?", 
+                cursor.execute("SELECT COUNT(*) FROM usage_logs WHERE timestamp > ?", 
                               (yesterday.timestamp(),))
                 recent_activity = cursor.fetchone()[0]
-                
-                # Toplam uygulama sayısı
-                cursor.execute("SELECT COUNT(DISTINCT process_name) FROM usage_logs")
-                total_apps = cursor.fetchone()[0]
             
             status_text = (f"• Toplam {total_logs:,} kullanım kaydı\n"
                           f"• Son 24 saatte {recent_activity} aktivite\n"
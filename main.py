@@ -16,7 +16,7 @@ from logging.handlers import RotatingFileHandler
 
 # YENİ: Dil yöneticisi en başta import edilmeli
 from kognita.localization import loc
-from kognita import tracker, database, analyzer, ui, achievement_checker
+from kognita import tracker, database, analyzer, ui, achievement_checker, backup, sync
 from kognita.config_manager import ConfigManager
 from kognita.utils import resource_path
 
@@ -48,6 +48,8 @@ class KognitaApp:
             # Hata durumunda da devam etsin ama güvenli mod
             
         self.tracker_instance = tracker.ActivityTracker(self.config_manager.get('settings'), self.stop_event)
+        self.tracker_thread = None
+        self.worker_threads = []
         self.icon = None
 
     def setup_logging(self):
@@ -161,35 +163,91 @@ class KognitaApp:
     def start_background_threads(self):
         """Arka plan iş parçacıklarını başlatır."""
         try:
-            Thread(target=self.tracker_instance.start_tracking, daemon=True).start()
-            Thread(target=self.goal_checker_loop, daemon=True).start()
-            Thread(target=self.achievement_checker_loop, daemon=True).start()
-            Thread(target=self.data_retention_loop, daemon=True).start() 
+            self.tracker_thread = Thread(target=self.tracker_instance.start_tracking, daemon=True)
+            self.tracker_thread.start()
+            self._start_worker(self.goal_checker_loop)
+            self._start_worker(self.achievement_checker_loop)
+            self._start_worker(self.data_retention_loop)
             logging.info("Arka plan iş parçacıkları başlatıldı.")
         except Exception as e:
             logging.error(f"Arka plan iş parçacıkları başlatılırken hata: {e}")
 
+    def _start_worker(self, target, *args):
+        """Döngüyü, bitince kendi veritabanı okuyucusunu kapatan bir arka plan iş parçacığında başlatır."""
+        def run():
+            try:
+                target(*args)
+            finally:
+                database.close_thread_connection()
+
+        thread = Thread(target=run, daemon=True)
+        self.worker_threads = [t for t in self.worker_threads if t.is_alive()] + [thread]
+        thread.start()
+        return thread
+
     def data_retention_loop(self):
-        """Belirlenen sıklıkta eski kullanım loglarını temizler."""
+        """Belirlenen sıklıkta eski kullanım loglarını temizler, yedek alır, boşta iken dosyayı küçültür."""
         self.stop_event.wait(300) # Uygulama başlatıldıktan 5 dakika sonra başlasın
+        last_purge_time = 0
+        last_sync_time = 0
         while not self.stop_event.is_set():
             try:
-                logging.info("Veri saklama politikası kontrolü yapılıyor...")
-                days_to_keep = self.config_manager.get('settings.data_retention_days', 365)
-                if days_to_keep >= 0: # 0, sonsuz sakla anlamına gelir
-                    # Database fonksiyonunu güvenli çağır
-                    if hasattr(database, 'delete_old_usage_logs'):
-                        deleted_count = database.delete_old_usage_logs(days_to_keep)
+                if time.time() - last_purge_time >= 24 * 3600: # Her 24 saatte bir kontrol et
+                    last_purge_time = time.time()
+                    logging.info("Veri saklama politikası kontrolü yapılıyor...")
+                    days_to_keep = self.config_manager.get('settings.data_retention_days', 365)
+                    if days_to_keep > 0: # 0, sonsuz sakla anlamına gelir
+                        # Silme küçük parçalar halinde yapılır, tracker yazmaları beklemez
+                        deleted_count = database.delete_old_usage_logs(days_to_keep, stop_event=self.stop_event)
                         if deleted_count > 0:
                             logging.info(f"{deleted_count} adet eski veri başarıyla temizlendi.")
-                    else:
-                        logging.warning("delete_old_usage_logs fonksiyonu bulunamadı.")
+
+                    # Eski ham oturumları saatlik/günlük satırlarda birleştir (0 = kademe kapalı)
+                    database.downsample_usage_logs(
+                        self.config_manager.get('settings.downsample_hourly_after_days', 30),
+                        self.config_manager.get('settings.downsample_daily_after_days', 180),
+                        stop_event=self.stop_event
+                    )
+
+                    # Kapanmış ayları ayrı arşiv dosyalarına taşı; ana dosya küçük kalır (0 = kapalı)
+                    database.archive_closed_months(
+                        self.config_manager.get('settings.archive_after_months', 3),
+                        stop_event=self.stop_event
+                    )
+
+                    # Şifreli kopya modunda kapanmış günleri mühürle, düz modda eski kopyaları sil
+                    database.apply_storage_mode(
+                        self.config_manager.get('settings.storage_mode', database.STORAGE_MODE_PLAIN))
+
+                # Zamanı gelmişse veritabanının sıkıştırılmış yedeğini al (0 = kapalı)
+                backup_interval_hours = self.config_manager.get('settings.backup_interval_hours', 24)
+                if backup_interval_hours > 0:
+                    backup_dir = self.config_manager.get('settings.backup_dir', '') or None
+                    last_backup_time = backup.latest_backup_time(backup_dir)
+                    if last_backup_time is None or time.time() - last_backup_time >= backup_interval_hours * 3600:
+                        backup.create_backup(
+                            backup_dir,
+                            keep=self.config_manager.get('settings.backup_keep_count', 7),
+                            compression=self.config_manager.get('settings.backup_compression', 'lzma'),
+                            stop_event=self.stop_event
+                        )
+
+                # Paylaşılan klasör ayarlıysa diğer makinelerle eşitle (0 = kapalı)
+                sync_dir = self.config_manager.get('settings.sync_dir', '')
+                sync_interval_hours = self.config_manager.get('settings.sync_interval_hours', 6)
+                if sync_dir and sync_interval_hours > 0 and time.time() - last_sync_time >= sync_interval_hours * 3600:
+                    last_sync_time = time.time()
+                    sync.sync_folder(sync_dir, stop_event=self.stop_event)
+
+                # Boşalan sayfaları yalnızca kullanıcı boştayken dosyaya iade et
+                if self.tracker_instance.is_user_idle():
+                    database.incremental_vacuum(stop_event=self.stop_event)
             except Exception as e:
                 logging.error(f"Veri temizleme döngüsünde hata: {e}")
                 if 'sentry_sdk' in globals():
                     sentry_sdk.capture_exception(e)
             
-            self.stop_event.wait(24 * 3600) # Her 24 saatte bir kontrol et
+            self.stop_event.wait(600)
 
     def achievement_checker_loop(self):
         """Periyodik olarak başarımları kontrol eder."""
@@ -242,7 +300,7 @@ class KognitaApp:
                     logging.warning("get_analysis_data fonksiyonu bulunamadı.")
                     category_totals_today = {}
                 
-                current_process_name, _ = self.tracker_instance._get_active_process_info()
+                current_process_name, _ = self.tracker_instance.get_current_activity()
                 
                 for goal in goals:
                     goal_id = goal.get('id')
@@ -340,7 +398,7 @@ class KognitaApp:
                 logging.info(f"{duration_minutes} dakikalık odaklanma oturumu başlatıldı. İzin verilen kategoriler: {allowed_categories}")
                 self.focus_session_active = True
                 self.update_tray_icon()
-                Thread(target=self._focus_session_loop, args=(duration_minutes, allowed_categories), daemon=True).start()
+                self._start_worker(self._focus_session_loop, duration_minutes, allowed_categories)
         except Exception as e:
             logging.error(f"Odaklanma oturumu başlatılırken hata: {e}")
 
@@ -363,7 +421,7 @@ class KognitaApp:
                 try:
                     if enable_focus_notifications:
                         current_time = time.time()
-                        process_name, _ = self.tracker_instance._get_active_process_info()
+                        process_name, _ = self.tracker_instance.get_current_activity()
                         
                         if process_name not in ('idle', 'unknown'):
                             # Database fonksiyonunu güvenli çağır
@@ -508,6 +566,7 @@ class KognitaApp:
         try:
             logging.info("Çıkış işlemi başlatıldı...")
             self.stop_event.set()
+            self.tracker_instance.stop()
             if self.icon: 
                 self.icon.stop()
             if self.dashboard_window:
@@ -515,6 +574,12 @@ class KognitaApp:
                     self.dashboard_window.destroy()
                 except:
                     pass
+            # Tracker son oturumu yazsın, döngüler sürmekte olan işi bıraksın; ardından bağlantıları kapat
+            if self.tracker_thread and self.tracker_thread.is_alive():
+                self.tracker_thread.join(timeout=10)
+            for thread in self.worker_threads:
+                thread.join(timeout=10)
+            database.close_all_connections()
             self.root.quit()
         except Exception as e:
             logging.error(f"Çıkış işleminde hata: {e}")
@@ -532,12 +597,6 @@ class KognitaApp:
         """Uygulamanın ana döngüsünü başlatır."""
         try:
             logging.info("Uygulama başlatılıyor...")
-            
-            # Veritabanı zaten constructor'da başlatıldı, tekrar kontrol et
-            try:
-                database.initialize_database()
-            except Exception as e:
-                logging.error(f"Veritabanı tekrar başlatma hatası: {e}")
 
             # First run kontrolü
             try:
@@ -581,6 +640,11 @@ class KognitaApp:
                 sys.exit(1)
 
 if __name__ == "__main__":
+    # Bakım komutları (örn: "python main.py rebuild-rollups") arayüzü açmadan çalışır
+    if len(sys.argv) > 1:
+        from kognita import maintenance
+        sys.exit(maintenance.run(sys.argv[1:]))
+
     try:
         app = KognitaApp()
         app.run()
@@ -0,0 +1,15 @@
+# tests/conftest.py
+
+import pytest
+from kognita import database
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Her test için geçici bir dosyada boş, güncel şemalı veritabanı açar."""
+    monkeypatch.setattr(database, 'DB_FILE', tmp_path / 'kognita_test.db')
+    database.close_all_connections()
+    database._invalidate_category_map()
+    assert database.initialize_database()
+    yield database
+    database.close_all_connections()
+    database._invalidate_category_map()
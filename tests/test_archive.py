@@ -0,0 +1,52 @@
+# tests/test_archive.py
+
+import datetime
+
+# Arşivlenecek kadar eski, kapanmış bir ayın ortası
+MONTH_START = (datetime.date.today().replace(day=1) - datetime.timedelta(days=150)).replace(day=1)
+
+def _at(day, hour):
+    return int(datetime.datetime.combine(MONTH_START + datetime.timedelta(days=day), datetime.time(hour)).timestamp())
+
+def _add_sessions(db):
+    db.update_app_category('code.exe', 'Development')
+    db.add_usage_logs([
+        ('code.exe', 'a.py', _at(2, 9), _at(2, 10), 3600),
+        ('chrome.exe', 'Docs', _at(2, 14), _at(2, 14) + 1800, 1800),
+        ('code.exe', 'b.py', _at(10, 20), _at(10, 21), 3600),
+    ])
+    # Arşivlenmeyen güncel kayıt
+    now = int(datetime.datetime.now().timestamp())
+    db.add_usage_logs([('code.exe', 'c.py', now - 600, now - 300, 300)])
+
+def test_archived_month_is_read_back(db):
+    _add_sessions(db)
+    start, end = _at(0, 0), _at(27, 23)
+    before = {
+        'logs': [(log.process_name, log.window_title, log.start_time, log.duration_seconds)
+                 for log in db.iter_usage_logs(start, end)],
+        'categories': db.get_category_totals(start, end),
+        'processes': db.get_process_totals(start, end),
+        'hours': db.get_hourly_totals(start, end),
+    }
+
+    assert db.archive_closed_months(1, pause_seconds=0) == 1
+    month = MONTH_START.strftime('%Y-%m')
+    conn = db.get_db_connection()
+    assert conn.execute("SELECT row_count FROM archive_manifest WHERE month = ?", (month,)).fetchone() == (3,)
+    assert conn.execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0] == 1
+    assert any(db.get_archive_dir().iterdir())
+
+    after = {
+        'logs': [(log.process_name, log.window_title, log.start_time, log.duration_seconds)
+                 for log in db.iter_usage_logs(start, end)],
+        'categories': db.get_category_totals(start, end),
+        'processes': db.get_process_totals(start, end),
+        'hours': db.get_hourly_totals(start, end),
+    }
+    assert after == before
+    assert after['processes'] == {'code.exe': 7200, 'chrome.exe': 1800}
+    assert after['categories']['Development'] == 7200
+    # Tüm geçmiş okunurken arşiv ayı ana dosyadaki kayıtlardan önce gelir
+    assert [log.window_title for log in db.iter_usage_logs()] == ['a.py', 'Docs', 'b.py', 'c.py']
+    assert db.get_stats()[db.STAT_USAGE_LOGS] == 4
@@ -0,0 +1,51 @@
+# tests/test_backup.py
+
+import datetime
+import sqlite3
+
+from kognita import backup
+
+def _at(days_ago, hour):
+    day = datetime.date.today().replace(day=1) - datetime.timedelta(days=days_ago)
+    return int(datetime.datetime.combine(day, datetime.time(hour)).timestamp())
+
+def _snapshot(db):
+    conn = db.get_db_connection()
+    return {
+        'logs': conn.execute("""SELECT process_name, window_title, start_time, duration_seconds
+                                FROM usage_log_entries ORDER BY timestamp""").fetchall(),
+        'daily': conn.execute("SELECT * FROM daily_usage ORDER BY day, process_name").fetchall(),
+        'archived': [log.window_title for log in db.iter_usage_logs()],
+    }
+
+def test_backup_restore_round_trip(db, tmp_path):
+    db.add_usage_logs([
+        ('code.exe', 'old.py', _at(150, 9), _at(150, 10), 3600),
+        ('code.exe', 'new.py', _at(1, 9), _at(1, 10), 3600),
+        ('chrome.exe', 'Docs', _at(1, 11), _at(1, 12), 3600),
+    ])
+    assert db.archive_closed_months(3, pause_seconds=0) == 1
+    expected = _snapshot(db)
+
+    snapshot_path = backup.create_backup(tmp_path / 'backups', compression='zlib', pause_seconds=0)
+    assert snapshot_path is not None and snapshot_path.exists()
+
+    # Yedekten sonraki değişiklikler geri yüklemeyle kaybolur
+    db.add_usage_logs([('notepad.exe', 'later.txt', _at(1, 15), _at(1, 16), 3600)])
+    archive_file = next(db.get_archive_dir().iterdir())
+    archive_file.unlink()
+
+    assert backup.restore_backup(snapshot_path)
+    with sqlite3.connect(str(db.DB_FILE)) as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ('ok',)
+    assert archive_file.exists()
+    assert _snapshot(db) == expected
+    assert db.DB_FILE.with_name(db.DB_FILE.name + '.pre-restore').exists()
+
+def test_restore_rejects_corrupt_snapshot(db, tmp_path):
+    db.add_usage_logs([('code.exe', 'a.py', _at(1, 9), _at(1, 10), 3600)])
+    snapshot_path = backup.create_backup(tmp_path / 'backups', compression='zlib', pause_seconds=0)
+    snapshot_path.write_bytes(b'not a backup')
+
+    assert not backup.restore_backup(snapshot_path)
+    assert [log.window_title for log in db.iter_usage_logs()] == ['a.py']
@@ -0,0 +1,41 @@
+# tests/test_coalescer.py
+
+from kognita.coalescer import SessionCoalescer
+
+def _coalescer(**settings):
+    rows = []
+    coalescer = SessionCoalescer(lambda *row: rows.append(row), settings)
+    return coalescer, rows
+
+def test_ticking_titles_are_merged_into_one_row():
+    coalescer, rows = _coalescer()
+    for second in range(120):
+        coalescer.add('chrome.exe', f'Timer 00:{second % 60:02d} - Chrome', second, second + 1, 1, 0)
+    coalescer.add('chrome.exe', '(2) Docs - Chrome', 120, 180)
+    coalescer.flush()
+    assert rows == [
+        ('chrome.exe', 'Timer - Chrome', 0, 120, 120, 120, 0),
+        ('chrome.exe', '(2) Docs - Chrome', 120, 180, 60, 0, 0),
+    ]
+
+def test_detail_processes_keep_raw_titles():
+    coalescer, rows = _coalescer(title_detail_processes=['Code.exe'])
+    coalescer.add('code.exe', 'main.py (3)', 0, 5)
+    coalescer.add('code.exe', 'main.py (4)', 5, 10)
+    coalescer.flush()
+    assert [row[1] for row in rows] == ['main.py (3)', 'main.py (4)']
+
+def test_pending_row_is_written_once_it_cannot_merge():
+    coalescer, rows = _coalescer(coalesce_window_seconds=30)
+    coalescer.add('chrome.exe', 'Docs', 0, 600)
+    # Aynı işlemde farklı başlık pencere dolana kadar birleşebilir
+    coalescer.poll('chrome.exe', 'Mail', 600, 610)
+    assert rows == []
+    coalescer.poll('chrome.exe', 'Mail', 600, 640)
+    assert [row[:5] for row in rows] == [('chrome.exe', 'Docs', 0, 600, 600)]
+
+def test_switch_to_other_process_writes_pending_row_immediately():
+    coalescer, rows = _coalescer()
+    coalescer.add('chrome.exe', 'Docs', 0, 600)
+    coalescer.poll('code.exe', 'main.py', 600, 600)
+    assert len(rows) == 1
@@ -0,0 +1,28 @@
+# tests/test_connections.py
+
+import threading
+
+def test_close_all_connections_keeps_readers_of_running_threads(db):
+    opened = threading.Event()
+    closed = threading.Event()
+    release = threading.Event()
+    result = {}
+
+    def worker():
+        conn = db.get_db_connection()
+        opened.set()
+        release.wait(5)
+        # Çıkışta kapatılmamış olmalı; iş parçacığı kendi bağlantısını kapatır
+        result['count'] = conn.execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0]
+        db.close_thread_connection()
+        closed.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert opened.wait(5)
+    db.close_all_connections()
+    release.set()
+    thread.join(5)
+    assert closed.is_set()
+    assert result['count'] == 0
+    assert thread.ident not in db._reader_conns
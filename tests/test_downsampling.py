@@ -0,0 +1,47 @@
+# tests/test_downsampling.py
+
+import datetime
+import time
+
+DAY = (datetime.date.today() - datetime.timedelta(days=200)).strftime('%Y-%m-%d')
+
+def _at(hour):
+    return int(datetime.datetime.strptime(f"{DAY} {hour:02d}:00", '%Y-%m-%d %H:%M').timestamp())
+
+def _hourly(db):
+    return dict(db.get_db_connection().execute(
+        "SELECT hour, total_seconds FROM hourly_usage WHERE day = ? ORDER BY hour", (DAY,)).fetchall())
+
+def _add_sessions(db):
+    # Aynı günde iki uygulama, her biri iki ayrı saatte birer saat
+    db.add_usage_logs([
+        ('code.exe', 'a.py', _at(9), _at(10), 3600),
+        ('code.exe', 'b.py', _at(11), _at(12), 3600),
+        ('chrome.exe', 'Docs', _at(15), _at(16), 3600),
+        ('chrome.exe', 'Mail', _at(18), _at(19), 3600),
+    ])
+    assert _hourly(db) == {9: 3600, 11: 3600, 15: 3600, 18: 3600}
+    assert db.downsample_usage_logs(0, 180, pause_seconds=0) == 2
+
+def test_rebuild_keeps_hourly_usage_of_downsampled_days(db):
+    _add_sessions(db)
+    assert db.rebuild_hourly_usage()
+    assert _hourly(db) == {9: 3600, 11: 3600, 15: 3600, 18: 3600}
+
+def test_purge_boundary_on_downsampled_day_keeps_remaining_hours(db):
+    _add_sessions(db)
+    # Kesim gün ortasına düşer: code.exe silinir, chrome.exe kalır
+    days_to_keep = (time.time() - _at(12)) / 86400
+    assert db.delete_old_usage_logs(days_to_keep, batch_size=1, pause_seconds=0) == 1
+    assert _hourly(db) == {15: 3600, 18: 3600}
+    assert db.get_process_totals(_at(0), _at(23)) == {'chrome.exe': 7200}
+
+def test_purge_batches_rows_sharing_a_timestamp(db):
+    # Aynı saniyede başlayan kayıtlar birden çok parçaya bölünerek silinir
+    db.add_usage_logs([(f'tool{i}.exe', 'main', _at(9), _at(9) + 60, 60) for i in range(5)])
+    db.add_usage_logs([('chrome.exe', 'Docs', _at(15), _at(16), 3600)])
+    days_to_keep = (time.time() - _at(12)) / 86400
+    assert db.delete_old_usage_logs(days_to_keep, batch_size=2, pause_seconds=0) == 5
+    assert db.get_process_totals(_at(0), _at(23)) == {'chrome.exe': 3600}
+    assert db.get_stats()[db.STAT_USAGE_LOGS] == 1
+    assert [row[0] for row in db.get_db_connection().execute("SELECT process_name FROM apps")] == ['chrome.exe']
@@ -0,0 +1,65 @@
+# tests/test_import.py
+
+import json
+import sqlite3
+
+from kognita import importer, maintenance
+
+START = 1_700_000_000
+
+def _logs():
+    return [('code.exe', f'file {i}.py', START + i * 600, START + i * 600 + 300, 300) for i in range(4)]
+
+def _row_count(db):
+    return db.get_db_connection().execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0]
+
+def test_reimporting_csv_skips_existing_rows(db, tmp_path, monkeypatch):
+    db.add_usage_logs(_logs())
+    csv_path = tmp_path / 'export.csv'
+    db.export_usage_logs_to_csv(str(csv_path))
+    # Dışa aktarmanın ilk yarısı zaten bulunan yeni bir veritabanına içe aktarılır
+    db.close_all_connections()
+    monkeypatch.setattr(db, 'DB_FILE', tmp_path / 'other.db')
+    assert db.initialize_database()
+    db.add_usage_logs(_logs()[:2])
+
+    assert importer.import_file(csv_path) == (2, 2)
+    assert _row_count(db) == 4
+    assert importer.import_file(csv_path) == (0, 4)
+    assert _row_count(db) == 4
+    assert db.get_stats()[db.STAT_USAGE_LOGS] == 4
+
+def test_reimporting_json_skips_existing_rows(db, tmp_path):
+    json_path = tmp_path / 'logs.json'
+    json_path.write_text(json.dumps([
+        {'process_name': name, 'window_title': title, 'start_time': start, 'end_time': end, 'duration_seconds': seconds}
+        for name, title, start, end, seconds in _logs()]), encoding='utf-8')
+
+    assert importer.import_file(json_path) == (4, 0)
+    assert importer.import_file(json_path) == (0, 4)
+    assert _row_count(db) == 4
+    assert db.get_process_totals(START, START + 86400) == {'code.exe': 1200}
+
+def test_insert_error_fails_the_import_command(db, tmp_path, monkeypatch):
+    json_path = tmp_path / 'logs.json'
+    json_path.write_text(json.dumps([
+        {'process_name': name, 'window_title': title, 'start_time': start, 'duration_seconds': seconds}
+        for name, title, start, _, seconds in _logs()]), encoding='utf-8')
+    original = db._add_imported_rollups
+    calls = []
+
+    def failing_rollups(conn, names, rows):
+        # İkinci parça yazılırken disk doldu
+        calls.append(len(rows))
+        if len(calls) >= 2:
+            raise sqlite3.OperationalError("database or disk is full")
+        original(conn, names, rows)
+
+    monkeypatch.setattr(db, '_add_imported_rollups', failing_rollups)
+    assert importer.import_file(json_path, batch_size=2) is None
+    assert _row_count(db) == 2
+    assert maintenance.run(['import', str(json_path), '--batch-size', '2']) == 1
+
+    # Hata giderildikten sonra tekrar içe aktarma kalanları ekler
+    monkeypatch.setattr(db, '_add_imported_rollups', original)
+    assert importer.import_file(json_path, batch_size=2) == (2, 2)
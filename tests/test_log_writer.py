@@ -0,0 +1,58 @@
+# tests/test_log_writer.py
+
+import threading
+
+from kognita import log_writer
+from kognita.log_writer import UsageLogWriter
+
+START = 1_700_000_000
+
+def _submit(writer, count, offset=0):
+    for i in range(offset, offset + count):
+        writer.submit('code.exe', f'file {i}', START + i * 100, START + i * 100 + 60, 60)
+
+def _row_count(db):
+    return db.get_db_connection().execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0]
+
+def _failing_once(original):
+    """İlk çağrıda yazma hatası veren add_usage_logs."""
+    calls = []
+    def add_usage_logs(logs):
+        calls.append(len(logs))
+        return False if len(calls) == 1 else original(logs)
+    return add_usage_logs, calls
+
+def test_close_flushes_queue(db):
+    stop_event = threading.Event()
+    writer = UsageLogWriter(stop_event, flush_interval_seconds=3600, flush_batch_size=1000)
+    writer.start()
+    _submit(writer, 5)
+    stop_event.set()
+    writer.close()
+    assert _row_count(db) == 5
+    assert writer._queue.empty() and writer._pending == []
+
+def test_failed_batch_is_kept_and_retried(db, monkeypatch):
+    add_usage_logs, calls = _failing_once(db.add_usage_logs)
+    monkeypatch.setattr(log_writer.database, 'add_usage_logs', add_usage_logs)
+    writer = UsageLogWriter(threading.Event())
+
+    _submit(writer, 3)
+    assert writer.flush() == 0
+    assert len(writer._pending) == 3 and _row_count(db) == 0
+
+    # Yeni kayıtlar bekleyenlerle birlikte, önce bekleyenler olmak üzere yazılır
+    _submit(writer, 2, offset=3)
+    writer.close()
+    assert calls == [3, 5]
+    assert writer._pending == []
+    assert [log.window_title for log in db.iter_usage_logs()] == [f'file {i}' for i in range(5)]
+
+def test_pending_rows_are_capped(db, monkeypatch):
+    monkeypatch.setattr(log_writer.database, 'add_usage_logs', lambda logs: False)
+    monkeypatch.setattr(UsageLogWriter, 'MAX_PENDING_ROWS', 4)
+    writer = UsageLogWriter(threading.Event())
+    _submit(writer, 6)
+    writer.close()
+    # En eski kayıtlar atılır, en yeni MAX_PENDING_ROWS kayıt beklemede kalır
+    assert [row[1] for row in writer._pending] == [f'file {i}' for i in range(2, 6)]
@@ -0,0 +1,46 @@
+# tests/test_migrations.py
+
+from kognita import database
+
+def _table_names(db):
+    return {row[0] for row in db.get_db_connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def _failing_migration(conn):
+    conn.execute("CREATE TABLE t_next (id INTEGER)")
+    raise RuntimeError("migration hatası")
+
+def _working_migration(conn):
+    conn.execute("CREATE TABLE t_next (id INTEGER)")
+
+def _set_next_migration(monkeypatch, migrate):
+    """Gerçek migration listesinin sonuna tek bir test adımı ekler."""
+    version = len(BASE_MIGRATIONS) + 1
+    monkeypatch.setattr(database, 'SCHEMA_MIGRATIONS', BASE_MIGRATIONS + [(version, "Test", migrate)])
+    monkeypatch.setattr(database, 'SCHEMA_VERSION', version)
+    return version
+
+BASE_MIGRATIONS = list(database.SCHEMA_MIGRATIONS)
+
+def test_failed_migration_rolls_back_ddl_and_version(db, monkeypatch):
+    current_version = db.get_schema_version()
+    _set_next_migration(monkeypatch, _failing_migration)
+    assert not db.initialize_database()
+    assert db.get_schema_version() == current_version
+    assert 't_next' not in _table_names(db)
+
+    # Düzeltilmiş migration tekrar denendiğinde uygulanır
+    version = _set_next_migration(monkeypatch, _working_migration)
+    assert db.initialize_database()
+    assert db.get_schema_version() == version
+    assert 't_next' in _table_names(db)
+
+def test_failed_migration_on_new_database_leaves_it_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_FILE', tmp_path / 'new.db')
+    database.close_all_connections()
+    _set_next_migration(monkeypatch, _failing_migration)
+    try:
+        assert not database.initialize_database()
+        assert database.get_schema_version() == 0
+        assert _table_names(database) == set()
+    finally:
+        database.close_all_connections()
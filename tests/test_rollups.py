@@ -0,0 +1,176 @@
+# tests/test_rollups.py
+# Özet tablolardan okunan toplamlar, ham oturumların kaba kuvvetle (saniye
+# saniye) hesaplanan toplamlarıyla karşılaştırılır. Oturumlar gece yarısını ve
+# yaz saati geçişlerini (CET/CEST, 2024-03-31 ve 2024-10-27) aşar.
+
+import datetime
+import time
+from collections import Counter
+
+import pytest
+
+# tzdata gerektirmeyen POSIX saat dilimi tanımı
+DST_ZONE = 'CET-1CEST,M3.5.0,M10.5.0/3'
+
+# (uygulama, yerel başlangıç, süre)
+SESSIONS = [
+    ('code.exe', '2024-03-29 23:30', 4500),       # gece yarısını aşar
+    ('chrome.exe', '2024-03-30 10:15', 1200),
+    ('code.exe', '2024-03-31 01:30', 5400),       # 02:00 -> 03:00 ileri alınır
+    ('slack.exe', '2024-03-31 23:55', 600),
+    ('idle', '2024-04-01 12:00', 900),
+    ('code.exe', '2024-10-26 23:50', 1200),
+    ('chrome.exe', '2024-10-27 01:45', 10800),    # 03:00 -> 02:00 geri alınır; 02 saati iki kez yaşanır
+    ('slack.exe', '2024-10-27 02:10', 600),       # geri almadan önceki ilk 02:10
+    ('code.exe', '2024-10-28 00:00', 60),
+]
+
+@pytest.fixture
+def dst_zone(monkeypatch):
+    """Testi yaz saati uygulanan bir yerel saat diliminde çalıştırır."""
+    monkeypatch.setenv('TZ', DST_ZONE)
+    time.tzset()
+    assert _timestamp('2024-10-28 00:00') - _timestamp('2024-10-27 00:00') == 25 * 3600
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def _timestamp(local):
+    return int(time.mktime(time.strptime(local, '%Y-%m-%d %H:%M')[:8] + (-1,)))
+
+@pytest.fixture
+def sessions(dst_zone, db):
+    logs = [(name, f'{name} window', _timestamp(local), _timestamp(local) + seconds, seconds)
+            for name, local, seconds in SESSIONS]
+    assert db.add_usage_logs(logs)
+    return logs
+
+def _local_day(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+def _brute_process_totals(logs, start, end):
+    """Başlangıcı [start, end] içinde kalan oturumların uygulama başına toplamı (idle hariç)."""
+    totals = Counter()
+    for name, _, started, _, seconds in logs:
+        if start <= started <= end and name != 'idle':
+            totals[name] += seconds
+    return dict(totals)
+
+def test_range_totals_match_raw_sessions(db, sessions):
+    db.update_app_category('code.exe', 'Development')
+    db.update_app_category('chrome.exe', 'Browsing')
+    db.update_app_category('slack.exe', 'Communication')
+    category_of = {'code.exe': 'Development', 'chrome.exe': 'Browsing', 'slack.exe': 'Communication'}
+    ranges = [
+        ('2024-03-29 00:00', '2024-04-02 00:00'),
+        ('2024-03-29 23:45', '2024-03-31 01:30'),     # kısmi uçlar, tam gün ortada
+        ('2024-03-30 00:00', '2024-03-31 23:59'),     # 23 saatlik gün
+        ('2024-03-31 01:31', '2024-03-31 03:30'),     # ileri alınan saat içinde
+        ('2024-10-26 12:00', '2024-10-28 00:00'),
+        ('2024-10-27 00:00', '2024-10-27 23:59'),     # 25 saatlik gün
+        ('2024-10-27 02:00', '2024-10-27 02:30'),
+    ]
+    for start_local, end_local in ranges:
+        start, end = _timestamp(start_local), _timestamp(end_local)
+        expected = _brute_process_totals(sessions, start, end)
+        assert db.get_process_totals(start, end) == expected, (start_local, end_local)
+        expected_categories = Counter()
+        for name, seconds in expected.items():
+            expected_categories[category_of[name]] += seconds
+        assert db.get_category_totals(start, end) == dict(expected_categories), (start_local, end_local)
+
+def test_split_range_by_days_covers_range_exactly(dst_zone):
+    from kognita import database
+    for start_local, end_local in [('2024-03-30 10:00', '2024-04-01 10:00'), ('2024-10-26 00:00', '2024-10-27 23:59'),
+                                   ('2024-10-27 02:30', '2024-10-27 02:40'), ('2024-03-31 00:00', '2024-03-31 23:59')]:
+        start, end = _timestamp(start_local), _timestamp(end_local) + 59
+        full_days, raw_ranges = database._split_range_by_days(start, end)
+        covered = set()
+        for raw_start, raw_end in raw_ranges:
+            covered.update(range(raw_start, raw_end + 1, 60))
+        if full_days:
+            day = datetime.date.fromisoformat(full_days[0])
+            while day <= datetime.date.fromisoformat(full_days[1]):
+                day_start = _timestamp(f'{day} 00:00')
+                next_day = _timestamp(f'{day + datetime.timedelta(days=1)} 00:00')
+                assert not covered & set(range(day_start, next_day, 60))
+                covered.update(range(day_start, next_day, 60))
+                day += datetime.timedelta(days=1)
+        assert covered == set(range(start, end + 1, 60)), (start_local, end_local)
+
+def _daily_rows(db):
+    return {(day, name): (seconds, count) for day, name, seconds, count in db.get_db_connection().execute(
+        "SELECT day, process_name, SUM(total_seconds), SUM(session_count) FROM daily_usage GROUP BY 1, 2")}
+
+def test_daily_usage_matches_raw_sessions(db, sessions):
+    expected = {}
+    for name, _, started, _, seconds in sessions:
+        total, count = expected.get((_local_day(started), name), (0, 0))
+        expected[(_local_day(started), name)] = (total + seconds, count + 1)
+    assert _daily_rows(db) == expected
+    assert db.rebuild_daily_usage()
+    assert _daily_rows(db) == expected
+
+def _brute_hours(logs):
+    """Oturumları saniye saniye yerel (gün, saat) kovalarına dağıtır (idle hariç)."""
+    hours = Counter()
+    for name, _, started, _, seconds in logs:
+        if name == 'idle':
+            continue
+        for second in range(started, started + seconds):
+            local = time.localtime(second)
+            hours[(time.strftime('%Y-%m-%d', local), local.tm_hour)] += 1
+    return dict(hours)
+
+def _hourly_rows(db):
+    return dict(((day, hour), seconds) for day, hour, seconds in db.get_db_connection().execute(
+        "SELECT day, hour, SUM(total_seconds) FROM hourly_usage GROUP BY 1, 2"))
+
+def test_hourly_usage_matches_raw_sessions(db, sessions):
+    expected = _brute_hours(sessions)
+    # Geri alınan gecede 02 saati iki kez yaşanır, ileri alınan gecede hiç yaşanmaz
+    assert expected[('2024-10-27', 2)] == 2 * 3600 + 600
+    assert ('2024-03-31', 2) not in expected
+    assert _hourly_rows(db) == expected
+    assert db.rebuild_hourly_usage()
+    assert _hourly_rows(db) == expected
+
+    start, end = _timestamp('2024-10-27 00:00'), _timestamp('2024-10-27 23:59')
+    assert db.get_hourly_totals(start, end) == {hour: seconds for (day, hour), seconds in expected.items()
+                                                if day == '2024-10-27'}
+    weekday_totals = Counter()
+    for (day, hour), seconds in expected.items():
+        weekday_totals[(datetime.date.fromisoformat(day).weekday(), hour)] += seconds
+    assert db.get_weekday_hourly_totals(_timestamp('2024-03-29 00:00'), _timestamp('2024-10-28 23:59')) == dict(weekday_totals)
+
+def _assert_counters_match(db):
+    logs = list(db.iter_usage_logs())
+    stats = db.get_stats()
+    assert stats[db.STAT_USAGE_LOGS] == len(logs)
+    assert stats[db.STAT_APPS] == len({log.process_name for log in logs})
+    totals = Counter()
+    for log in logs:
+        totals[log.process_name] += log.duration_seconds
+    assert dict(db.get_db_connection().execute("SELECT process_name, total_seconds FROM apps")) == dict(totals)
+
+def test_counters_match_raw_rows_through_maintenance(db, sessions):
+    # Aynı gün birleştirilecek ek oturumlar
+    db.add_usage_logs([('code.exe', 'more', _timestamp(f'2024-10-28 {hour:02d}:00'),
+                        _timestamp(f'2024-10-28 {hour:02d}:00') + 600, 600) for hour in range(9, 13)])
+    _assert_counters_match(db)
+
+    assert db.downsample_usage_logs(0, 30, pause_seconds=0) > 0
+    _assert_counters_match(db)
+
+    assert db.archive_closed_months(1, pause_seconds=0) == 3
+    _assert_counters_match(db)
+
+    # Mart ve nisan arşivleri silinir; kesimden yeni kayıtları da olan ekim arşivi tamamen eskiyene kadar kalır
+    days_to_keep = (time.time() - _timestamp('2024-10-27 12:00')) / 86400
+    assert db.delete_old_usage_logs(days_to_keep, pause_seconds=0) > 0
+    _assert_counters_match(db)
+    assert {_local_day(log.start_time)[:7] for log in db.iter_usage_logs()} == {'2024-10'}
+
+    expected = db.get_stats()
+    assert db.rebuild_stats()
+    assert db.get_stats() == expected
@@ -0,0 +1,43 @@
+# tests/test_sync.py
+
+from kognita import sync
+
+START = 1_700_000_000
+
+def _use_database(db, monkeypatch, path):
+    db.close_all_connections()
+    db._invalidate_category_map()
+    monkeypatch.setattr(db, 'DB_FILE', path)
+    assert db.initialize_database()
+
+def _row_count(db):
+    return db.get_db_connection().execute("SELECT COUNT(*) FROM usage_logs").fetchone()[0]
+
+def test_merging_a_peer_twice_adds_no_duplicates(db, tmp_path, monkeypatch):
+    local_db = db.DB_FILE
+    db.add_usage_logs([('code.exe', 'local.py', START, START + 300, 300)])
+
+    # Diğer makine: kendi veritabanı ve paylaşılan klasöre yazdığı kopya
+    _use_database(db, monkeypatch, tmp_path / 'peer.db')
+    db.add_usage_logs([('chrome.exe', f'page {i}', START + i * 600, START + i * 600 + 60, 60) for i in range(3)])
+    snapshot_path = sync.export_sync_snapshot(tmp_path / 'sync', pause_seconds=0)
+    assert snapshot_path is not None
+
+    _use_database(db, monkeypatch, local_db)
+    assert db.merge_device_database(snapshot_path) == (3, 0)
+    assert db.merge_device_database(snapshot_path) == (0, 0)
+    assert _row_count(db) == 4
+    assert db.get_stats()[db.STAT_USAGE_LOGS] == 4
+
+    # Eşitleme işareti yalnızca yeni kayıtların okunmasını sağlar
+    _use_database(db, monkeypatch, tmp_path / 'peer.db')
+    db.add_usage_logs([('chrome.exe', 'page 3', START + 1800, START + 1860, 60)])
+    assert sync.export_sync_snapshot(tmp_path / 'sync', pause_seconds=0) == snapshot_path
+
+    _use_database(db, monkeypatch, local_db)
+    assert db.merge_device_database(snapshot_path) == (1, 0)
+    assert db.merge_device_database(snapshot_path) == (0, 0)
+    assert _row_count(db) == 5
+    peer_device = [device['id'] for device in db.get_devices() if device['id'] != db.LOCAL_DEVICE_ID]
+    assert len(peer_device) == 1
+    assert db.get_process_totals(START, START + 86400, device_id=peer_device[0]) == {'chrome.exe': 240}
@@ -0,0 +1,123 @@
+# tests/test_tracker.py
+
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from kognita import activity, tracker
+from kognita.activity import InputActivityDetector
+from kognita.foreground import FakeForegroundBackend, ForegroundWindow, X11ForegroundBackend
+
+class FakeClock:
+    """Takip döngüsünün okuduğu saat; yalnızca test ilerletince değişir."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock(1_700_000_000)
+    monkeypatch.setattr(tracker, 'time', fake_clock)
+    monkeypatch.setattr(activity, 'time', fake_clock)
+    return fake_clock
+
+def _run_tracker(db, clock, config, steps):
+    """
+    Tracker'ı sahte arka uçla çalıştırır. steps: [(süre, (pid, işlem, başlık))];
+    her adımda saat ilerletilir ve ön plan penceresi değiştirilir.
+    Yazılan (işlem, başlık, başlangıç, bitiş, süre) kayıtlarını döndürür.
+    """
+    backend = FakeForegroundBackend(ForegroundWindow(1, 'a.exe', 'A'))
+    closes = []
+    backend.close = lambda: closes.append(True)
+    stop_event = threading.Event()
+    activity_tracker = tracker.ActivityTracker(
+        dict(config, idle_threshold_seconds=600), stop_event, backend=backend,
+        input_detector=InputActivityDetector(idle_probe=lambda: 0.0))
+    thread = threading.Thread(target=activity_tracker.start_tracking)
+    thread.start()
+    try:
+        assert backend.wait_until_processed()
+        for seconds, window in steps:
+            clock.advance(seconds)
+            if window is None:
+                break
+            backend.set_foreground(*window)
+            assert backend.wait_until_processed()
+    finally:
+        stop_event.set()
+        activity_tracker.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert closes == [True]
+    return [(log.process_name, log.window_title, log.start_time - clock.now, log.end_time - clock.now,
+             log.duration_seconds) for log in db.iter_usage_logs()]
+
+def test_session_boundaries_follow_foreground_changes(db, clock):
+    rows = _run_tracker(db, clock, {'coalesce_sessions': False}, [
+        (10, (2, 'b.exe', 'B')),
+        (5, (2, 'b.exe', 'B2')),
+        (7, (1, 'a.exe', 'A')),
+        (3, None),
+    ])
+    assert rows == [
+        ('a.exe', 'A', -25, -15, 10),
+        ('b.exe', 'B', -15, -10, 5),
+        ('b.exe', 'B2', -10, -3, 7),
+        ('a.exe', 'A', -3, 0, 3),
+    ]
+
+def test_title_only_changes_are_coalesced(db, clock):
+    rows = _run_tracker(db, clock, {}, [
+        (10, (2, 'b.exe', 'Inbox (1)')),
+        (5, (2, 'b.exe', 'Inbox (2)')),
+        (7, (1, 'a.exe', 'A')),
+        (3, None),
+    ])
+    assert rows == [
+        ('a.exe', 'A', -25, -15, 10),
+        ('b.exe', 'Inbox', -15, -3, 12),
+        ('a.exe', 'A', -3, 0, 3),
+    ]
+
+def test_input_during_idle_read_is_not_lost():
+    backend = FakeForegroundBackend(ForegroundWindow(1, 'a.exe', 'A'))
+    wakes = []
+    backend.wake = lambda: wakes.append(True)
+    activity_tracker = tracker.ActivityTracker({}, threading.Event(), backend=backend,
+                                               input_detector=InputActivityDetector(idle_probe=lambda: 0.0))
+
+    # Giriş, döngü boşta okuduktan sonra ama durumu kaydetmeden önce gelir
+    input_events = activity_tracker._input_events
+    activity_tracker._on_activity()
+    activity_tracker._set_idle(True, input_events)
+    assert not activity_tracker._idle
+
+    # Boşta kaydedildikten sonra gelen giriş döngüyü uyandırır
+    activity_tracker._set_idle(True, activity_tracker._input_events)
+    activity_tracker._on_activity()
+    assert not activity_tracker._idle
+    assert wakes == [True]
+
+def test_x11_backend_close_releases_wake_pipe():
+    backend = X11ForegroundBackend()
+    wake_read, wake_write = backend._wake_read, backend._wake_write
+    backend.close()
+    for fd in (wake_read, wake_write):
+        with pytest.raises(OSError):
+            os.fstat(fd)
+    # Kapatıldıktan sonra gelen uyandırma (ör. çıkışta ActivityTracker.stop) yok sayılır
+    backend.wake()
+    backend.close()
@@ -0,0 +1,45 @@
+# tests/test_usage_logs.py
+
+import sqlite3
+
+import pytest
+
+def _add_logs(db, count):
+    db.add_usage_logs([('code.exe', f'file {i}', 1_700_000_000 + i * 100, 1_700_000_060 + i * 100, 60)
+                       for i in range(count)])
+
+def _failing_chunks(original):
+    """İlk parçadan sonra okuma hatası veren _iter_partition_chunks."""
+    def chunks(*args, **kwargs):
+        yield next(original(*args, **kwargs))
+        raise sqlite3.DatabaseError("database disk image is malformed")
+    return chunks
+
+def test_iter_usage_logs_streams_in_time_order(db):
+    _add_logs(db, 5)
+    logs = list(db.iter_usage_logs(batch_size=2))
+    assert [log.window_title for log in logs] == [f'file {i}' for i in range(5)]
+
+def test_interrupted_stream_raises_instead_of_truncating(db, monkeypatch):
+    _add_logs(db, 5)
+    monkeypatch.setattr(db, '_iter_partition_chunks', _failing_chunks(db._iter_partition_chunks))
+    received = []
+    with pytest.raises(sqlite3.DatabaseError):
+        for log in db.iter_usage_logs(batch_size=2):
+            received.append(log)
+    assert len(received) == 2
+    assert db.get_all_usage_logs() == []
+
+def test_columnar_export_leaves_shared_reader_idle(db, tmp_path):
+    np = pytest.importorskip("numpy")
+    _add_logs(db, 3)
+    reader = db.get_db_connection()
+    seen = []
+
+    def on_progress(written, total):
+        # Dışa aktarma sürerken iş parçacığının okuyucusu transaction'a girmemiş olmalı
+        seen.append(reader.in_transaction)
+
+    assert db.export_usage_logs_columnar(tmp_path / 'out.npz', progress_callback=on_progress) == (True, None)
+    assert seen == [False]
+    assert list(np.load(tmp_path / 'out.npz')['duration_seconds']) == [60, 60, 60]